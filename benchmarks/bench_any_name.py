@@ -0,0 +1,48 @@
+"""Compares metric-tag generation with `get_any_name` with and without its
+name cache.
+
+Run from the repository root:
+
+    python benchmarks/bench_any_name.py
+"""
+import datetime
+import timeit
+
+from ccptools.tpu.insp import get_any_name
+from ccptools.tpu.insp._insp_old import _get_any_name
+
+
+class CharacterOnline(object):
+    def __init__(self, character_id: int):
+        self.character_id = character_id
+
+
+class Dispatcher(object):
+    def on_character_online(self, event: CharacterOnline):
+        pass
+
+
+def make_events(n: int = 10000):
+    dispatcher = Dispatcher()
+    kinds = [CharacterOnline(1), datetime.datetime(2024, 5, 22), 42, 'text', dispatcher]
+    return [(kinds[i % len(kinds)], dispatcher.on_character_online) for i in range(n)]
+
+
+def main():
+    events = make_events()
+
+    def tags(name_of):
+        return [f'event:{name_of(event)},handler:{name_of(handler)}' for event, handler in events]
+
+    assert tags(_get_any_name) == tags(get_any_name)
+    cases = [
+        ('uncached', lambda: tags(_get_any_name)),
+        ('get_any_name (cached)', lambda: tags(get_any_name)),
+    ]
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=10, repeat=3)) / 10
+        print(f'{name:<25} {best * 1000:>8.2f} ms   {len(events) / best:>12,.0f} tags/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Compares decoding permission bitmasks with the one bit at a time loop
+`split_bitmask` used before and with the lowest set bit loop, byte table and
+column-wise helpers that replaced it.
+
+Run from the repository root:
+
+    python benchmarks/bench_bitmask.py
+"""
+import random
+import timeit
+
+from ccptools.tpu.casting import bitmask_columns, bitmask_positions, split_bitmask, split_bitmasks
+
+
+def old_split_bitmask(composite_value):
+    buff = []
+    bitval = 1
+    while composite_value > 0:
+        if composite_value & 1:
+            buff.append(bitval)
+        bitval *= 2
+        composite_value >>= 1
+    return buff
+
+
+def make_masks(n: int = 100000):
+    rnd = random.Random(42)
+    sparse = [(1 << rnd.randint(40, 63)) | (1 << rnd.randint(0, 8)) for _ in range(n)]
+    dense = [rnd.getrandbits(32) for _ in range(n)]
+    roles = [rnd.getrandbits(16) for _ in range(50)]  # Few unique masks, like entity permissions
+    repeated = [rnd.choice(roles) for _ in range(n)]
+    return sparse, dense, repeated
+
+
+def main():
+    for name, masks in zip(('sparse 64 bit', 'dense 32 bit', 'repeated 16 bit'), make_masks()):
+        assert [old_split_bitmask(m) for m in masks] == split_bitmasks(masks)
+        print(f'{name} masks ({len(masks):,})')
+        cases = [
+            ('split_bitmask (before)', lambda: [old_split_bitmask(m) for m in masks]),
+            ('split_bitmask', lambda: [split_bitmask(m) for m in masks]),
+            ('bitmask_positions', lambda: [bitmask_positions(m) for m in masks]),
+            ('split_bitmasks', lambda: split_bitmasks(masks)),
+            ('bitmask_columns', lambda: bitmask_columns(masks)),
+        ]
+        for case, func in cases:
+            best = min(timeit.repeat(func, number=3, repeat=3)) / 3
+            print(f'  {case:<25} {best * 1000:>8.2f} ms   {len(masks) / best:>12,.0f} masks/s')
+
+
+if __name__ == '__main__':
+    main()
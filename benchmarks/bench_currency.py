@@ -0,0 +1,36 @@
+"""Compares parsing a price list with `parse_currency_text` (floats, commas
+stripped) and with the compiled, per locale `parse_currency` and its batch
+version `parse_currencies` (exact decimals or minor units).
+
+Run from the repository root:
+
+    python benchmarks/bench_currency.py
+"""
+import random
+import timeit
+
+from ccptools.tpu.casting import parse_currencies, parse_currency, parse_currency_text
+
+
+def make_prices(n: int = 100000, unique: int = 5000):
+    rnd = random.Random(42)
+    catalog = [f'${rnd.randint(0, 99999) / 100:,.2f}' for _ in range(unique)]
+    return [rnd.choice(catalog) for _ in range(n)]
+
+
+def main():
+    prices = make_prices()
+    cases = [
+        ('parse_currency_text', lambda: [parse_currency_text(p) for p in prices]),
+        ('parse_currency', lambda: [parse_currency(p) for p in prices]),
+        ('parse_currency (minor)', lambda: [parse_currency(p, minor_units=True) for p in prices]),
+        ('parse_currencies', lambda: parse_currencies(prices)),
+        ('parse_currencies (minor)', lambda: parse_currencies(prices, minor_units=True)),
+    ]
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=3, repeat=3)) / 3
+        print(f'{name:<25} {best * 1000:>8.2f} ms   {len(prices) / best:>12,.0f} prices/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Compares casting enum names and values from strings with `enum_eval` (which
+uses lookup tables built once per enum class), `EnumEx.from_any` and
+`enum_eval_many` with the per call dict comprehension `enum_eval` used before.
+
+Run from the repository root:
+
+    python benchmarks/bench_enum_eval.py
+"""
+import random
+import timeit
+
+from ccptools.tpu.casting import enum_eval, enum_eval_many
+from ccptools.tpu.structs import EnumEx
+
+
+class MessageType(EnumEx):
+    LOGIN = 1
+    LOGOUT = 2
+    CHAT = 3
+    TRADE = 4
+    FLEET_INVITE = 5
+    FLEET_LEAVE = 6
+    WARP = 7
+    DOCK = 8
+    UNDOCK = 9
+    KILL = 10
+
+
+def old_enum_eval(value, enum_class, default=None):
+    if isinstance(value, enum_class):
+        return value
+    if isinstance(value, str):
+        hit = {o.name.lower(): o for o in enum_class}.get(value.strip().lower(), None)
+        if hit is not None:
+            return hit
+        try:
+            value = int(value, base=0)
+        except ValueError:
+            return default
+    if isinstance(value, int):
+        try:
+            return enum_class(value)
+        except ValueError:
+            return default
+    return default
+
+
+def make_messages(n: int = 100000):
+    rnd = random.Random(42)
+    names = [m.name for m in MessageType] + [m.name.lower() for m in MessageType] + ['3', '7', 'bogus']
+    return [rnd.choice(names) for _ in range(n)]
+
+
+def main():
+    messages = make_messages()
+    assert [old_enum_eval(m, MessageType) for m in messages] == enum_eval_many(messages, MessageType)
+    cases = [
+        ('dict per call (before)', lambda: [old_enum_eval(m, MessageType) for m in messages]),
+        ('enum_eval', lambda: [enum_eval(m, MessageType) for m in messages]),
+        ('EnumEx.from_any', lambda: [MessageType.from_any(m, None) for m in messages]),
+        ('enum_eval_many', lambda: enum_eval_many(messages, MessageType)),
+    ]
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=3, repeat=3)) / 3
+        print(f'{name:<25} {best * 1000:>8.2f} ms   {len(messages) / best:>12,.0f} values/s')
+
+
+if __name__ == '__main__':
+    main()
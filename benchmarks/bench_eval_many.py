@@ -0,0 +1,41 @@
+"""Compares casting a column of strings with the scalar evals one value at a
+time and with the column-wise `*_eval_many` functions.
+
+Run from the repository root:
+
+    python benchmarks/bench_eval_many.py
+"""
+import random
+import timeit
+
+from ccptools.tpu.casting import bool_eval, bool_eval_many, float_eval, float_eval_many, int_eval, int_eval_many
+
+
+def make_columns(n: int = 100000):
+    rnd = random.Random(42)
+    floats = [f'{rnd.uniform(-1e6, 1e6):.2f}' for _ in range(n)]
+    ints = [str(rnd.randint(-10 ** 9, 10 ** 9)) for _ in range(n)]
+    flags = [rnd.choice(['yes', 'no', 'true', 'false', '1', '0', 'on', 'off']) for _ in range(n)]
+    return floats, ints, flags
+
+
+def main():
+    floats, ints, flags = make_columns()
+    cases = [
+        ('float_eval (per value)', lambda: [float_eval(v) for v in floats]),
+        ('float_eval_many (list)', lambda: float_eval_many(floats)),
+        ('float_eval_many (array)', lambda: float_eval_many(floats, output='array')),
+        ('int_eval (per value)', lambda: [int_eval(v) for v in ints]),
+        ('int_eval_many (list)', lambda: int_eval_many(ints)),
+        ('int_eval_many (array)', lambda: int_eval_many(ints, output='array')),
+        ('bool_eval (per value)', lambda: [bool_eval(v) for v in flags]),
+        ('bool_eval_many (list)', lambda: bool_eval_many(flags)),
+        ('bool_eval_many (array)', lambda: bool_eval_many(flags, output='array')),
+    ]
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=5, repeat=3)) / 5
+        print(f'{name:<25} {best * 1000:>8.2f} ms   {len(floats) / best:>12,.0f} values/s')
+
+
+if __name__ == '__main__':
+    main()
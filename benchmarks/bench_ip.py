@@ -0,0 +1,60 @@
+"""Compares converting a buffer of IPv4 addresses one at a time and with
+`ips_to_array`, and finding the most specific subnet of each address with a
+`CidrIndex` and with a scan over the `ipaddress` networks.
+
+Run from the repository root:
+
+    python benchmarks/bench_ip.py
+"""
+import ipaddress
+import random
+import timeit
+
+from ccptools.tpu.casting import CidrIndex, ip_to_int, ips_to_array
+
+
+def make_data(n: int = 100000, networks: int = 200):
+    rnd = random.Random(42)
+    buffer = '\n'.join(str(ipaddress.IPv4Address(rnd.getrandbits(32) & 0x0FFFFFFF)) for _ in range(n)).encode()
+    nets = {}
+    while len(nets) < networks:
+        prefix_len = rnd.randint(8, 24)
+        net = ipaddress.ip_network(((rnd.getrandbits(32) & 0x0FFFFFFF) >> (32 - prefix_len) << (32 - prefix_len),
+                                    prefix_len))
+        nets[str(net)] = f'site-{len(nets)}'
+    return buffer, nets
+
+
+def main():
+    buffer, nets = make_data()
+    lines = buffer.decode().split()
+    ips = ips_to_array(buffer)
+    assert list(ips) == [ip_to_int(line) for line in lines]
+
+    index = CidrIndex(nets)
+    parsed = [(ipaddress.ip_network(n), v) for n, v in nets.items()]
+    sample = ips[:2000]
+
+    def scan(ip):
+        addr = ipaddress.IPv4Address(ip)
+        best = None
+        for net, value in parsed:
+            if addr in net and (best is None or net.prefixlen > best[0].prefixlen):
+                best = (net, value)
+        return best[1] if best else None
+
+    assert [scan(ip) for ip in sample] == index.get_many(sample)
+    cases = [
+        ('ip_to_int per line', len(lines), lambda: [ip_to_int(line) for line in buffer.decode().split()]),
+        ('ips_to_array', len(lines), lambda: ips_to_array(buffer)),
+        ('ipaddress scan', len(sample), lambda: [scan(ip) for ip in sample]),
+        ('CidrIndex.get', len(ips), lambda: [index.get(ip) for ip in ips]),
+        ('CidrIndex.get_many', len(ips), lambda: index.get_many(ips)),
+    ]
+    for name, count, func in cases:
+        best = min(timeit.repeat(func, number=3, repeat=3)) / 3
+        print(f'{name:<25} {best * 1000:>8.2f} ms   {count / best:>12,.0f} addresses/s')
+
+
+if __name__ == '__main__':
+    main()
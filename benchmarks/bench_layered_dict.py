@@ -0,0 +1,61 @@
+"""Compares per-request config overlays with `nested_dict_overlay` against
+`copy.deepcopy` + `nested_dict_update`.
+
+Run from the repository root:
+
+    python benchmarks/bench_layered_dict.py
+"""
+import copy
+import timeit
+
+from ccptools.tpu.iters import *
+
+
+def make_config():
+    defaults = {
+        f'service_{s}': {
+            'db': {'host': 'localhost', 'port': 5432, 'pool': {'min': 1, 'max': 10}},
+            'cache': {'ttl': 60, 'size': 1000},
+            'features': {f'flag_{f}': False for f in range(20)},
+        } for s in range(20)
+    }
+    file = {'service_3': {'db': {'host': 'db.local'}}, 'service_7': {'cache': {'ttl': 120}}}
+    env = {'service_3': {'db': {'pool': {'max': 50}}}}
+    return defaults, file, env
+
+
+def main():
+    defaults, file, env = make_config()
+    runtime = {'service_3': {'features': {'flag_5': True}}}
+    reads = [('service_3', 'db', 'host'), ('service_3', 'db', 'pool', 'max'), ('service_3', 'features', 'flag_5'),
+             ('service_7', 'cache', 'ttl'), ('service_12', 'db', 'port')]
+
+    def with_deepcopy():
+        merged = copy.deepcopy(defaults)
+        for layer in (file, env, runtime):
+            nested_dict_update(merged, copy.deepcopy(layer))
+        return [nested_get(merged, r) for r in reads]
+
+    def with_overlay():
+        merged = nested_dict_overlay(defaults, file, env, runtime)
+        return [nested_get(merged, r) for r in reads]
+
+    static = nested_dict_overlay(defaults, file, env).to_dict()
+
+    def with_overlay_on_merged():
+        merged = nested_dict_overlay(static, runtime)
+        return [nested_get(merged, r) for r in reads]
+
+    assert with_deepcopy() == with_overlay() == with_overlay_on_merged()
+    cases = [
+        ('deepcopy + nested_dict_update', with_deepcopy),
+        ('nested_dict_overlay (4 layers)', with_overlay),
+        ('nested_dict_overlay (2 layers)', with_overlay_on_merged),
+    ]
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=200, repeat=3)) / 200
+        print(f'{name:<35} {best * 1_000_000:>10.1f} us   {1 / best:>10,.0f} requests/s')
+
+
+if __name__ == '__main__':
+    main()
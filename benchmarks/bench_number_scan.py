@@ -0,0 +1,80 @@
+"""Compares `int_eval` and `bool_eval` on strings (which classify strings with
+`scan_number` before converting them) with the try/except and `isdigit`
+versions they replaced, on a clean corpus of numbers and a dirty one where
+most values aren't numbers.
+
+`float_eval` (which still just calls `float()`, since a successful call is a
+single pass already and beats any pre-scan) and the column-wise evals are
+included for reference.
+
+Run from the repository root:
+
+    python benchmarks/bench_number_scan.py
+"""
+import random
+import timeit
+
+from ccptools.tpu.casting import bool_eval, float_eval, float_eval_many, int_eval, int_eval_many
+
+
+def old_int_eval(value, default=0):
+    try:
+        return int(value, base=0)
+    except (TypeError, ValueError):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return default
+
+
+def old_bool_eval(value):
+    value = value.strip().lower()
+    if value in ('active', 'enable', 'enabled', 'on', 'true', 'yes', 'y'):
+        return True
+    elif value.isdigit():
+        return bool(int(value))
+    neg = False
+    if value.startswith('-'):
+        value = value[1:]
+        neg = True
+        if value.isdigit():
+            return bool(-int(value))
+    parts = value.split('.')
+    if len(parts) == 2 and parts[0].isdigit() and parts[1].isdigit():
+        return bool(-float(value)) if neg else bool(float(value))
+    return False
+
+
+def make_corpora(n: int = 100000):
+    rnd = random.Random(42)
+
+    def number():
+        if rnd.random() < 0.5:
+            return str(rnd.randint(-10 ** 6, 10 ** 6))
+        return f'{rnd.uniform(-1e6, 1e6):.3f}'
+
+    junk = ['n/a', '', 'NULL', '-', 'unknown', '1,234', '12 345', 'TBD', '#VALUE!', 'none']
+    clean = [number() for _ in range(n)]
+    dirty = [number() if rnd.random() < 0.2 else rnd.choice(junk) for _ in range(n)]
+    return clean, dirty
+
+
+def main():
+    for corpus_name, corpus in zip(('clean', 'dirty'), make_corpora()):
+        print(f'{corpus_name} corpus ({len(corpus):,} values)')
+        cases = [
+            ('int_eval (try/except)', lambda: [old_int_eval(v) for v in corpus]),
+            ('int_eval', lambda: [int_eval(v) for v in corpus]),
+            ('int_eval_many', lambda: int_eval_many(corpus)),
+            ('float_eval', lambda: [float_eval(v) for v in corpus]),
+            ('float_eval_many', lambda: float_eval_many(corpus)),
+            ('bool_eval (isdigit)', lambda: [old_bool_eval(v) for v in corpus]),
+            ('bool_eval', lambda: [bool_eval(v) for v in corpus]),
+        ]
+        for name, func in cases:
+            best = min(timeit.repeat(func, number=3, repeat=3)) / 3
+            print(f'  {name:<25} {best * 1000:>8.2f} ms   {len(corpus) / best:>12,.0f} values/s')
+
+
+if __name__ == '__main__':
+    main()
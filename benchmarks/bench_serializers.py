@@ -0,0 +1,56 @@
+"""Compares `BinarySerializer` against `JsonSafeSerializer` + `json.dumps`.
+
+Run from the repository root:
+
+    python benchmarks/bench_serializers.py
+"""
+import datetime
+import decimal
+import json
+import timeit
+
+from ccptools.tpu.structs.serializers import *
+
+
+def make_payload(n: int = 1000):
+    now = datetime.datetime(2024, 5, 22, 12, 30, 15, 123456)
+    return {
+        'rows': [
+            {
+                'id': i,
+                'name': f'character_{i}',
+                'isk': decimal.Decimal('%d.%02d' % (i * 1000, i % 100)),
+                'created': now + datetime.timedelta(seconds=i),
+                'birthday': datetime.date(2003, 5, 6),
+                'online_for': datetime.timedelta(minutes=i),
+                'blob': b'\x00\x01\x02\x03' * 8,
+                'skills': list(range(i % 20)),
+            } for i in range(n)
+        ]
+    }
+
+
+def main():
+    payload = make_payload()
+    json_safe = JsonSafeSerializer()
+    binary = BinarySerializer()
+    decoder = BinaryDecoder()
+
+    encoded_json = json.dumps(json_safe.serialize(payload))
+    encoded_binary = binary.serialize(payload)
+
+    cases = [
+        ('JsonSafeSerializer + json.dumps', lambda: json.dumps(json_safe.serialize(payload))),
+        ('BinarySerializer', lambda: binary.serialize(payload)),
+        ('json.loads', lambda: json.loads(encoded_json)),
+        ('BinaryDecoder', lambda: decoder.decode(encoded_binary)),
+    ]
+    print(f'json size:   {len(encoded_json):>10,} bytes')
+    print(f'binary size: {len(encoded_binary):>10,} bytes')
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=5, repeat=3)) / 5
+        print(f'{name:<35} {best * 1000:>10.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
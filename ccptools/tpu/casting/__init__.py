@@ -2,6 +2,7 @@ from ccptools._common import decode_bytes  # noqa
 from ccptools.tpu.structs.serializers import *
 
 from ._evals import *
+from ._scan import *
 from ._ip import *
 from ._mask import *
 from ._params import *
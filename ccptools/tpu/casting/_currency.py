@@ -1,9 +1,16 @@
 __all__ = [
     'parse_currency_text',
+    'CurrencyLocale',
+    'CurrencyParser',
+    'get_currency_parser',
+    'parse_currency',
+    'parse_currencies',
 ]
 
 from ccptools.tpu.structs import *
+import functools
 
+from ._evals import float_eval
 
 _CURRENCY_REGEX = re.compile(r'(?i)^(?P<curr1>(?:[^0-9 \+\-])*)? *(?P<sign1>[\+\-])? *(?P<amount>(?:[0-9]|[\.\,])+) *(?P<sign2>[\+\-])? *(?P<curr2>(?:[^0-9 \+\-])*)?$')
 
@@ -16,7 +23,6 @@ def parse_currency_text(text: str) -> Tuple[Optional[str], Optional[float]]:
     :return:
     :rtype:
     """
-    from ccptools.tpu.casting import float_eval
     m = _CURRENCY_REGEX.match(text)
     if m:
         currency = ''
@@ -50,3 +56,196 @@ def parse_currency_text(text: str) -> Tuple[Optional[str], Optional[float]]:
         return currency, amount
 
     return None, None
+
+
+class CurrencyLocale(NamedTuple):
+    """How a locale writes amounts: its decimal separator and the separators
+    it groups thousands with.
+    """
+    decimal: str
+    groups: Tuple[str, ...]
+
+
+_DOT_DECIMAL = CurrencyLocale('.', (',',))
+_COMMA_DECIMAL = CurrencyLocale(',', ('.',))
+_SPACE_GROUPS = CurrencyLocale(',', (' ', '\u00a0', '\u202f'))  # Plain, no-break and narrow no-break spaces
+_APOSTROPHE_GROUPS = CurrencyLocale('.', ("'", '\u2019'))
+
+# Locales by language (or language_territory where that differs)
+_LOCALES: Dict[str, CurrencyLocale] = {
+    **{lang: _DOT_DECIMAL for lang in ('en', 'ja', 'zh', 'ko', 'th', 'he', 'ms', 'tl', 'es_mx', 'es_us')},
+    **{lang: _COMMA_DECIMAL for lang in ('de', 'nl', 'es', 'it', 'pt', 'da', 'id', 'tr', 'is', 'el', 'ro', 'hr',
+                                         'sl', 'sr', 'vi')},
+    **{lang: _SPACE_GROUPS for lang in ('fr', 'sv', 'nb', 'nn', 'no', 'fi', 'pl', 'cs', 'sk', 'ru', 'uk', 'hu',
+                                        'bg', 'et', 'lt', 'lv', 'pt_pt')},
+    **{lang: _APOSTROPHE_GROUPS for lang in ('de_ch', 'fr_ch', 'it_ch', 'rm', 'de_li')},
+}
+
+# Currencies that don't have 2 decimals of minor units (ISO 4217)
+_MINOR_DIGITS: Dict[str, int] = {
+    **{code: 0 for code in ('JPY', 'KRW', 'ISK', 'VND', 'CLP', 'PYG', 'UGX', 'XAF', 'XOF', 'XPF', '¥', '₩')},
+    **{code: 3 for code in ('BHD', 'IQD', 'JOD', 'KWD', 'LYD', 'OMR', 'TND')},
+}
+
+_SIGNS = '+\\-\u2212'  # Including the Unicode minus sign
+_MEMO_LIMIT = 4096  # Unique texts remembered per call by CurrencyParser.parse_many
+
+T_AMOUNT = Tuple[Optional[str], Optional[Union[decimal.Decimal, int]]]
+
+
+class CurrencyParser(object):
+    """Parses amounts of money like "$1,234.56", "1.234,56 EUR" or "-12 kr" for a
+    given locale into (currency, amount) tuples, with the amount as an exact
+    `Decimal` or an int of minor units (e.g. cents).
+
+    Thousands have to be grouped properly (in threes), so amounts written for
+    a different locale don't silently parse as something else: "1.234,56"
+    doesn't parse with the "en" locale (and "1,5" doesn't either) so those
+    give (None, None), just like anything else that isn't an amount.
+    Either side of the decimal separator may be left out though (".99" or
+    "5.").
+
+    The currency is whatever non-numeric text comes before and/or after the
+    amount (an empty string if there's none), and the sign can go before or
+    after the amount or the currency (but there can only be one sign).
+
+    Use `get_currency_parser` (or `parse_currency`) to get a cached parser per
+    locale.
+    """
+    __slots__ = ('locale', '_regex', '_groups')
+
+    def __init__(self, locale: Union[str, CurrencyLocale] = 'en'):
+        if not isinstance(locale, CurrencyLocale):
+            locale = _resolve_locale(locale)
+        self.locale = locale
+        decimal_sep = re.escape(locale.decimal)
+        group_sep = '|'.join(re.escape(g) for g in locale.groups)
+        # The currency can't contain the separators either, so "$.99" or
+        # "5." don't end up with "$." or "." as their currency
+        currency = f'[^\\d\\s{_SIGNS}{re.escape(locale.decimal + "".join(locale.groups))}]+'
+        # The text is stripped before matching, and every run of whitespace
+        # is tied to the token right after (or before) it, so there's only
+        # ever one way to match the whitespace (the run of optional \s*
+        # this used to have backtracked polynomially on long whitespace)
+        self._regex = re.compile(
+            rf'(?:(?P<sign0>[{_SIGNS}])\s*)?(?:(?P<curr1>{currency})\s*)?(?:(?P<sign1>[{_SIGNS}])\s*)?'
+            rf'(?:(?P<int>\d{{1,3}}(?:(?:{group_sep})\d{{3}})+|\d+)(?:{decimal_sep}(?P<frac>\d*))?'
+            rf'|{decimal_sep}(?P<cents>\d+))'
+            rf'(?:\s*(?P<sign2>[{_SIGNS}]))?(?:\s*(?P<curr2>{currency}))?(?:\s*(?P<sign3>[{_SIGNS}]))?')
+        self._groups = locale.groups
+
+    def __repr__(self):
+        return f'CurrencyParser({self.locale!r})'
+
+    def parse(self,
+              text: str,
+              minor_units: bool = False,
+              minor_digits: Optional[int] = None,
+              rounding: str = decimal.ROUND_HALF_EVEN) -> T_AMOUNT:
+        """Parses the given text into a (currency, amount) tuple, or (None,
+        None) if it isn't an amount of money.
+
+        :param minor_units: Return the amount as an int of minor units (e.g.
+                            cents) instead of a `Decimal`
+        :param minor_digits: The number of decimals of the minor units (by
+                             default looked up by currency code, e.g. 0 for
+                             JPY, and 2 for anything else)
+        :param rounding: How amounts with more decimals than the minor units
+                         have are rounded (a `decimal` rounding mode)
+        """
+        m = self._regex.fullmatch(text.strip())
+        if m is None:
+            return None, None
+
+        curr1, curr2 = m.group('curr1'), m.group('curr2')
+        if curr1 and curr2 and curr1.lower() != curr2.lower():
+            currency = f'{curr1}/{curr2}'
+        else:
+            currency = curr1 or curr2 or ''
+
+        digits = m.group('int')
+        if digits is None:  # Just a fraction, like ".99"
+            amount = decimal.Decimal(f'0.{m.group("cents")}')
+        else:
+            for group in self._groups:
+                digits = digits.replace(group, '')
+            frac = m.group('frac')  # May be empty, like in "5."
+            amount = decimal.Decimal(f'{digits}.{frac}' if frac else digits)
+        signs = [sign for sign in m.group('sign0', 'sign1', 'sign2', 'sign3') if sign]
+        if signs:
+            if len(signs) > 1:  # E.g. "--5" or "+5-"
+                return None, None
+            if signs[0] != '+':
+                amount = -amount
+
+        if not minor_units:
+            return currency, amount
+        if minor_digits is None:
+            minor_digits = _MINOR_DIGITS.get(currency.upper(), 2)
+        return currency, int(amount.scaleb(minor_digits).to_integral_value(rounding))
+
+    def parse_many(self,
+                   texts: Iterable[str],
+                   minor_units: bool = False,
+                   minor_digits: Optional[int] = None,
+                   rounding: str = decimal.ROUND_HALF_EVEN) -> List[T_AMOUNT]:
+        """Parses many texts (e.g. a price list) at once, like `parse` would,
+        only parsing each unique text once (up to a few thousand of them).
+        """
+        memo = {}
+        out = []
+        append = out.append
+        for text in texts:
+            hit = memo.get(text)
+            if hit is None:
+                hit = self.parse(text, minor_units, minor_digits, rounding)
+                if len(memo) < _MEMO_LIMIT:
+                    memo[text] = hit
+            append(hit)
+        return out
+
+
+def _resolve_locale(locale: str) -> CurrencyLocale:
+    name = locale.split('.')[0].replace('-', '_').lower()  # E.g. "de-CH" or "de_CH.UTF-8"
+    hit = _LOCALES.get(name) or _LOCALES.get(name.split('_')[0])
+    if hit is None:
+        raise ValueError(f'Unknown locale "{locale}" (pass a CurrencyLocale for locales that aren\'t built in)')
+    return hit
+
+
+@functools.lru_cache(maxsize=None)
+def get_currency_parser(locale: Union[str, CurrencyLocale] = 'en') -> CurrencyParser:
+    """Returns the (cached) `CurrencyParser` for the given locale, given as a
+    name like "en", "de_DE" or "fr-CH" or as a `CurrencyLocale`.
+
+    :raises ValueError: If the locale isn't known
+    """
+    return CurrencyParser(locale)
+
+
+def parse_currency(text: str,
+                   locale: Union[str, CurrencyLocale] = 'en',
+                   minor_units: bool = False,
+                   minor_digits: Optional[int] = None,
+                   rounding: str = decimal.ROUND_HALF_EVEN) -> T_AMOUNT:
+    """Parses a text like "$1,234.56" or "1.234,56 EUR" (for the given locale)
+    into a (currency, amount) tuple with an exact `Decimal` amount (or an int
+    of minor units), or (None, None) if it isn't an amount of money. See
+    `CurrencyParser`.
+
+    Example:
+    >>> parse_currency('1.234,56 €', 'de'), parse_currency('$1,234.56', minor_units=True)
+    (('€', Decimal('1234.56')), ('$', 123456))
+    """
+    return get_currency_parser(locale).parse(text, minor_units, minor_digits, rounding)
+
+
+def parse_currencies(texts: Iterable[str],
+                     locale: Union[str, CurrencyLocale] = 'en',
+                     minor_units: bool = False,
+                     minor_digits: Optional[int] = None,
+                     rounding: str = decimal.ROUND_HALF_EVEN) -> List[T_AMOUNT]:
+    """Batch version of `parse_currency` for price lists (see
+    `CurrencyParser.parse_many`).
+    """
+    return get_currency_parser(locale).parse_many(texts, minor_units, minor_digits, rounding)
@@ -3,10 +3,25 @@ __all__ = [
     'int_eval',
     'bool_eval',
     'enum_eval',
+    'enum_eval_many',
+    'float_eval_many',
+    'int_eval_many',
+    'bool_eval_many',
+    'CastColumn',
 ]
 
 from ccptools.tpu.structs import *
 from ccptools._common import decode_bytes  # noqa
+import array
+import collections
+import math
+import weakref
+
+from ._scan import NumberKind, scan_number
+
+_INT = NumberKind.INT
+_PREFIXED_INT = NumberKind.PREFIXED_INT
+_FLOAT = NumberKind.FLOAT
 
 _AFFIRMATIVE = {
     'active',
@@ -92,18 +107,25 @@ def int_eval(value: Any, default: Union[int, None] = 0, raise_on_fail: bool = Fa
         return int(value)
 
     elif isinstance(value, (str, bytes)):
-        try:
+        kind = scan_number(value)
+        if kind is _INT:
+            try:
+                return int(value)
+            except ValueError:  # More digits than sys.get_int_max_str_digits() allows
+                pass
+
+        elif kind is _PREFIXED_INT:
             return int(value, base=0)
 
-        except (TypeError, ValueError):
-            try:
-                return int(float(value))
+        elif kind is _FLOAT:
+            f = float(value)
+            if math.isfinite(f):
+                return int(f)
 
-            except (TypeError, ValueError):
-                if raise_on_fail:
-                    raise
+        if raise_on_fail:
+            raise ValueError(f'invalid literal for int(): {value!r}')
 
-                return default
+        return default
 
     elif isinstance(value, datetime.timedelta):
         return int(value.total_seconds())
@@ -146,8 +168,10 @@ def bool_eval(value: Any, raise_on_fail: bool = False) -> bool:
     - yes
     - y
 
-    Strings and unicode strings that are longs, integers or floats evaluate to
-    the same as their "pure" types (int, float) would evaluate to.
+    Strings and unicode strings that are longs, integers (including 0x, 0o and
+    0b prefixed ones) or floats evaluate to the same as their "pure" types
+    (int, float) would evaluate to, except for "inf" and "nan" which aren't
+    explicit enough to count as True.
 
     Longs, Integers and Floating number evaluate to False if they are 0L, 0 and
     0.0 respectively, anything else is True.
@@ -178,34 +202,59 @@ def bool_eval(value: Any, raise_on_fail: bool = False) -> bool:
         if value in _AFFIRMATIVE:
             return True
 
-        elif value.isdigit():
-            return bool(int(value))
+        kind = scan_number(value)
+        if kind is _INT or kind is _FLOAT:
+            # Decimal ints too, since float() has no limit on the number of
+            # digits (and is only zero for zeros)
+            return bool(float(value))
 
-        else:
-            neg = False
-            if value.startswith('-'):
-                value = value[1:]
-                neg = True
-                if value.isdigit():
-                    return bool(-int(value))
-            parts = value.split('.')
-            if len(parts) == 2:
-                if parts[0].isdigit() and parts[1].isdigit():
-                    if neg:
-                        return bool(-float(value))
-                    else:
-                        return bool(float(value))
-            return False
+        elif kind is _PREFIXED_INT:
+            return bool(int(value, base=0))
+
+        return False
     elif isinstance(value, (int, float)):
         return bool(value)
     else:
         return False
 
 
-def enum_eval(value: Any,
-              enum_class: Type[_T_ENUM_CLASS],
-              default: Union[_T_ENUM_CLASS, None] = None,
-              raise_on_fail: bool = False) -> _T_ENUM_CLASS:
+class _EnumTable(object):
+    """Precomputed lookup tables of an enum class for `enum_eval`."""
+    __slots__ = ('by_name', 'by_lower_name', 'by_value', 'by_value_str')
+
+    def __init__(self, enum_class: Type[enum.Enum]):
+        self.by_name: Dict[str, enum.Enum] = dict(enum_class.__members__)
+        self.by_lower_name: Dict[str, enum.Enum] = {}
+        self.by_value: Dict[Hashable, enum.Enum] = {}
+        self.by_value_str: Dict[str, enum.Enum] = {}
+        for name, member in self.by_name.items():
+            self.by_lower_name.setdefault(name.lower(), member)
+        for member in enum_class:  # Canonical members win over aliases
+            self.by_lower_name[member.name.lower()] = member
+            try:
+                self.by_value.setdefault(member.value, member)
+            except TypeError:  # Unhashable value
+                pass
+            if isinstance(member.value, str):
+                self.by_value_str.setdefault(member.value.strip().lower(), member)
+
+
+# Enum class -> its lookup tables (enum classes can't change once created)
+_enum_tables: 'weakref.WeakKeyDictionary[Type[enum.Enum], _EnumTable]' = weakref.WeakKeyDictionary()
+
+
+def _get_enum_table(enum_class: Type[enum.Enum]) -> _EnumTable:
+    table = _enum_tables.get(enum_class)
+    if table is None:
+        table = _enum_tables[enum_class] = _EnumTable(enum_class)
+    return table
+
+
+def _enum_eval(value: Any,
+               enum_class: Type[_T_ENUM_CLASS],
+               table: _EnumTable,
+               default: Union[_T_ENUM_CLASS, None],
+               raise_on_fail: bool) -> _T_ENUM_CLASS:
     if isinstance(value, enum_class):
         return value
 
@@ -221,19 +270,31 @@ def enum_eval(value: Any,
             return default
 
     if isinstance(value, str):
-        hit = {o.name.lower(): o for o in enum_class}.get(value.strip().lower(), None)
+        hit = table.by_name.get(value)
         if hit is not None:
             return hit
-        try:
+        key = value.strip().lower()
+        hit = table.by_lower_name.get(key)
+        if hit is None:
+            hit = table.by_value_str.get(key)
+        if hit is not None:
+            return hit
+        kind = scan_number(value)
+        if kind is _INT:
+            value = int(value)
+        elif kind is _PREFIXED_INT:
             value = int(value, base=0)
-        except ValueError:
+        else:
             if raise_on_fail:
                 raise ValueError(f'{value!r} is not a valid {enum_class.__name__}')
             return default
 
     if isinstance(value, int):
+        hit = table.by_value.get(value)
+        if hit is not None:
+            return hit
         try:
-            return enum_class(value)
+            return enum_class(value)  # E.g. combinations of flags or a _missing_ hook
         except ValueError:
             if raise_on_fail:
                 raise
@@ -243,3 +304,228 @@ def enum_eval(value: Any,
         raise ValueError(f'{value!r} is not a valid {enum_class.__name__}')
 
     return default
+
+
+def enum_eval(value: Any,
+              enum_class: Type[_T_ENUM_CLASS],
+              default: Union[_T_ENUM_CLASS, None] = None,
+              raise_on_fail: bool = False) -> _T_ENUM_CLASS:
+    """Safe evaluation of any value to a member of the given enum class, by
+    name (case insensitive), value (or a string of a value) or from a member
+    of another enum with the same value.
+
+    The lookup tables for each enum class are built once and cached.
+
+    Example:
+    >>> enum_eval(' delta ', SomeEnum), enum_eval('0b10', SomeEnum), enum_eval('Yomama', SomeEnum)
+    (<SomeEnum.DELTA: 2>, <SomeEnum.DELTA: 2>, None)
+    """
+    return _enum_eval(value, enum_class, _get_enum_table(enum_class), default, raise_on_fail)
+
+
+def enum_eval_many(values: Iterable[Any],
+                   enum_class: Type[_T_ENUM_CLASS],
+                   default: Union[_T_ENUM_CLASS, None] = None,
+                   raise_on_fail: bool = False) -> List[_T_ENUM_CLASS]:
+    """Column-wise `enum_eval`, giving the same results.
+
+    Strings and ints are only evaluated once per unique value.
+    """
+    table = _get_enum_table(enum_class)
+    memo: Dict[Union[str, bytes, int], Optional[_T_ENUM_CLASS]] = {}
+    out = []
+    append = out.append
+    for v in values:
+        t = type(v)
+        if t is enum_class:
+            append(v)
+        elif t is str or t is int or t is bytes:
+            try:
+                append(memo[v])
+            except KeyError:
+                r = _enum_eval(v, enum_class, table, default, raise_on_fail)
+                if len(memo) < _MEMO_LIMIT:
+                    memo[v] = r
+                append(r)
+        else:
+            append(_enum_eval(v, enum_class, table, default, raise_on_fail))
+    return out
+
+
+_OUTPUT_LIST = 'list'
+_OUTPUT_ARRAY = 'array'
+_OUTPUT_NUMPY = 'numpy'
+_OUTPUTS = (_OUTPUT_LIST, _OUTPUT_ARRAY, _OUTPUT_NUMPY)
+
+_SAMPLE_SIZE = 64  # Values looked at to find the dominant type of a column
+_MEMO_LIMIT = 4096  # Unique strings remembered per column by bool_eval_many
+
+# Conversions that give the same result as float_eval/int_eval when they
+# succeed, per input type (anything else, or a failure, goes through the evals)
+_FLOAT_FAST = {float: float, int: float, bool: float, str: float, bytes: float}
+_INT_FAST = {int: int, bool: int, float: int, str: int, bytes: int}
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+class CastColumn(NamedTuple):
+    """The result of the `*_eval_many` functions with array or NumPy output."""
+    values: Any
+    """An `array.array` or NumPy array of the cast values (0 where they failed)"""
+    failed: Any
+    """A `bytearray` or NumPy bool array that's truthy where casting failed"""
+
+
+def _dominant_type(values: Sequence[Any]) -> Optional[type]:
+    counts = collections.Counter(map(type, values[:_SAMPLE_SIZE]))
+    return counts.most_common(1)[0][0] if counts else None
+
+
+def _cast_column(values: Sequence[Any],
+                 fast_casts: Dict[type, Callable[[Any], Any]],
+                 slow_cast: Callable[[Any, Any, bool], Any],
+                 fill: Any,
+                 raise_on_fail: bool) -> Tuple[List[Any], List[int]]:
+    """Returns a list of the cast values (`fill` for failures) and the indexes
+    of the failures.
+
+    Values of the dominant type of the column are cast directly, anything else
+    (or anything that fails that way) goes through `slow_cast` (one of the
+    scalar evals).
+    """
+    dominant = _dominant_type(values)
+    fast = fast_casts.get(dominant)
+    if fast is None:
+        dominant = None  # Nothing to specialize on
+    out = []
+    failed = []
+    misses = 0
+    append = out.append
+    for i, v in enumerate(values):
+        if type(v) is dominant:
+            try:
+                append(fast(v))
+                continue
+            except (TypeError, ValueError, OverflowError):
+                misses += 1
+                if misses > _SAMPLE_SIZE and misses * 4 > i:
+                    dominant = None  # Too dirty, the evals handle failures without raising
+        r = slow_cast(v, None, raise_on_fail)
+        if r is None:
+            failed.append(i)
+            append(fill)
+        else:
+            append(r)
+    return out, failed
+
+
+def _eval_many(values: Iterable[Any],
+               fast_casts: Dict[type, Callable[[Any], Any]],
+               slow_cast: Callable[[Any, Any, bool], Any],
+               typecode: str,
+               default: Any,
+               output: str,
+               raise_on_fail: bool) -> Union[List[Any], CastColumn]:
+    if output not in _OUTPUTS:
+        raise ValueError(f'Unknown output "{output}" (should be one of {", ".join(_OUTPUTS)})')
+    if not isinstance(values, (list, tuple)):
+        values = list(values)
+
+    if output == _OUTPUT_LIST:
+        return _cast_column(values, fast_casts, slow_cast, default, raise_on_fail)[0]
+
+    out, failed = _cast_column(values, fast_casts, slow_cast, 0, raise_on_fail)
+    try:
+        arr = array.array(typecode, out)
+    except OverflowError:  # Ints that don't fit 64 bits
+        if raise_on_fail:
+            raise
+        for i, v in enumerate(out):
+            if not _INT64_MIN <= v <= _INT64_MAX:
+                out[i] = 0
+                failed.append(i)
+        arr = array.array(typecode, out)
+    mask = bytearray(len(values))
+    for i in failed:
+        mask[i] = 1
+    if output == _OUTPUT_NUMPY:
+        import numpy
+        return CastColumn(numpy.frombuffer(arr, dtype=numpy.dtype(typecode)),
+                          numpy.frombuffer(mask, dtype=numpy.bool_))
+    return CastColumn(arr, mask)
+
+
+def float_eval_many(values: Iterable[Any],
+                    default: Union[float, None] = 0.0,
+                    output: str = _OUTPUT_LIST,
+                    raise_on_fail: bool = False) -> Union[List[Optional[float]], CastColumn]:
+    """Column-wise `float_eval` for casting many values (e.g. a varchar
+    column of a CSV file or DB table) in one go, giving the same results.
+
+    The dominant type of the column is detected once (from the first values)
+    and values of that type are cast with a loop specialized for it, falling
+    back to `float_eval` for the rest.
+
+    :param output: "list" for a list of floats (with `default` where casting
+                   failed), "array" for a `CastColumn` of an `array('d')` and
+                   a failure mask or "numpy" for a `CastColumn` of NumPy
+                   arrays (needs NumPy)
+
+    Example:
+    >>> float_eval_many(['1.5', '2', 'n/a'], output='array')
+    CastColumn(values=array('d', [1.5, 2.0, 0.0]), failed=bytearray(b'\\x00\\x00\\x01'))
+    """
+    return _eval_many(values, _FLOAT_FAST, float_eval, 'd', default, output, raise_on_fail)
+
+
+def int_eval_many(values: Iterable[Any],
+                  default: Union[int, None] = 0,
+                  output: str = _OUTPUT_LIST,
+                  raise_on_fail: bool = False) -> Union[List[Optional[int]], CastColumn]:
+    """Column-wise `int_eval` (see `float_eval_many`).
+
+    Array and NumPy output uses 64 bit ints (`array('q')`) so values that
+    don't fit are counted as failures.
+    """
+    return _eval_many(values, _INT_FAST, int_eval, 'q', default, output, raise_on_fail)
+
+
+def bool_eval_many(values: Iterable[Any],
+                   output: str = _OUTPUT_LIST,
+                   raise_on_fail: bool = False) -> Union[List[bool], 'array.array', Any]:
+    """Column-wise `bool_eval`, giving the same results.
+
+    Strings (and bytes) are only evaluated once per unique value, since
+    columns of flags tend to repeat the same few.
+
+    :param output: "list" for a list of bools, "array" for an `array('B')` of
+                   ones and zeros or "numpy" for a NumPy bool array (there's
+                   no failure mask since `bool_eval` doesn't fail)
+    """
+    if output not in _OUTPUTS:
+        raise ValueError(f'Unknown output "{output}" (should be one of {", ".join(_OUTPUTS)})')
+    memo: Dict[Union[str, bytes], bool] = {}
+    out = []
+    append = out.append
+    for v in values:
+        t = type(v)
+        if t is bool:
+            append(v)
+        elif t is str or t is bytes:
+            r = memo.get(v)
+            if r is None:
+                r = bool_eval(v, raise_on_fail)
+                if len(memo) < _MEMO_LIMIT:
+                    memo[v] = r
+            append(r)
+        elif t is int or t is float:
+            append(v != 0)
+        else:
+            append(bool_eval(v, raise_on_fail))
+    if output == _OUTPUT_LIST:
+        return out
+    arr = array.array('B', out)
+    if output == _OUTPUT_NUMPY:
+        import numpy
+        return numpy.frombuffer(arr, dtype=numpy.bool_)
+    return arr
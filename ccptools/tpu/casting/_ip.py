@@ -1,8 +1,31 @@
 __all__ = [
     'ip_to_int',
     'int_to_ip',
+    'ipv6_to_int',
+    'int_to_ipv6',
+    'ips_to_array',
+    'IPNetwork',
+    'parse_cidr',
+    'CidrIndex',
 ]
 
+from ccptools.tpu.structs import *
+import array
+import bisect
+import functools
+import socket
+import sys
+
+_V4_BITS = 32
+_V6_BITS = 128
+_V4_MAX = (1 << _V4_BITS) - 1
+_V6_MAX = (1 << _V6_BITS) - 1
+
+# Unsigned 32 bit array typecode ("I" is 32 bits on every common platform)
+_V4_TYPECODE = 'I' if array.array('I').itemsize == 4 else 'L'
+
+_pton_v4 = functools.partial(socket.inet_pton, socket.AF_INET)
+
 
 def ip_to_int(ip):
     """
@@ -13,6 +36,11 @@ def ip_to_int(ip):
     :rtype: int
     :raises ValueError: If the given string is not a valid IP address
     """
+    try:
+        return int.from_bytes(_pton_v4(ip), 'big')  # Takes the plain dotted form only
+    except (OSError, TypeError, ValueError):  # ValueError for embedded NULs
+        pass  # Leading zeros, whitespace etc. are still accepted below
+
     parts = ip.split('.')
     if len(parts) != 4:
         raise ValueError('Not a valid IP address')
@@ -49,6 +77,8 @@ def int_to_ip(i):
     :return:
     :rtype: str
     """
+    if 0 <= i <= _V4_MAX:
+        return socket.inet_ntop(socket.AF_INET, i.to_bytes(4, 'big'))
     d = i & 0xFF
     i >>= 8
     c = i & 0xFF
@@ -56,3 +86,245 @@ def int_to_ip(i):
     b = i & 0xFF
     a = i >> 8
     return '%s.%s.%s.%s' % (a, b, c, d)
+
+
+def ipv6_to_int(ip: str) -> int:
+    """Converts an IPv6 address (in any of its standard forms, including IPv4
+    mapped ones like "::ffff:1.2.3.4") to a 128 bit int.
+
+    :raises ValueError: If the given string is not a valid IPv6 address
+    """
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), 'big')
+    except (OSError, TypeError, ValueError):  # ValueError for embedded NULs
+        raise ValueError(f'Not a valid IPv6 address: {ip!r}') from None
+
+
+def int_to_ipv6(i: int) -> str:
+    """Converts a 128 bit int to the compressed text form of an IPv6 address."""
+    if not 0 <= i <= _V6_MAX:
+        raise ValueError(f'Not a valid IPv6 address: {i!r}')
+    return socket.inet_ntop(socket.AF_INET6, i.to_bytes(16, 'big'))
+
+
+def ips_to_array(ips: Union[bytes, bytearray, str, Iterable[Union[str, bytes]]],
+                 sep: Optional[str] = None,
+                 skip_invalid: bool = False) -> 'array.array':
+    """Converts many IPv4 addresses at once to an `array('I')` of their ints.
+
+    The addresses can be given as a text (or bytes) buffer, e.g. a whole file
+    of connection logs, split on `sep` (any whitespace by default), or as an
+    iterable of strings. Empty parts of a buffer (like blank lines) are
+    skipped.
+
+    The whole batch is converted in C (`socket.inet_pton` and
+    `array.frombytes`); only if that fails is it redone one address at a time,
+    falling back to `ip_to_int` for forms `inet_pton` doesn't take (like
+    leading zeros) and raising or skipping the invalid ones.
+
+    :raises ValueError: If any address is invalid and `skip_invalid` isn't set
+
+    Example:
+    >>> ips_to_array(b'10.0.0.1\\n192.168.1.7\\n')
+    array('I', [167772161, 3232235783])
+    """
+    if isinstance(ips, (bytes, bytearray)):
+        ips = ips.decode('latin-1')
+    if isinstance(ips, str):
+        parts = ips.split(sep)
+        if sep is not None:  # E.g. the trailing newline of a file (splitting on whitespace drops those already)
+            parts = [p for p in parts if p]
+    else:
+        parts = [p.decode('latin-1') if isinstance(p, (bytes, bytearray)) else p for p in ips]
+
+    try:
+        packed = b''.join(map(_pton_v4, parts))
+    except (OSError, TypeError, ValueError):  # ValueError for embedded NULs
+        ints = []
+        for p in parts:
+            try:
+                ints.append(ip_to_int(p))
+            except (ValueError, TypeError, AttributeError):
+                if not skip_invalid:
+                    raise ValueError(f'Not a valid IP address: {p!r}') from None
+        return array.array(_V4_TYPECODE, ints)
+
+    arr = array.array(_V4_TYPECODE)
+    arr.frombytes(packed)
+    if sys.byteorder == 'little':
+        arr.byteswap()  # inet_pton gives network (big endian) order
+    return arr
+
+
+class IPNetwork(NamedTuple):
+    """An IPv4 or IPv6 network (CIDR block) as ints (see `parse_cidr`)."""
+    network: int
+    prefix_len: int
+    version: int = 4
+
+    @property
+    def bits(self) -> int:
+        return _V4_BITS if self.version == 4 else _V6_BITS
+
+    @property
+    def first(self) -> int:
+        return self.network
+
+    @property
+    def last(self) -> int:
+        return self.network | ((1 << (self.bits - self.prefix_len)) - 1)
+
+    @property
+    def netmask(self) -> int:
+        host_bits = self.bits - self.prefix_len
+        return ((1 << self.prefix_len) - 1) << host_bits
+
+    def contains(self, ip: int) -> bool:
+        """Is the given address (as an int of the same version) in this network?"""
+        return self.network <= ip <= self.last
+
+    def __str__(self):
+        if self.version == 4:
+            return f'{int_to_ip(self.network)}/{self.prefix_len}'
+        return f'{int_to_ipv6(self.network)}/{self.prefix_len}'
+
+
+def parse_cidr(cidr: str, strict: bool = False) -> IPNetwork:
+    """Parses an IPv4 or IPv6 network in CIDR notation (e.g. "10.0.0.0/8" or
+    "2001:db8::/32"). A plain address is a network of just that address.
+
+    Host bits set in the address are cleared, unless `strict` is set in which
+    case that raises a ValueError.
+
+    :raises ValueError: If the given string is not a valid network
+
+    Example:
+    >>> parse_cidr('192.168.1.0/24')
+    IPNetwork(network=3232235776, prefix_len=24, version=4)
+    """
+    address, slash, prefix = cidr.strip().partition('/')
+    if ':' in address:
+        version, bits, ip = 6, _V6_BITS, ipv6_to_int(address)
+    else:
+        version, bits, ip = 4, _V4_BITS, ip_to_int(address)
+    if slash:
+        if not (prefix.isascii() and prefix.isdigit()) or int(prefix) > bits:
+            raise ValueError(f'Not a valid network prefix length: {cidr!r}')
+        prefix_len = int(prefix)
+    else:
+        prefix_len = bits
+    network = ip & (((1 << prefix_len) - 1) << (bits - prefix_len))
+    if strict and network != ip:
+        raise ValueError(f'Host bits set in network: {cidr!r}')
+    return IPNetwork(network, prefix_len, version)
+
+
+class _IntervalTable(object):
+    """The networks of one IP version flattened into sorted, disjoint
+    intervals, each owned by the longest prefix covering it (or None).
+    """
+    __slots__ = ('starts', 'owners')
+
+    def __init__(self, networks: Iterable[Tuple[IPNetwork, Any]]):
+        self.starts: List[int] = []
+        self.owners: List[Optional[Tuple[IPNetwork, Any]]] = []
+
+        # CIDR blocks are either nested or disjoint, so sorting them by start
+        # (widest first) and sweeping with a stack of the open ones gives the
+        # most specific block for every point
+        stack: List[Tuple[IPNetwork, Any]] = []
+        for entry in sorted(networks, key=lambda e: (e[0].network, e[0].prefix_len)):
+            while stack and stack[-1][0].last < entry[0].network:
+                self._close(stack)
+            self._mark(entry[0].network, entry)
+            stack.append(entry)
+        while stack:
+            self._close(stack)
+
+    def _mark(self, start: int, owner: Optional[Tuple[IPNetwork, Any]]):
+        if self.starts and self.starts[-1] == start:
+            self.owners[-1] = owner
+        else:
+            self.starts.append(start)
+            self.owners.append(owner)
+
+    def _close(self, stack: List[Tuple[IPNetwork, Any]]):
+        ended = stack.pop()
+        self._mark(ended[0].last + 1, stack[-1] if stack else None)
+
+    def lookup(self, ip: int) -> Optional[Tuple[IPNetwork, Any]]:
+        i = bisect.bisect_right(self.starts, ip) - 1
+        return self.owners[i] if i >= 0 else None
+
+
+class CidrIndex(object):
+    """A longest-prefix-match index of IPv4 and IPv6 networks, e.g. for
+    finding which (most specific) subnet a connection comes from.
+
+    The networks are flattened into sorted, disjoint intervals when the index
+    is built, so each lookup is a single binary search no matter how many
+    (or how nested) the networks are.
+
+    Networks are given as CIDR strings (or `IPNetwork`s), either as a mapping
+    of networks to values or as an iterable (in which case each value is the
+    network's `IPNetwork`). If the same network is given twice, the last value
+    wins.
+
+    Addresses can be looked up as strings or as ints (IPv4 ones by default,
+    `version=6` for IPv6 ints).
+
+    Example:
+    >>> index = CidrIndex({'10.0.0.0/8': 'corp', '10.1.0.0/16': 'lab'})
+    >>> index.get('10.1.2.3'), index.get('10.2.0.1'), index.get('8.8.8.8')
+    ('lab', 'corp', None)
+    """
+    __slots__ = ('_v4', '_v6', '_len')
+
+    def __init__(self, networks: Union[Mapping[Union[str, IPNetwork], Any], Iterable[Union[str, IPNetwork]]]):
+        unique: Dict[IPNetwork, Any] = {}
+        if isinstance(networks, Mapping):
+            for net, value in networks.items():
+                unique[net if isinstance(net, IPNetwork) else parse_cidr(net)] = value
+        else:
+            for net in networks:
+                net = net if isinstance(net, IPNetwork) else parse_cidr(net)
+                unique[net] = net
+        self._len = len(unique)
+        self._v4 = _IntervalTable((n, v) for n, v in unique.items() if n.version == 4)
+        self._v6 = _IntervalTable((n, v) for n, v in unique.items() if n.version == 6)
+
+    def __len__(self):
+        return self._len
+
+    def __repr__(self):
+        return f'CidrIndex({self._len} networks)'
+
+    def lookup(self, ip: Union[str, int], version: int = 4) -> Optional[Tuple[IPNetwork, Any]]:
+        """Returns the (network, value) of the longest prefix the given address
+        is in, or None if it's in none of them.
+        """
+        if isinstance(ip, str):
+            if ':' in ip:
+                return self._v6.lookup(ipv6_to_int(ip))
+            return self._v4.lookup(ip_to_int(ip))
+        return (self._v4 if version == 4 else self._v6).lookup(ip)
+
+    def get(self, ip: Union[str, int], default: Any = None, version: int = 4) -> Any:
+        """Returns the value of the longest prefix the given address is in, or
+        the default if it's in none of them.
+        """
+        hit = self.lookup(ip, version)
+        return default if hit is None else hit[1]
+
+    def __contains__(self, ip: Union[str, int]) -> bool:
+        return self.lookup(ip) is not None
+
+    def get_many(self, ips: Iterable[int], default: Any = None, version: int = 4) -> List[Any]:
+        """Looks up the values for many addresses given as ints (e.g. an array
+        from `ips_to_array`) at once.
+        """
+        table = self._v4 if version == 4 else self._v6
+        starts = table.starts
+        owners = [default if o is None else o[1] for o in table.owners]
+        search = bisect.bisect_right
+        return [owners[i] if i >= 0 else default for i in (search(starts, ip) - 1 for ip in ips)]
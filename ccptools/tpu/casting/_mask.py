@@ -1,7 +1,34 @@
 __all__ = [
     'split_bitmask',
+    'join_bitmask',
+    'bitmask_positions',
+    'split_bitmasks',
+    'bitmask_columns',
+    'bitmask_to_flags',
+    'flags_to_bitmask',
 ]
 
+from ccptools.tpu.structs import *
+import functools
+import operator
+import weakref
+
+# Positions of the set bits of every byte value, per byte offset (for masks of
+# up to 64 bits, bigger ones are split bit by bit)
+_TABLE_BYTES = 8
+_BYTE_POSITIONS: List[List[Tuple[int, ...]]] = [
+    [tuple(offset * 8 + p for p in range(8) if b >> p & 1) for b in range(256)]
+    for offset in range(_TABLE_BYTES)
+]
+_TABLE_MAX = (1 << (_TABLE_BYTES * 8)) - 1
+
+_MEMO_LIMIT = 4096  # Unique masks remembered per call by split_bitmasks
+
+_T_FLAG = TypeVar('_T_FLAG', bound=enum.Flag)
+
+# Flag class -> its single bit members by value
+_flag_tables: 'weakref.WeakKeyDictionary[Type[enum.Flag], Dict[int, enum.Flag]]' = weakref.WeakKeyDictionary()
+
 
 def split_bitmask(composite_value):
     """Takes an int or long value representing a composite bitmask and returns
@@ -25,10 +52,141 @@ def split_bitmask(composite_value):
     :rtype:
     """
     buff = []
-    bitval = 1
     while composite_value > 0:
-        if composite_value & 1:
-            buff.append(bitval)
-        bitval *= 2
-        composite_value >>= 1
+        low = composite_value & -composite_value  # Lowest set bit
+        buff.append(low)
+        composite_value ^= low
     return buff
+
+
+def join_bitmask(values: Iterable[int]) -> int:
+    """The inverse of `split_bitmask`: combines bit flag values (or any masks)
+    into a single mask.
+
+        >>> join_bitmask([4, 8])
+        12
+    """
+    return functools.reduce(operator.or_, values, 0)
+
+
+def bitmask_positions(composite_value: int) -> List[int]:
+    """Returns the positions (0 being the lowest bit) of the bits set in the
+    given bitmask, using a precomputed table of the set bits of every byte.
+
+        >>> bitmask_positions(12)
+        [2, 3]
+    """
+    if composite_value <= 0:
+        return []
+    if composite_value > _TABLE_MAX:
+        positions = []
+        while composite_value:
+            low = composite_value & -composite_value
+            positions.append(low.bit_length() - 1)
+            composite_value ^= low
+        return positions
+
+    positions = []
+    extend = positions.extend
+    for table, b in zip(_BYTE_POSITIONS, composite_value.to_bytes(_TABLE_BYTES, 'little')):
+        if b:
+            extend(table[b])
+    return positions
+
+
+def split_bitmasks(composite_values: Iterable[int], positions: bool = False) -> List[List[int]]:
+    """Splits many bitmasks at once, like `split_bitmask` (or
+    `bitmask_positions` if `positions` is set) would, only splitting each
+    unique mask once.
+    """
+    split = bitmask_positions if positions else split_bitmask
+    memo: Dict[int, List[int]] = {}
+    out = []
+    append = out.append
+    for value in composite_values:
+        hit = memo.get(value)
+        if hit is None:
+            hit = split(value)
+            if len(memo) < _MEMO_LIMIT:
+                memo[value] = hit
+        append(list(hit))  # Copied so changing one doesn't change the others
+    return out
+
+
+def bitmask_columns(composite_values: Union[Sequence[int], Any],
+                    positions: Optional[Iterable[int]] = None) -> Dict[int, Any]:
+    """Decodes a column of bitmasks (e.g. an `array` or a NumPy array of them)
+    into a column of flags per bit position, i.e. `{position: column}` where
+    each column has a 1 (or True) where that bit is set.
+
+    Columns are `bytearray`s, or NumPy bool arrays if a NumPy array is given
+    (which are computed with vectorized shifts). If no positions are given,
+    every position set in any of the masks gets a column.
+
+        >>> bitmask_columns([1, 4, 5])
+        {0: bytearray(b'\\x01\\x00\\x01'), 2: bytearray(b'\\x00\\x01\\x01')}
+    """
+    if type(composite_values).__module__ == 'numpy':
+        import numpy
+        if positions is None:
+            positions = bitmask_positions(int(numpy.bitwise_or.reduce(composite_values, initial=0)))
+        return {p: ((composite_values >> p) & 1).astype(bool) for p in positions}
+
+    if not isinstance(composite_values, (list, tuple)):
+        composite_values = list(composite_values)
+    if positions is None:
+        positions = bitmask_positions(join_bitmask(composite_values))
+    columns = {}
+    for p in positions:
+        bit = 1 << p
+        columns[p] = bytearray(map(bool, map(bit.__and__, composite_values)))
+    return columns
+
+
+def _get_flag_table(flag_class: Type[enum.Flag]) -> Dict[int, enum.Flag]:
+    table = _flag_tables.get(flag_class)
+    if table is None:
+        table = {}
+        for member in flag_class.__members__.values():
+            value = member.value
+            if value > 0 and value & (value - 1) == 0:  # Single bit
+                table.setdefault(value, member)
+        _flag_tables[flag_class] = table
+    return table
+
+
+def bitmask_to_flags(composite_value: int, flag_class: Type[_T_FLAG], strict: bool = False) -> List[_T_FLAG]:
+    """Splits a bitmask into the single bit members of the given
+    `enum.IntFlag` (or `enum.Flag`) class, lowest first.
+
+    Bits that aren't a member of the class are ignored, unless `strict` is set
+    in which case they raise a ValueError.
+
+        >>> bitmask_to_flags(6, Perm)
+        [<Perm.W: 2>, <Perm.R: 4>]
+    """
+    table = _get_flag_table(flag_class)
+    composite_value = int(composite_value)
+    flags = []
+    while composite_value > 0:
+        low = composite_value & -composite_value
+        member = table.get(low)
+        if member is not None:
+            flags.append(member)
+        elif strict:
+            raise ValueError(f'Bit {low.bit_length() - 1} is not a member of {flag_class.__name__}')
+        composite_value ^= low
+    return flags
+
+
+def flags_to_bitmask(flags: Iterable[Union[int, enum.Flag]]) -> int:
+    """Combines `enum.IntFlag` (or `enum.Flag`) members (or plain ints) into
+    an int bitmask.
+
+        >>> flags_to_bitmask([Perm.R, Perm.W])
+        6
+    """
+    mask = 0
+    for flag in flags:
+        mask |= flag.value if isinstance(flag, enum.Flag) else flag
+    return mask
@@ -0,0 +1,100 @@
+__all__ = [
+    'NumberKind',
+    'scan_number',
+]
+
+"""Exception free recognition of numbers in strings.
+"""
+from ccptools.tpu.structs import *
+
+
+class NumberKind(enum.IntEnum):
+    """What kind of number a string holds (see `scan_number`)."""
+    INVALID = 0
+    INT = 1  # Decimal, like int() takes it
+    PREFIXED_INT = 2  # 0x, 0o or 0b prefixed, like int(value, base=0) takes it
+    FLOAT = 3  # Anything else float() takes (written out, so it may still overflow to inf)
+    NONFINITE = 4  # inf, infinity or nan (float() takes these but int() can't)
+
+
+# Mirrors the grammar int() and float() accept (including underscores between
+# digits and surrounding whitespace). In str patterns \d matches any Unicode
+# decimal digit, just like int() and float() take them (in prefixed ints too).
+_DIGITS = r'\d+(?:_\d+)*'
+_SPACE = r'[^\S\x1c-\x1f]*'  # Whitespace, except for the separators int() and float() don't strip
+# Written to never need backtracking between the alternatives; which group
+# matched last tells what kind of number it is
+_NUMBER_PATTERN = (rf'{_SPACE}[+-]?(?:'
+                   rf'(?P<int>{_DIGITS})(?P<point>\.(?:{_DIGITS})?)?(?P<exp>[eE][+-]?{_DIGITS})?'
+                   rf'|(?P<frac>\.{_DIGITS}(?:[eE][+-]?{_DIGITS})?)'
+                   r'|(?P<prefixed>0(?:[xX](?:_?[\da-fA-F])+|[oO](?:_?[0-7])+|[bB](?:_?[01])+))'
+                   # Non-ASCII octal and binary digits can't be told apart by
+                   # value in a pattern, so those are checked separately
+                   r'|(?P<wide_prefixed>0[oObB](?:_?\d)+)'
+                   r'|(?P<nonfinite>(?i:inf|infinity|nan))'
+                   rf'){_SPACE}')
+_NUMBER_STR = re.compile(_NUMBER_PATTERN)
+_NUMBER_BYTES = re.compile(_NUMBER_PATTERN.encode('ascii'))
+
+_KIND_BY_GROUP = {
+    'int': NumberKind.INT,
+    'point': NumberKind.FLOAT,
+    'exp': NumberKind.FLOAT,
+    'frac': NumberKind.FLOAT,
+    'prefixed': NumberKind.PREFIXED_INT,
+    'wide_prefixed': NumberKind.PREFIXED_INT,
+    'nonfinite': NumberKind.NONFINITE,
+}
+
+
+_INT = NumberKind.INT
+_FLOAT = NumberKind.FLOAT
+_INVALID = NumberKind.INVALID
+
+
+def _digits_below_base(literal: Union[str, bytes]) -> bool:
+    # For 0o and 0b literals with digits \d took but [0-7] or [01] didn't
+    if isinstance(literal, bytes):
+        literal = literal.decode('ascii')
+    base = 8 if literal[1] in 'oO' else 2
+    return all(c == '_' or int(c) < base for c in literal[2:])
+
+
+def scan_number(value: Union[str, bytes]) -> NumberKind:
+    """Classifies a string (or bytes) as a decimal int, a prefixed (0x, 0o or
+    0b) int, a float, a non-finite float or not a number at all, in a single
+    pass without raising or catching any exceptions.
+
+    The classification matches what `int()`, `int(value, base=0)` and
+    `float()` accept, so converting a string with the matching one of those
+    won't fail (except for ints with more digits than Python allows).
+
+    Example:
+    >>> scan_number(' -1_000 '), scan_number('0x1F'), scan_number('1e3'), scan_number('1,000')
+    (<NumberKind.INT: 1>, <NumberKind.PREFIXED_INT: 2>, <NumberKind.FLOAT: 3>, <NumberKind.INVALID: 0>)
+    """
+    # Plain (optionally negative) ints and decimal fractions are by far the
+    # most common, so those are checked with string methods before running
+    # the full grammar
+    if isinstance(value, str):
+        if value.isdecimal():
+            return _INT
+        if value.replace('.', '', 1).isdecimal():
+            return _FLOAT
+        if value[:1] == '-':
+            rest = value[1:]
+            if rest.isdecimal():
+                return _INT
+            if rest.replace('.', '', 1).isdecimal():
+                return _FLOAT
+        m = _NUMBER_STR.fullmatch(value)
+    else:
+        if value.isdigit():
+            return _INT
+        m = _NUMBER_BYTES.fullmatch(value)
+    if m is None:
+        return _INVALID
+    group = m.lastgroup
+    if group == 'wide_prefixed' and not _digits_below_base(m.group(group)):
+        return _INVALID
+    return _KIND_BY_GROUP[group]
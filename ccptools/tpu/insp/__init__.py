@@ -1,2 +1,4 @@
 from ._insp_old import *
 from ._typecheck import *
+from ._compiled import *
+from ._argprofile import *
@@ -0,0 +1,264 @@
+__all__ = [
+    'ArgProfile',
+    'CallableProfile',
+    'get_arg_profile',
+    'clear_arg_profile_cache',
+]
+
+"""Cached argument profiles of callables and precompiled profile checks.
+"""
+from typing import *
+import inspect
+import threading
+import weakref
+
+_T_RANGE = Union[int, Tuple[int, int], List[int]]
+
+# Underlying function -> (FullArgSpec, ArgProfile)
+_cache: 'weakref.WeakKeyDictionary[Callable, Tuple[inspect.FullArgSpec, ArgProfile]]' = weakref.WeakKeyDictionary()
+_cache_lock = threading.Lock()
+
+
+class ArgProfile(object):
+    """The argument profile of a callable (i.e. what `inspect.getfullargspec`
+    tells us, in a form that's cheap to check against).
+
+    Just like `inspect.getfullargspec`, the arguments of bound methods include
+    the first ("self" or "cls") argument.
+    """
+    __slots__ = ('args', 'arg_set', 'default_count', 'varargs', 'varkw', 'kwonlyargs', 'kwonly_required',
+                 'annotations')
+
+    def __init__(self, spec: inspect.FullArgSpec):
+        self.args: Tuple[str, ...] = tuple(spec.args or ())
+        self.arg_set: FrozenSet[str] = frozenset(self.args)
+        self.default_count: int = len(spec.defaults) if spec.defaults else 0
+        self.varargs: Optional[str] = spec.varargs
+        self.varkw: Optional[str] = spec.varkw
+        self.kwonlyargs: Tuple[str, ...] = tuple(spec.kwonlyargs or ())
+        kwonlydefaults = spec.kwonlydefaults or {}
+        self.kwonly_required: Tuple[str, ...] = tuple(a for a in self.kwonlyargs if a not in kwonlydefaults)
+        self.annotations: Dict[str, Any] = dict(spec.annotations or {})
+
+    @property
+    def arg_count(self) -> int:
+        return len(self.args)
+
+    @property
+    def required_count(self) -> int:
+        return len(self.args) - self.default_count
+
+    def __repr__(self):
+        return f'ArgProfile(args={self.args!r}, defaults={self.default_count}, varargs={self.varargs!r}, ' \
+               f'varkw={self.varkw!r}, kwonlyargs={self.kwonlyargs!r})'
+
+
+def _unwrap(somecallable: Any) -> Optional[Callable]:
+    """Returns the plain function behind the given callable (unwrapping bound
+    methods and objects with a `__call__` method) or None if there isn't one.
+    """
+    if inspect.isfunction(somecallable):
+        return somecallable
+    if inspect.ismethod(somecallable):
+        return somecallable.__func__
+    call_func = getattr(somecallable, '__call__', None)
+    if call_func:
+        if inspect.isfunction(call_func):
+            return call_func
+        if inspect.ismethod(call_func):
+            return call_func.__func__
+    return None
+
+
+def _lookup(somecallable: Any) -> Optional[Tuple[inspect.FullArgSpec, ArgProfile]]:
+    func = _unwrap(somecallable)
+    if func is None:
+        return None
+    hit = _cache.get(func)
+    if hit is None:
+        spec = inspect.getfullargspec(func)
+        hit = (spec, ArgProfile(spec))
+        with _cache_lock:
+            _cache[func] = hit
+    return hit
+
+
+def get_arg_profile(somecallable: Any) -> Optional[ArgProfile]:
+    """Returns the (cached) `ArgProfile` of a function, method or object with
+    a `__call__` method or None if the given thing isn't callable that way.
+
+    Profiles are cached per underlying function (so all bound methods of a
+    function, and all instances of a callable class, share one) for as long as
+    that function exists. Call `clear_arg_profile_cache()` if you change the
+    defaults or annotations of functions at runtime.
+    """
+    hit = _lookup(somecallable)
+    return hit[1] if hit is not None else None
+
+
+def clear_arg_profile_cache():
+    """Clears the cache used by `get_arg_profile`, `get_argspec` and
+    `fits_callable_profile`.
+    """
+    with _cache_lock:
+        _cache.clear()
+
+
+def _bounds(value: _T_RANGE) -> Tuple[int, int]:
+    if isinstance(value, (list, tuple)):
+        return value[0], value[1]
+    return value, value
+
+
+def _annotation_matches(actual: Any, expected: Any) -> bool:
+    if actual == expected:
+        return True
+    if isinstance(actual, str):  # Postponed evaluation (from __future__ import annotations)
+        return actual == getattr(expected, '__name__', expected) or actual == getattr(expected, '__qualname__', None)
+    if isinstance(actual, type) and isinstance(expected, type):
+        return issubclass(actual, expected)
+    return False
+
+
+class CallableProfile(object):
+    """A precompiled argument profile check (see `fits_callable_profile` for
+    what the parameters mean) that can be tested against many callables
+    cheaply by calling it (or `fits()` to get the reason for failures raised).
+
+    The verdict for each underlying function is cached (weakly) so checking
+    the same callable again, e.g. every time an event is dispatched to it, is
+    just a dictionary lookup.
+
+    Besides what `fits_callable_profile` checks, this also supports:
+
+    :param kwonly_names: Names of keyword-only arguments the callable should
+                         have (regardless of order)
+    :param kwonly_required_count: The number of keyword-only arguments without
+                                  defaults, either the exact number or a
+                                  2-tuple with the minimum and maximum allowed.
+    :param annotations: A dict of argument names (or "return") and the
+                        annotation they should have (subclasses of a class
+                        annotation pass as well)
+
+    Example:
+    >>> is_handler = CallableProfile(required_arg_count=1, has_kwargs=True)
+    >>> is_handler(lambda event, **kwargs: None)
+    True
+    """
+    __slots__ = ('required_arg_count', 'total_arg_count', 'default_count', 'has_varargs', 'has_kwargs',
+                 'arg_names', 'kwonly_names', 'kwonly_required_count', 'annotations', '_verdicts', '__weakref__')
+
+    def __init__(self,
+                 required_arg_count: Optional[_T_RANGE] = None,
+                 total_arg_count: Optional[_T_RANGE] = None,
+                 default_count: Optional[_T_RANGE] = None,
+                 has_varargs: Optional[Union[bool, str]] = None,
+                 has_kwargs: Optional[Union[bool, str]] = None,
+                 arg_names: Optional[Union[List[str], Tuple[str, ...]]] = None,
+                 kwonly_names: Optional[Iterable[str]] = None,
+                 kwonly_required_count: Optional[_T_RANGE] = None,
+                 annotations: Optional[Dict[str, Any]] = None):
+        self.required_arg_count = None if required_arg_count is None else _bounds(required_arg_count)
+        self.total_arg_count = None if total_arg_count is None else _bounds(total_arg_count)
+        self.default_count = None if default_count is None else _bounds(default_count)
+        self.has_varargs = has_varargs
+        self.has_kwargs = has_kwargs
+        self.arg_names = arg_names
+        self.kwonly_names = tuple(kwonly_names) if kwonly_names else ()
+        self.kwonly_required_count = None if kwonly_required_count is None else _bounds(kwonly_required_count)
+        self.annotations = dict(annotations) if annotations else {}
+        # Underlying function -> None if it fits, else the reason it doesn't
+        self._verdicts: 'weakref.WeakKeyDictionary[Callable, Optional[str]]' = weakref.WeakKeyDictionary()
+
+    def __call__(self, somecallable: Any) -> bool:
+        return self.fits(somecallable)
+
+    def fits(self, somecallable: Any, raise_error: bool = False) -> bool:
+        """Checks if the given callable fits this profile.
+
+        :raises ValueError: If `raise_error` is set and the check fails (with
+                            the details)
+        """
+        func = _unwrap(somecallable)
+        if func is None:
+            reason = 'Not a callable!'
+        else:
+            try:
+                reason = self._verdicts[func]
+            except KeyError:
+                reason = self.check(_lookup(func)[1])
+                self._verdicts[func] = reason
+        if reason is None:
+            return True
+        if raise_error:
+            raise ValueError(reason)
+        return False
+
+    def check(self, profile: ArgProfile) -> Optional[str]:
+        """Checks the given `ArgProfile` (uncached) and returns None if it fits
+        or the reason it doesn't.
+        """
+        if self.required_arg_count is not None:
+            mi, ma = self.required_arg_count
+            req_args = profile.required_count
+            if not mi <= req_args <= ma:
+                return 'Required arguments check fail: min=%s >= count=%s >= max=%s' % (mi, req_args, ma)
+
+        if self.total_arg_count is not None:
+            mi, ma = self.total_arg_count
+            arg_count = profile.arg_count
+            if not mi <= arg_count <= ma:
+                return 'Arguments count check fail: min=%s >= count=%s >= max=%s' % (mi, arg_count, ma)
+
+        if self.default_count is not None:
+            mi, ma = self.default_count
+            def_count = profile.default_count
+            if not mi <= def_count <= ma:
+                return 'Default argument check fail: min=%s >= count=%s >= max=%s' % (mi, def_count, ma)
+
+        has_varargs = self.has_varargs
+        if has_varargs is not None:
+            if isinstance(has_varargs, str) and has_varargs != profile.varargs:
+                return 'Variable arguments name fail: is=%s, should be=%s' % (profile.varargs, has_varargs)
+            if bool(has_varargs) != bool(profile.varargs):
+                return 'Variable arguments fail: is=%s, should be=%s' % (bool(profile.varargs), bool(has_varargs))
+
+        has_kwargs = self.has_kwargs
+        if has_kwargs is not None:
+            if isinstance(has_kwargs, str) and has_kwargs != profile.varkw:
+                return 'Keyword arguments name fail: is=%s, should be=%s' % (profile.varkw, has_kwargs)
+            if bool(has_kwargs) != bool(profile.varkw):
+                return 'Keyword arguments fail: is=%s, should be=%s' % (bool(profile.varkw), bool(has_kwargs))
+
+        arg_names = self.arg_names
+        if arg_names:
+            if not profile.args:
+                return 'Named arguments fail: No named arguments found'
+            if isinstance(arg_names, list):  # Order doesn't matter!
+                for arg_name in arg_names:
+                    if arg_name not in profile.arg_set:
+                        return 'Named arguments fail: Argument "%s" not found' % arg_name
+            elif isinstance(arg_names, tuple):
+                args = profile.args
+                for i, arg_name in enumerate(arg_names):
+                    if (i >= len(args) or args[i] != arg_name) and arg_name != '*':
+                        return 'Named arguments fail: Argument "%s" not found in correct order' % arg_name
+            else:
+                return 'Named arguments fail: arg_names must be a list or tuple'
+
+        for arg_name in self.kwonly_names:
+            if arg_name not in profile.kwonlyargs:
+                return 'Keyword-only arguments fail: Argument "%s" not found' % arg_name
+
+        if self.kwonly_required_count is not None:
+            mi, ma = self.kwonly_required_count
+            kw_req = len(profile.kwonly_required)
+            if not mi <= kw_req <= ma:
+                return 'Required keyword-only arguments check fail: min=%s >= count=%s >= max=%s' % (mi, kw_req, ma)
+
+        for arg_name, expected in self.annotations.items():
+            actual = profile.annotations.get(arg_name, inspect.Parameter.empty)
+            if not _annotation_matches(actual, expected):
+                return 'Annotation fail: "%s" is=%r, should be=%r' % (arg_name, actual, expected)
+
+        return None
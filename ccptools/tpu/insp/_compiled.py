@@ -0,0 +1,467 @@
+__all__ = [
+    'CheckMode',
+    'TypeCheckResult',
+    'CompiledTypeCheck',
+    'compile_type_check',
+]
+from typing import *
+import array
+import collections.abc
+import dataclasses
+import itertools
+import random
+import threading
+import types
+import typing
+import logging
+log = logging.getLogger(__name__)
+
+_UNION_TYPE = getattr(types, 'UnionType', None)  # PEP 604 unions (Python 3.10+)
+_ANNOTATED = getattr(typing, 'Annotated', None)  # Python 3.9+
+
+_T_CHECK = Callable[[Any], bool]
+
+_cache: Dict[Tuple[Any, 'CheckMode'], 'CompiledTypeCheck'] = {}
+
+# Element types of `array.array` per typecode
+_ARRAY_TYPES = {c: int for c in 'bBhHiIlLqQ'}
+_ARRAY_TYPES.update({'f': float, 'd': float, 'u': str, 'w': str})
+_cache_lock = threading.RLock()
+
+
+def _always(val: Any) -> bool:
+    return True
+
+
+def _is_none(val: Any) -> bool:
+    return val is None
+
+
+class CheckMode(object):
+    """How many of the elements of containers a `CompiledTypeCheck` inspects.
+
+     - `CheckMode.full()`: All of them (the default)
+     - `CheckMode.first_n(n)`: Only the first `n` elements of each container
+     - `CheckMode.random_sample(k)`: `k` randomly selected elements of each
+       container (containers that can't be indexed, like sets and mappings,
+       use their first `k` elements instead)
+
+    Fixed length tuples and dataclass fields are always checked in full.
+
+    Regardless of mode, elements of `bytes`, `bytearray`, `array.array` and
+    one dimensional NumPy arrays aren't inspected one by one since their type
+    is known from the container itself (or its typecode/dtype).
+    """
+    __slots__ = ('kind', 'n', 'seed')
+
+    FULL = 'full'
+    FIRST_N = 'first_n'
+    RANDOM_SAMPLE = 'random_sample'
+
+    def __init__(self, kind: str = FULL, n: int = 0, seed: Optional[int] = None):
+        self.kind = kind
+        self.n = n
+        self.seed = seed
+
+    @classmethod
+    def full(cls) -> 'CheckMode':
+        return cls(cls.FULL)
+
+    @classmethod
+    def first_n(cls, n: int) -> 'CheckMode':
+        return cls(cls.FIRST_N, n)
+
+    @classmethod
+    def random_sample(cls, k: int, seed: Optional[int] = None) -> 'CheckMode':
+        return cls(cls.RANDOM_SAMPLE, k, seed)
+
+    def __eq__(self, other):
+        if isinstance(other, CheckMode):
+            return (self.kind, self.n, self.seed) == (other.kind, other.n, other.seed)
+        return False
+
+    def __hash__(self):
+        return hash((self.kind, self.n, self.seed))
+
+    def __repr__(self):
+        if self.kind == CheckMode.FULL:
+            return 'CheckMode.full()'
+        if self.kind == CheckMode.FIRST_N:
+            return f'CheckMode.first_n({self.n})'
+        return f'CheckMode.random_sample({self.n}, seed={self.seed!r})'
+
+
+_FULL = CheckMode.full()
+
+
+class TypeCheckResult(NamedTuple):
+    """The result of `CompiledTypeCheck.validate`."""
+    ok: bool
+    inspected: int  # Number of container elements that were actually checked
+
+    def __bool__(self):
+        return self.ok
+
+
+class _Counter(threading.local):
+    n = 0
+
+
+class CompiledTypeCheck(object):
+    """A type check for a single annotation that has been analysed up front
+    by `compile_type_check` so checking values is just a matter of calling it.
+
+    The underlying check function is available as `check` for those who want
+    to skip the (tiny) overhead of calling this object.
+
+    Use `validate()` instead of calling to also get the number of container
+    elements that were inspected.
+    """
+    __slots__ = ('annotation', 'mode', 'check', '_counting', '_counter')
+
+    def __init__(self, annotation: Any, check: _T_CHECK, mode: CheckMode = _FULL):
+        self.annotation = annotation
+        self.mode = mode
+        self.check = check
+        self._counting: Optional[_T_CHECK] = None
+        self._counter: Optional[_Counter] = None
+
+    def __call__(self, val: Any) -> bool:
+        return self.check(val)
+
+    def __repr__(self):
+        if self.mode == _FULL:
+            return f'CompiledTypeCheck({self.annotation!r})'
+        return f'CompiledTypeCheck({self.annotation!r}, mode={self.mode!r})'
+
+    def validate(self, val: Any) -> TypeCheckResult:
+        """Checks the given value and reports how many container elements
+        were inspected doing so.
+
+        This uses a separately compiled (slightly slower) version of the check
+        that keeps count.
+        """
+        if self._counting is None:
+            counter = _Counter()
+            self._counting = _Compiler(self.mode, counter).compile(self.annotation)
+            self._counter = counter
+        counter = self._counter
+        counter.n = 0
+        ok = self._counting(val)
+        return TypeCheckResult(bool(ok), counter.n)
+
+
+class _Compiler(object):
+    """Turns annotations into (nested) check functions."""
+
+    def __init__(self, mode: CheckMode = _FULL, counter: Optional[_Counter] = None):
+        self.mode = mode
+        self.counter = counter
+        self._rng = random.Random(mode.seed)
+        # Dataclasses currently being compiled (so recursive ones work)
+        self._pending: Dict[type, List[_T_CHECK]] = {}
+
+    def _plain_types(self, tp: Any) -> Optional[Tuple[type, ...]]:
+        """Returns the tuple of classes a plain isinstance check against the
+        given annotation would use (or None if it's not that simple).
+        """
+        if tp is None:
+            return type(None),
+        if isinstance(tp, type) and typing.get_origin(tp) is None and not dataclasses.is_dataclass(tp):
+            return tp,
+        if typing.get_origin(tp) is Union or (_UNION_TYPE is not None and isinstance(tp, _UNION_TYPE)):
+            plain = []
+            for a in typing.get_args(tp):
+                p = self._plain_types(a)
+                if p is None:
+                    return None
+                plain.extend(p)
+            return tuple(plain)
+        return None
+
+    def _elements(self) -> Callable[[Any, Iterable], Iterable]:
+        """Returns a function that picks which of the given elements of a
+        container to inspect, based on the mode.
+        """
+        mode = self.mode
+        n = mode.n
+        if mode.kind == CheckMode.FIRST_N:
+            return lambda val, elements: itertools.islice(elements, n)
+
+        if mode.kind == CheckMode.RANDOM_SAMPLE:
+            rng = self._rng
+
+            def pick(val, elements):
+                if isinstance(val, collections.abc.Sequence):
+                    size = len(val)
+                    if size > n:
+                        return [val[i] for i in sorted(rng.sample(range(size), n))]
+                    return val
+                return itertools.islice(elements, n)
+            return pick
+
+        return lambda val, elements: elements
+
+    def _all(self, item: _T_CHECK) -> Callable[[Iterable], bool]:
+        """Returns a function that checks all the given elements with `item`
+        (counting them if we're keeping count).
+        """
+        counter = self.counter
+        if counter is None:
+            return lambda elements: all(map(item, elements))
+
+        def check_all(elements):
+            for e in elements:
+                counter.n += 1
+                if not item(e):
+                    return False
+            return True
+        return check_all
+
+    def compile(self, tp: Any) -> _T_CHECK:
+        if tp is Any:
+            return _always
+
+        if tp is None or tp is type(None):
+            return _is_none
+
+        if isinstance(tp, TypeVar):
+            if tp.__constraints__:
+                return self._compile_union(tp.__constraints__)
+            if tp.__bound__ is not None:
+                return self.compile(tp.__bound__)
+            return _always
+
+        supertype = getattr(tp, '__supertype__', None)  # NewType
+        if supertype is not None:
+            return self.compile(supertype)
+
+        if isinstance(tp, (str, ForwardRef)):
+            raise TypeError(f'can not compile an unresolved forward reference: {tp!r}')
+
+        if _UNION_TYPE is not None and isinstance(tp, _UNION_TYPE):
+            return self._compile_union(typing.get_args(tp))
+
+        origin = typing.get_origin(tp)
+        if origin is not None:
+            return self._compile_generic(tp, origin, typing.get_args(tp))
+
+        if dataclasses.is_dataclass(tp) and isinstance(tp, type):
+            return self._compile_dataclass(tp)
+
+        if isinstance(tp, type):
+            return lambda val: isinstance(val, tp)
+
+        log.warning('I do not know how to compile a type check for %r :(', tp)
+        from ccptools.tpu.insp._typecheck import check_type
+        return lambda val: check_type(val, tp)
+
+    def _compile_union(self, args: Sequence[Any]) -> _T_CHECK:
+        if not args or Any in args:
+            return _always
+
+        # Plain classes (and None) can all be checked with a single isinstance
+        plain = tuple(type(None) if a is None else a for a in args
+                      if a is None or (isinstance(a, type) and typing.get_origin(a) is None
+                                       and not dataclasses.is_dataclass(a)))
+        others = [self.compile(a) for a in args
+                  if not (a is None or (isinstance(a, type) and typing.get_origin(a) is None
+                                        and not dataclasses.is_dataclass(a)))]
+        if not others:
+            if len(plain) == 1:
+                only = plain[0]
+                return lambda val: isinstance(val, only)
+            return lambda val: isinstance(val, plain)
+
+        if not plain:
+            if len(others) == 1:
+                return others[0]
+            return lambda val: any(f(val) for f in others)
+
+        return lambda val: isinstance(val, plain) or any(f(val) for f in others)
+
+    def _compile_generic(self, tp: Any, origin: Any, args: Tuple[Any, ...]) -> _T_CHECK:
+        if origin is Union:
+            return self._compile_union(args)
+
+        if origin is Literal:
+            return self._compile_literal(args)
+
+        if _ANNOTATED is not None and origin is _ANNOTATED:
+            return self.compile(args[0])
+
+        if origin is ClassVar or getattr(typing, 'Final', None) is origin:
+            return self.compile(args[0]) if args else _always
+
+        if origin is type:
+            if not args or args[0] is Any:
+                return lambda val: isinstance(val, type)
+            bases = args[0]
+            if typing.get_origin(bases) is Union:
+                bases = typing.get_args(bases)
+            return lambda val: isinstance(val, type) and issubclass(val, bases)
+
+        if origin is collections.abc.Callable:
+            return callable
+
+        if not isinstance(origin, type):
+            log.warning('I do not know how to compile a type check for %r :(', tp)
+            return _always
+
+        if origin is tuple:
+            return self._compile_tuple(args)
+
+        if issubclass(origin, collections.abc.Mapping):
+            return self._compile_mapping(origin, args)
+
+        if issubclass(origin, collections.abc.Iterable) and not issubclass(origin, (str, bytes, bytearray)):
+            return self._compile_collection(origin, args)
+
+        return lambda val: isinstance(val, origin)
+
+    def _compile_literal(self, args: Tuple[Any, ...]) -> _T_CHECK:
+        # Literal[1] should not accept True (and vice versa) so we match on type too
+        try:
+            allowed = frozenset((type(a), a) for a in args)
+        except TypeError:
+            allowed_list = [(type(a), a) for a in args]
+            return lambda val: (type(val), val) in allowed_list
+
+        def check(val):
+            try:
+                return (type(val), val) in allowed
+            except TypeError:  # Unhashable
+                return False
+        return check
+
+    def _compile_tuple(self, args: Tuple[Any, ...]) -> _T_CHECK:
+        if not args or args == ((),):
+            if args == ((),):  # Tuple[()]
+                return lambda val: isinstance(val, tuple) and not val
+            return lambda val: isinstance(val, tuple)
+
+        if len(args) == 2 and args[1] is ...:
+            item = self.compile(args[0])
+            if item is _always:
+                return lambda val: isinstance(val, tuple)
+            elements = self._elements()
+            check_all = self._all(item)
+            return lambda val: isinstance(val, tuple) and check_all(elements(val, val))
+
+        items = [self.compile(a) for a in args]
+        size = len(items)
+        return lambda val: (isinstance(val, tuple) and len(val) == size
+                            and all(f(v) for f, v in zip(items, val)))
+
+    def _compile_mapping(self, origin: type, args: Tuple[Any, ...]) -> _T_CHECK:
+        if not args:
+            return lambda val: isinstance(val, origin)
+        key = self.compile(args[0])
+        value = self.compile(args[1]) if len(args) > 1 else _always
+        if key is _always and value is _always:
+            return lambda val: isinstance(val, origin)
+
+        elements = self._elements()
+        if key is _always:
+            check_values = self._all(value)
+            return lambda val: isinstance(val, origin) and check_values(elements(val, val.values()))
+        if value is _always:
+            check_keys = self._all(key)
+            return lambda val: isinstance(val, origin) and check_keys(elements(val, val.keys()))
+        check_items = self._all(lambda kv: key(kv[0]) and value(kv[1]))
+        return lambda val: isinstance(val, origin) and check_items(elements(val, val.items()))
+
+    def _compile_collection(self, origin: type, args: Tuple[Any, ...]) -> _T_CHECK:
+        item = self.compile(args[0]) if args else _always
+        if item is _always:
+            return lambda val: isinstance(val, origin)
+
+        elements = self._elements()
+        check_all = self._all(item)
+        plain = self._plain_types(args[0])
+        if plain is None:
+            return lambda val: isinstance(val, origin) and check_all(elements(val, val))
+
+        # Containers whose element type is known up front don't need to be
+        # inspected one by one
+        def check(val):
+            if not isinstance(val, origin):
+                return False
+            if isinstance(val, (bytes, bytearray)):
+                return issubclass(int, plain)
+            if isinstance(val, array.array):
+                return issubclass(_ARRAY_TYPES.get(val.typecode, object), plain)
+            dtype = getattr(val, 'dtype', None)
+            if dtype is not None and getattr(val, 'ndim', 0) == 1 and dtype.kind != 'O':
+                return issubclass(dtype.type, plain)
+            return check_all(elements(val, val))
+        return check
+
+    def _compile_dataclass(self, tp: type) -> _T_CHECK:
+        pending = self._pending.get(tp)
+        if pending is not None:  # Recursive reference to a dataclass in progress
+            return lambda val: pending[0](val)
+
+        cell: List[_T_CHECK] = []
+        self._pending[tp] = cell
+        try:
+            hints = typing.get_type_hints(tp)
+            fields = [(f.name, self.compile(hints.get(f.name, Any))) for f in dataclasses.fields(tp)]
+        finally:
+            del self._pending[tp]
+
+        def check(val):
+            if not isinstance(val, tp):
+                return False
+            for name, f in fields:
+                if not f(getattr(val, name)):
+                    return False
+            return True
+
+        cell.append(check)
+        return check
+
+
+def compile_type_check(annotation: Any, mode: Optional[CheckMode] = None) -> CompiledTypeCheck:
+    """Analyses a type or annotation once and returns a `CompiledTypeCheck`
+    that checks values against it (i.e. it returns True if a value matches).
+
+    Compiled checks are cached per annotation (and mode) so calling this
+    repeatedly with the same annotation is cheap (although holding on to the
+    result is even cheaper).
+
+    Besides what `check_type` supports (plain types, `Any`, `Union`, `List`,
+    `Set`, `Tuple`, `Dict` and other mappings and `TypeVar`) this also
+    supports `Optional`, `Literal`, PEP 604 unions (`int | None`), builtin
+    generics (`dict[str, int]`), abstract collections (`Sequence[int]`),
+    `Type[...]`, `Callable`, `Annotated` and dataclasses, whose fields are
+    checked against their own annotations (recursively).
+
+    For huge containers, pass a `CheckMode` to only inspect the first or a
+    random sample of their elements.
+
+    Example:
+    >>> is_scores = compile_type_check(Dict[str, List[int]])
+    >>> is_scores({'alpha': [1, 2, 3]})
+    True
+    >>> compile_type_check(List[int], CheckMode.first_n(10)).validate(list(range(1000000)))
+    TypeCheckResult(ok=True, inspected=10)
+
+    :raises TypeError: If the annotation contains unresolved forward references
+    """
+    mode = mode or _FULL
+    key = (annotation, mode)
+    try:
+        hit = _cache.get(key)
+    except TypeError:  # Unhashable annotation (e.g. a Literal of a list)
+        return CompiledTypeCheck(annotation, _Compiler(mode).compile(annotation), mode)
+
+    if hit is not None:
+        return hit
+
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is None:
+            hit = CompiledTypeCheck(annotation, _Compiler(mode).compile(annotation), mode)
+            _cache[key] = hit
+    return hit
@@ -10,11 +10,21 @@ __all__ = [
 ]
 
 from ccptools.tpu.structs import empty
+from ._argprofile import CallableProfile, _lookup
 import inspect
+import types
+import weakref
 from typing import *
 
 _NOT_SUPPLIED = object()
 
+# Cached names of classes/functions (keyed by their id) and the names of
+# instances of classes (keyed by the id of the class). Entries are dropped by
+# weakref callbacks when the class/function goes away.
+_object_names: Dict[int, str] = {}
+_instance_names: Dict[int, str] = {}
+_name_refs: Dict[Tuple[int, int], weakref.ref] = {}
+
 
 def is_methfunc(function_or_method):
     """Checks if the given parameter is a function/method or not.
@@ -69,25 +79,23 @@ def get_argspec(somecallable):
 
     Returns None if the given parameter isn't callable.
 
+    The specs are cached per underlying function (see `get_arg_profile`) so
+    don't modify the returned specs.
+
     :param somecallable: The thing to fetch the argument spec for
     :type somecallable: function or method or object or any
     :return: The argspecs or None if the given parameter wasn't callable
     :rtype: inspect.ArgSpec or collections.namedtuple or None
     """
-    if is_methfunc(somecallable):
-        return inspect.getfullargspec(somecallable)
-    else:
-        call_func = getattr(somecallable, '__call__', None)
-        if call_func:
-            if is_methfunc(call_func):
-                return inspect.getfullargspec(call_func)
-    return None
+    hit = _lookup(somecallable)
+    return hit[0] if hit is not None else None
 
 
 def fits_callable_profile(somecallable, required_arg_count=None,
                           total_arg_count=None, default_count=None,
                           has_varargs=None, has_kwargs=None, arg_names=None,
-                          raise_error=False):
+                          raise_error=False, kwonly_names=None,
+                          kwonly_required_count=None, annotations=None):
     """Checks if a callable (function, method or object with __call__) fits
     the given argument profile.
 
@@ -101,6 +109,10 @@ def fits_callable_profile(somecallable, required_arg_count=None,
     If the arg_names parameter is a list (NOT a tuple), this will only check
     if the argument names there in are present regardless of order.
 
+    Argument specs are cached per function, so this is cheap to call
+    repeatedly. When checking many callables against the same profile, create
+    a `CallableProfile` once and call that instead.
+
     If the arg_names parameter is a tuple (NOT a list), this will check if the
     order pf the argument names there in are present and in the same order
     although you can use '*' in the tuple to skip the check for the argument
@@ -139,113 +151,79 @@ def fits_callable_profile(somecallable, required_arg_count=None,
     :param raise_error: Should an ValueError be raised if a check fails
                         (with the details)?
     :type raise_error: bool
+    :param kwonly_names: Names of keyword-only arguments the callable should
+                         have (regardless of order).
+    :type kwonly_names: list[str] or None
+    :param kwonly_required_count: The number of keyword-only arguments without
+                                  default values (if given), either the exact
+                                  number or a 2-tuple with the minimum and
+                                  maximum allowed number.
+    :type kwonly_required_count: int or (int, int) or None
+    :param annotations: Argument names (or "return") and the annotations they
+                        should have (subclasses of class annotations pass too).
+    :type annotations: dict[str, any] or None
     :return: True if the given callable fits all the given profile checks,
              False if not.
     :rtype: bool
     """
-    # TODO(thordurm@ccpgames.com) 2024-03-20: This could probably use a "modern"
-    #  overhaul and to include type annotations and such!... I think this was
-    #  written for Python 2.7 :D
-    specs = get_argspec(somecallable)
-    if not specs:
-        if raise_error:
-            raise ValueError('Not a callable!')
-        return False
-    def_count = 0
-    if specs.defaults:
-        def_count = len(specs.defaults)
-    arg_count = 0
-    if specs.args:
-        arg_count = len(specs.args)
-    req_args = arg_count - def_count
-
-    if required_arg_count is not None:
-        if isinstance(required_arg_count, (list, tuple)):
-            mi = required_arg_count[0]
-            ma = required_arg_count[1]
-        else:
-            mi = required_arg_count
-            ma = required_arg_count
-        if not mi <= req_args <= ma:
-            if raise_error:
-                raise ValueError('Required arguments check fail: min=%s >= count=%s >= max=%s' % (mi, req_args, ma))
-            return False  # Required argument count fail! :(
-
-    if total_arg_count is not None:
-        if isinstance(total_arg_count, (list, tuple)):
-            mi = total_arg_count[0]
-            ma = total_arg_count[1]
-        else:
-            mi = total_arg_count
-            ma = total_arg_count
-        if not mi <= arg_count <= ma:
-            if raise_error:
-                raise ValueError('Arguments count check fail: min=%s >= count=%s >= max=%s' % (mi, arg_count, ma))
-            return False  # Total argument count fail! :(
-
-    if default_count is not None:
-        if isinstance(default_count, (list, tuple)):
-            mi = default_count[0]
-            ma = default_count[1]
-        else:
-            mi = default_count
-            ma = default_count
-        if not mi <= def_count <= ma:
-            if raise_error:
-                raise ValueError('Default argument check fail: min=%s >= count=%s >= max=%s' % (mi, def_count, ma))
-            return False  # Default argument count fail! :(
-
-    if has_varargs is not None:
-        if isinstance(has_varargs, str):
-            if has_varargs != specs.varargs:
-                if raise_error:
-                    raise ValueError('Variable arguments name fail: is=%s, should be=%s' % (specs.varargs, has_varargs))
-                return False  # Has variable arguments fail! :(
-        if bool(has_varargs) != bool(specs.varargs):
-            if raise_error:
-                raise ValueError('Variable arguments fail: is=%s, should be=%s' % (bool(specs.varargs), bool(has_varargs)))
-            return False  # Has variable arguments fail! :(
-
-    if has_kwargs is not None:
-        kwarg_name = specs.varkw
-        if isinstance(has_kwargs, str):
-            # if has_kwargs != specs.keywords:
-            if has_kwargs != kwarg_name:
-                if raise_error:
-                    raise ValueError('Keyword arguments name fail: is=%s, should be=%s' % (kwarg_name, has_kwargs))
-                return False  # Has variable keyword arguments fail! :(
-        # if bool(has_kwargs) != bool(specs.keywords):
-        if bool(has_kwargs) != bool(kwarg_name):
-            if raise_error:
-                raise ValueError('Keyword arguments fail: is=%s, should be=%s' % (bool(kwarg_name), bool(has_kwargs)))
-            return False  # Has variable keyword arguments fail! :(
-
-    if arg_names:
-        if not specs.args:
-            if raise_error:
-                raise ValueError('Named arguments fail: No named arguments found')
-            return False  # Has argument name fail! :(
-        if isinstance(arg_names, list):  # Order doesn't matter!
-            for arg_name in arg_names:
-                if arg_name not in specs.args:
-                    if raise_error:
-                        raise ValueError('Named arguments fail: Argument "%s" not found' % arg_name)
-                    return False  # Missing required argument! :(
-        elif isinstance(arg_names, tuple):
-            for i, arg_name in enumerate(arg_names):
-                if specs.args[i] != arg_name and arg_name != '*':
-                    if raise_error:
-                        raise ValueError('Named arguments fail: Argument "%s" not found in correct order' % arg_name)
-                    return False  # Missing required argument in order! :(
-        else:
-            if raise_error:
-                raise ValueError('Named arguments fail: arg_names must be a list or tuple')
-            return False
-
-    return True  # Looks good! :D
+    hit = _lookup(somecallable)
+    if hit is None:
+        reason = 'Not a callable!'
+    else:
+        reason = CallableProfile(required_arg_count=required_arg_count, total_arg_count=total_arg_count,
+                                 default_count=default_count, has_varargs=has_varargs, has_kwargs=has_kwargs,
+                                 arg_names=arg_names, kwonly_names=kwonly_names,
+                                 kwonly_required_count=kwonly_required_count,
+                                 annotations=annotations).check(hit[1])
+    if reason is None:
+        return True  # Looks good! :D
+    if raise_error:
+        raise ValueError(reason)
+    return False
 
 
 def get_any_name(anything: Any) -> str:
+    """Returns the fully qualified name of the given thing, e.g.
+    `module.Class` for classes and instances (builtins don't get a module),
+    `module.Class.method` for functions and methods and `module` for modules.
+
+    Names are cached (weakly) per class and function so instances of the same
+    class, and repeated calls with the same function or bound method, skip
+    straight to the cached name.
+
+    Example:
+    >>> get_any_name(datetime.datetime.now())
+    'datetime.datetime'
+    """
+    name = _instance_names.get(id(type(anything)))
+    if name is not None:
+        return name
+    key = anything.__func__ if type(anything) is types.MethodType else anything
+    name = _object_names.get(id(key))
+    if name is not None:
+        return name
+    return _get_any_name(anything)
+
+
+def _remember(names: Dict[int, str], key: Any, name: str):
+    """Caches the given name under the id of the given key (for as long as
+    the key lives).
+    """
+    kid = id(key)
+    ref_key = (id(names), kid)
+
+    def forget(_ref, names=names, kid=kid, ref_key=ref_key):
+        names.pop(kid, None)
+        _name_refs.pop(ref_key, None)
+
+    try:
+        _name_refs[ref_key] = weakref.ref(key, forget)
+    except TypeError:  # Can't be weakly referenced so we can't cache it
+        return
+    names[kid] = name
+
+
+def _get_any_name(anything: Any) -> str:
     if anything is None:
         return 'None'
 
@@ -261,9 +239,13 @@ def get_any_name(anything: Any) -> str:
     if inspect.isfunction(anything) or inspect.ismethod(anything):
         module = getattr(anything, '__module__', None)
         if module and module != 'builtins':
-            return f"{module}.{getattr(anything, '__qualname__', getattr(anything, '__name__', '?f1:noname?'))}"
+            name = f"{module}.{getattr(anything, '__qualname__', getattr(anything, '__name__', '?f1:noname?'))}"
         else:
-            return f"{getattr(anything, '__qualname__', getattr(anything, '__name__', '?f1:noname?'))}"
+            name = f"{getattr(anything, '__qualname__', getattr(anything, '__name__', '?f1:noname?'))}"
+        key = anything.__func__ if inspect.ismethod(anything) else anything
+        if inspect.isfunction(key):
+            _remember(_object_names, key, name)
+        return name
 
     cls = None
     module = None
@@ -289,10 +271,13 @@ def get_any_name(anything: Any) -> str:
         module = '?nomodule?'
 
     if module:
-        return f'{module}.{name}'
+        name = f'{module}.{name}'
 
-    else:
-        return f'{name}'
+    if cls is anything:
+        _remember(_object_names, cls, name)
+    elif cls is type(anything):
+        _remember(_instance_names, cls, name)
+    return name
 
 
 def get_first_attr(obj: Any, list_of_attributes: Union[str, List[str]], default: Any = None,
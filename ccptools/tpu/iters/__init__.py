@@ -2,3 +2,6 @@ from ._lists import *
 from ._dicts import *
 from ._attrs import *
 from ._group import *
+from ._matcher import *
+from ._indexed import *
+from ._sketch import *
@@ -3,6 +3,8 @@ __all__ = [
     'any_setter',
     'nested_get',
     'nested_set',
+    'CompiledPath',
+    'compile_path',
 ]
 from ccptools.tpu.structs import *
 
@@ -82,3 +84,94 @@ def nested_set(obj: Union[Mapping, Sequence],
 
     any_setter(next_obj, last, value)
 
+
+class CompiledPath(object):
+    """A key path compiled by `compile_path` for getting (and setting) values
+    in many same-shaped objects.
+
+    Whether an object is a Mapping (for string keys) or a mutable container
+    (for setting) is resolved once per type at each step of the path and
+    remembered, so the ABC checks `any_getter` and `any_setter` make for every
+    single object are skipped for types the path has already seen.
+    """
+    __slots__ = ('key_list', '_steps')
+
+    def __init__(self, key_list: Sequence[Union[str, int]]):
+        if not key_list:
+            raise ValueError('key_list must contain at least one key')
+        self.key_list: Tuple[Union[str, int], ...] = tuple(key_list)
+        # Each step is (key, is int key, type -> is Mapping, type -> is mutable container)
+        self._steps: List[Tuple[Union[str, int], bool, Dict[type, bool], Dict[type, bool]]] = [
+            (key, isinstance(key, int), {}, {}) for key in self.key_list
+        ]
+
+    def __repr__(self):
+        return f'CompiledPath({self.key_list!r})'
+
+    def __call__(self, obj: Any, default: Any = None) -> Any:
+        return self.get(obj, default)
+
+    def get(self, obj: Any, default: Any = None) -> Any:
+        """Same as `nested_get(obj, key_list, default)`."""
+        for key, is_int, mappings, _ in self._steps:
+            if is_int:
+                try:
+                    obj = obj[key]
+                except (IndexError, KeyError):
+                    return default
+            else:
+                is_mapping = mappings.get(type(obj))
+                if is_mapping is None:
+                    is_mapping = mappings[type(obj)] = isinstance(obj, Mapping)
+                if is_mapping:
+                    obj = obj.get(key)
+                else:
+                    obj = getattr(obj, key, None)
+            if obj is None:
+                return default
+        return obj
+
+    def set(self, obj: Any, value: Any):
+        """Same as `nested_set(obj, key_list, value)`."""
+        steps = self._steps
+        last = len(steps) - 1
+        for i, (key, is_int, mappings, containers) in enumerate(steps):
+            if i == last:
+                next_obj = value
+            else:
+                if is_int:
+                    try:
+                        next_obj = obj[key]
+                    except (IndexError, KeyError):
+                        next_obj = None
+                else:
+                    is_mapping = mappings.get(type(obj))
+                    if is_mapping is None:
+                        is_mapping = mappings[type(obj)] = isinstance(obj, Mapping)
+                    next_obj = obj.get(key) if is_mapping else getattr(obj, key, None)
+                if next_obj is not None:
+                    obj = next_obj
+                    continue
+                next_obj = {}
+
+            is_container = containers.get(type(obj))
+            if is_container is None:
+                is_container = containers[type(obj)] = isinstance(obj, (MutableSequence, MutableMapping))
+            if is_container or is_int:
+                obj[key] = next_obj
+            else:
+                setattr(obj, key, next_obj)
+            obj = next_obj
+
+
+def compile_path(key_list: Sequence[Union[str, int]]) -> CompiledPath:
+    """Compiles a key path (as given to `nested_get` and `nested_set`) into a
+    `CompiledPath` that gets and sets values at that path faster, which pays
+    off when running the same path against lots of same-shaped objects.
+
+    Example:
+    >>> get_fruit = compile_path(('a', 7, 'c', -2))
+    >>> get_fruit({'a': {7: {'c': ['apple', 'banana', 'cantaloupe']}, 5: 'other'}})
+    'banana'
+    """
+    return CompiledPath(key_list)
@@ -1,13 +1,20 @@
 __all__ = [
     'nested_dict_update',
+    'LayeredDict',
+    'nested_dict_overlay',
     'nest_dict',
     'str_nest_dict',
     'flatten_dict',
     'str_flatten_dict',
+    'iter_flatten_dict',
+    'unflatten_dict',
+    'str_unflatten_dict',
 ]
 
 from ccptools.tpu.structs import *
 
+_MISSING = object()
+
 
 def nested_dict_update(base_map: Dict[Any, Any], update_map: Dict[Any, Any]):
     """Updates a nested dicts. This means that if the `base_map` and
@@ -33,6 +40,9 @@ def nested_dict_update(base_map: Dict[Any, Any], update_map: Dict[Any, Any]):
     Note that if a key (or nested key) who's value is a dict in `base_map` is
     NOT a dict in `update_map`, that dict value will be overwritten completely
     with the new value and type.
+
+    See `nested_dict_overlay` for a copy-on-write version that leaves
+    `base_map` alone.
     """
     for k, v in update_map.items():
         if k in base_map:
@@ -46,6 +56,138 @@ def nested_dict_update(base_map: Dict[Any, Any], update_map: Dict[Any, Any]):
             base_map[k] = v
 
 
+class LayeredDict(Mapping):
+    """A read-only view of a chain of (nested) dict layers, as if each layer
+    had been applied on top of the ones below it with `nested_dict_update`,
+    without copying or changing any of them.
+
+    Looking up a key goes down the layers from the top until a value that
+    isn't a dict is found. If more than one layer has a dict under that key,
+    a `LayeredDict` of those is returned. Otherwise the value (or dict) is
+    returned as is, i.e. untouched subtrees are shared with the layers rather
+    than copied (so don't mutate them if you want the layers left alone).
+
+    Lookups cost one dict lookup per layer, so for long lived results of many
+    layers, `to_dict()` may be worth it.
+    """
+    __slots__ = ('layers', '_changes')
+
+    def __init__(self, *layers: Mapping[Any, Any]):
+        flat = []
+        for layer in layers:
+            if isinstance(layer, LayeredDict):
+                flat.extend(layer.layers)
+            else:
+                flat.append(layer)
+        self.layers: Tuple[Mapping[Any, Any], ...] = tuple(flat)
+        self._changes: Optional[List[Tuple]] = None
+
+    def __getitem__(self, key: Any) -> Any:
+        found = None
+        for layer in reversed(self.layers):
+            v = layer.get(key, _MISSING)
+            if v is _MISSING:
+                continue
+            if not isinstance(v, (dict, LayeredDict)):
+                if found is None:
+                    return v
+                break  # Overwritten by the dicts above it
+            if found is None:
+                found = [v]
+            else:
+                found.append(v)
+        if found is None:
+            raise KeyError(key)
+        if len(found) == 1:
+            return found[0]
+        return LayeredDict(*reversed(found))
+
+    def __iter__(self) -> Iterator[Any]:
+        # Keys keep the position they first appeared in (like updating does)
+        if len(self.layers) == 1:
+            yield from self.layers[0]
+            return
+        seen = set()
+        for layer in self.layers:
+            for k in layer:
+                if k not in seen:
+                    seen.add(k)
+                    yield k
+
+    def __len__(self) -> int:
+        if len(self.layers) == 1:
+            return len(self.layers[0])
+        return len(set().union(*self.layers))
+
+    def __contains__(self, key: Any) -> bool:
+        return any(key in layer for layer in self.layers)
+
+    def __repr__(self):
+        return f'LayeredDict({self.to_dict()!r})'
+
+    def overlay(self, *update_maps: Mapping[Any, Any]) -> 'LayeredDict':
+        """Returns a new `LayeredDict` with the given dicts layered on top of
+        this one.
+        """
+        return LayeredDict(self, *update_maps)
+
+    @property
+    def changes(self) -> List[Tuple]:
+        """The key paths (tuples of keys) of the values that the top layer
+        changes (or adds) compared to the layers below it.
+
+        A dict that replaces something that isn't a dict (or nothing) counts
+        as a single change of its own key path.
+        """
+        if self._changes is None:
+            changes = []
+            if self.layers:
+                below = LayeredDict(*self.layers[:-1])
+                _diff(below, self.layers[-1], (), changes)
+            self._changes = changes
+        return self._changes
+
+    def to_dict(self) -> Dict[Any, Any]:
+        """Returns the merged result as a plain dict.
+
+        Only dicts merged from more than one layer are created, untouched
+        subtrees are shared with the layers.
+        """
+        merged = {}
+        for k in self:
+            v = self[k]
+            merged[k] = v.to_dict() if isinstance(v, LayeredDict) else v
+        return merged
+
+
+def _diff(base: Mapping[Any, Any], update_map: Mapping[Any, Any], prefix: Tuple, changes: List[Tuple]):
+    for k, v in update_map.items():
+        old = base.get(k, _MISSING)
+        if isinstance(v, (dict, LayeredDict)) and isinstance(old, (dict, LayeredDict)):
+            _diff(old, v, prefix + (k,), changes)
+        elif old is _MISSING or (old is not v and old != v):
+            changes.append(prefix + (k,))
+
+
+def nested_dict_overlay(base_map: Mapping[Any, Any], *update_maps: Mapping[Any, Any]) -> LayeredDict:
+    """Copy-on-write version of `nested_dict_update`: returns a `LayeredDict`
+    view of the given update maps applied on top of `base_map` (in order)
+    without copying or changing any of them.
+
+    The key paths the last update map changes are available as `changes` of
+    the returned view.
+
+    Example of layered config:
+    >>> defaults = {'db': {'host': 'localhost', 'port': 5432}, 'debug': False}
+    >>> config = nested_dict_overlay(defaults, {'db': {'host': 'db.local'}})
+    >>> config['db']['host'], config['db']['port'], defaults['db']['host']
+    ('db.local', 5432, 'localhost')
+    >>> config.overlay({'debug': True, 'db': {'port': 5432}}).changes
+    [('debug',)]
+    """
+    return LayeredDict(base_map, *update_maps)
+
+
 def nest_dict(key_list: List[Any], value: Any = None) -> Dict[Any, Any]:
     """Creates a nested dict using a list of keys to construct an ever deepening
     dict of a dict of a dict etc.
@@ -72,6 +214,33 @@ def str_nest_dict(nested_key_string: str, value: Any = None, key_seperator: str
     return nest_dict(nested_key_string.split(key_seperator), value)
 
 
+def iter_flatten_dict(some_dict: Dict[Any, Any]) -> Iterator[Tuple[Tuple, Any]]:
+    """Takes a potentially nested dict and lazily yields all "leaf" values
+    (values that aren't dicts) as (key-path tuple, value) pairs, in the same
+    order `flatten_dict` has them.
+
+    Walks the dict iteratively (so depth isn't limited by the recursion limit)
+    and builds the key-path prefix of each nested dict only once, so each
+    leaf only costs the one tuple it's yielded with.
+
+    Note that empty nested dicts have no leaves and are thus skipped.
+
+    Example:
+    >>> list(iter_flatten_dict({'a': {7: {'c': 'value'}, 5: 'other'}}))
+    [(('a', 7, 'c'), 'value'), (('a', 5), 'other')]
+    """
+    stack: List[Tuple[Tuple, Iterator[Tuple[Any, Any]]]] = [((), iter(some_dict.items()))]
+    while stack:
+        prefix, items = stack[-1]
+        for k, v in items:
+            if isinstance(v, dict):
+                stack.append((prefix + (k,), iter(v.items())))
+                break
+            yield prefix + (k,), v
+        else:
+            stack.pop()
+
+
 def _denest_dict(some_dict: Dict[Any, Any]) -> List[Tuple[List[Any], Any]]:
     """Takes a potentially nested dict and returns a list of Tuple pairs
     containing all "leaf" values (values that aren't dicts) as each Tuples
@@ -82,14 +251,7 @@ def _denest_dict(some_dict: Dict[Any, Any]) -> List[Tuple[List[Any], Any]]:
     >>> _denest_dict({'a': {7: {'c': 'value'}, 5: 'other'}})
     [(['a', 7, 'c'], 'value'), (['a', 5], 'other')]
     """
-    buff = []
-    for k, v in some_dict.items():
-        if isinstance(v, dict):
-            for nk, nv in _denest_dict(v):
-                buff.append(([k]+nk, nv))
-        else:
-            buff.append(([k], v))
-    return buff
+    return [(list(k), v) for k, v in iter_flatten_dict(some_dict)]
 
 
 def flatten_dict(some_dict: Dict[Any, Any]) -> Dict[Tuple, Any]:
@@ -102,10 +264,7 @@ def flatten_dict(some_dict: Dict[Any, Any]) -> Dict[Tuple, Any]:
     >>> flatten_dict({'a': {7: {'c': 'value'}, 5: 'other'}})
     {('a', 7, 'c'): 'value', ('a', 5): 'other'}
     """
-    buff = {}
-    for k, v in _denest_dict(some_dict):
-        buff[tuple(k)] = v
-    return buff
+    return dict(iter_flatten_dict(some_dict))
 
 
 def str_flatten_dict(some_dict: Dict[str, Any], joiner: str = '.', caster: Callable = str) -> Dict[str, Any]:
@@ -124,7 +283,57 @@ def str_flatten_dict(some_dict: Dict[str, Any], joiner: str = '.', caster: Calla
     :type caster: function
     :rtype: dict[str,Any]
     """
-    buff = {}
-    for k, v in _denest_dict(some_dict):
-        buff[joiner.join([caster(ki) for ki in k])] = v
-    return buff
+    if caster is str:
+        return {joiner.join(map(str, k)): v for k, v in iter_flatten_dict(some_dict)}
+    return {joiner.join([caster(ki) for ki in k]): v for k, v in iter_flatten_dict(some_dict)}
+
+
+def unflatten_dict(flat_dict: Mapping[Tuple, Any]) -> Dict[Any, Any]:
+    """The inverse of `flatten_dict`, takes a dict of key-path tuples and
+    values and rebuilds the nested dict (in a single pass).
+
+    Keys that aren't tuples are taken as a single key at the top level.
+
+    Example:
+    >>> unflatten_dict({('a', 7, 'c'): 'value', ('a', 5): 'other'})
+    {'a': {7: {'c': 'value'}, 5: 'other'}}
+
+    :raises ValueError: If a key-path runs through a leaf value of another
+                        (e.g. both ('a',) and ('a', 'b') are given)
+    """
+    root: Dict[Any, Any] = {}
+    # The nested dict for each key-path prefix seen so far
+    nodes: Dict[Tuple, Dict[Any, Any]] = {(): root}
+    for path, value in flat_dict.items():
+        if not isinstance(path, tuple):
+            path = (path,)
+        elif not path:
+            raise ValueError('Empty key-path')
+        parent_path = path[:-1]
+        node = nodes.get(parent_path)
+        if node is None:
+            node = root
+            for i, k in enumerate(parent_path):
+                child = node.get(k, _MISSING)
+                if child is _MISSING:
+                    child = node[k] = {}
+                    nodes[parent_path[:i + 1]] = child
+                elif not isinstance(child, dict):
+                    raise ValueError(f'Key-path {path!r} runs through the value of {parent_path[:i + 1]!r}')
+                node = child
+        last = path[-1]
+        if isinstance(node.get(last), dict) and path in nodes:
+            raise ValueError(f'Key-path {path!r} would overwrite nested values')
+        node[last] = value
+    return root
+
+
+def str_unflatten_dict(flat_dict: Mapping[str, Any], key_seperator: str = '.') -> Dict[str, Any]:
+    """The inverse of `str_flatten_dict`, takes a dict of joined key-path
+    strings and values and rebuilds the nested dict.
+
+    Example:
+    >>> str_unflatten_dict({'a.b.c': 'value', 'a.d': 'other'})
+    {'a': {'b': {'c': 'value'}, 'd': 'other'}}
+    """
+    return unflatten_dict({tuple(k.split(key_seperator)): v for k, v in flat_dict.items()})
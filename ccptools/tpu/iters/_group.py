@@ -1,14 +1,160 @@
 __all__ = [
     'group_by',
+    'iter_group_by',
 ]
 
 from ccptools.tpu.structs import *
+import heapq
+import itertools
+import operator
+import pickle
+import tempfile
+from typing import IO
 
 T_OBJ = TypeVar('T_OBJ')
+T_KEY_GETTER = Union[str, int, Callable]
+
+_MISSING = object()
+
+_AGG_COUNT = 'count'
+_AGG_SUM = 'sum'
+_AGG_MIN = 'min'
+_AGG_MAX = 'max'
+_AGG_FIRST = 'first'
+_AGG_LIST = 'list'
+_AGGREGATIONS = (_AGG_COUNT, _AGG_SUM, _AGG_MIN, _AGG_MAX, _AGG_FIRST, _AGG_LIST)
+
+
+class _KeyGetter(object):
+    """Gets the value of one or more "key getters" (as `group_by` takes them)
+    from objects, returning a tuple of their values (or just the value of the
+    one key getter if `single` is set).
+
+    For string and int key getters, an `operator.attrgetter`, `itemgetter` or
+    `methodcaller('get')` is picked once per type of object, falling back to
+    `any_getter` for objects where that doesn't work out (e.g. a missing
+    attribute).
+    """
+    __slots__ = ('keys', 'single', 'plain', '_parts', '_by_type')
+
+    def __init__(self, keys: Sequence[T_KEY_GETTER], single: bool = False):
+        from ccptools.tpu.iters import any_getter
+        self.keys = tuple(keys)
+        self.single = single
+        self.plain = all(isinstance(k, (str, int)) for k in self.keys)
+        self._parts = [(lambda x, k=k: any_getter(x, k)) if isinstance(k, (str, int)) else k for k in self.keys]
+        self._by_type: Dict[type, Optional[Callable]] = {}
+
+    def _fast(self, t: type) -> Optional[Callable]:
+        keys = self.keys
+        all_str = all(isinstance(k, str) for k in keys)
+        if issubclass(t, Mapping) and all_str:
+            if self.single:
+                return operator.methodcaller('get', keys[0])
+            return lambda x: tuple(map(x.get, keys))
+        if all(isinstance(k, int) for k in keys):
+            getter = operator.itemgetter(*keys)
+        elif all_str and not issubclass(t, Mapping) and not any('.' in k for k in keys):  # attrgetter would follow dots
+            getter = operator.attrgetter(*keys)
+        else:
+            return None
+        if len(keys) == 1 and not self.single:  # Item and attrgetters only make tuples of more than one
+            return lambda x: (getter(x),)
+        return getter
+
+    def _slow(self, obj: Any) -> Any:
+        if self.single:
+            return self._parts[0](obj)
+        return tuple(part(obj) for part in self._parts)
+
+    def __call__(self, obj: Any) -> Any:
+        if self.plain:
+            try:
+                fast = self._by_type[type(obj)]
+            except KeyError:
+                fast = self._by_type[type(obj)] = self._fast(type(obj))
+            if fast is None:
+                val = self._slow(obj)
+            else:
+                try:
+                    val = fast(obj)
+                except (AttributeError, KeyError, IndexError):
+                    val = self._slow(obj)
+        else:
+            val = self._slow(obj)
+
+        # Attributes that are methods are assumed to be accessors
+        if self.single:
+            if callable(val):
+                val = val()
+        elif any(map(callable, val)):
+            val = tuple(v() if callable(v) else v for v in val)
+        return val
+
+
+def _group_aggregate(list_of_stuff: Iterable[T_OBJ],
+                     get_key: _KeyGetter,
+                     aggregations: Dict[str, Union[str, Tuple[str, T_KEY_GETTER]]]) -> Dict[Any, Dict[str, Any]]:
+    specs: List[Tuple[str, str, Optional[_KeyGetter]]] = []
+    for name, spec in aggregations.items():
+        if isinstance(spec, str):
+            op, field = spec, None
+        else:
+            op, field = spec
+        if op not in _AGGREGATIONS:
+            raise ValueError(f'Unknown aggregation "{op}" for "{name}" (should be one of {", ".join(_AGGREGATIONS)})')
+        if field is None and op in (_AGG_SUM, _AGG_MIN, _AGG_MAX):
+            raise ValueError(f'Aggregation "{op}" for "{name}" needs a key getter for the value to aggregate')
+        specs.append((name, op, _KeyGetter([field], single=True) if field is not None else None))
+
+    def initial() -> List[Any]:
+        return [[] if op == _AGG_LIST else 0 if op in (_AGG_COUNT, _AGG_SUM) else _MISSING for _, op, _ in specs]
+
+    indexed = list(enumerate(specs))
+    groups: Dict[Hashable, List[Any]] = {}
+    for stuff in list_of_stuff:
+        key = get_key(stuff)
+        state = groups.get(key)
+        if state is None:
+            state = groups[key] = initial()
+
+        for i, (_, op, getter) in indexed:
+            if getter is None:
+                if op == _AGG_COUNT:
+                    state[i] += 1
+                elif op == _AGG_LIST:
+                    state[i].append(stuff)
+                elif state[i] is _MISSING:  # First
+                    state[i] = stuff
+                continue
+
+            val = getter(stuff)
+            if op == _AGG_LIST:
+                state[i].append(val)
+            elif op == _AGG_FIRST:
+                if state[i] is _MISSING:
+                    state[i] = val
+            elif val is None:
+                continue  # Nones don't count towards the rest
+            elif op == _AGG_COUNT:
+                state[i] += 1
+            elif op == _AGG_SUM:
+                state[i] += val
+            elif op == _AGG_MIN:
+                if state[i] is _MISSING or val < state[i]:
+                    state[i] = val
+            elif state[i] is _MISSING or val > state[i]:  # Max
+                state[i] = val
+
+    names = [name for name, _, _ in specs]
+    return {key: {name: (None if v is _MISSING else v) for name, v in zip(names, state)}
+            for key, state in groups.items()}
 
 
 def group_by(list_of_stuff: Iterable[T_OBJ],
-             key_getter: Union[str, int, Callable]) -> Dict[Any, List[T_OBJ]]:
+             key_getter: Union[T_KEY_GETTER, List[T_KEY_GETTER], Tuple[T_KEY_GETTER, ...]],
+             aggregations: Optional[Dict[str, Union[str, Tuple[str, T_KEY_GETTER]]]] = None
+             ) -> Dict[Any, Union[List[T_OBJ], Dict[str, Any]]]:
     """Given a list of stuff and a "key getter", returns a dict with key value
     pairs of the values given by the "key getter" as the unique keys in that
     dict and the values a list of the stuffs from the given list who's "key
@@ -29,22 +175,141 @@ def group_by(list_of_stuff: Iterable[T_OBJ],
      - Any callable: will assume a method that takes in an object of the type in
      the list of stuff and returns the required value from the object to use as
      a key and group the objects by.
-    """
-    group_map: Dict[Hashable, List[T_OBJ]] = {}
-    if isinstance(key_getter, (str, int)):
-        from ccptools.tpu.iters import any_getter
-        getter_call = lambda x: any_getter(x, key_getter)
+     - A list or tuple of any of the above: groups by the tuple of all their
+     values (even if there's only one of them).
+
+    If `aggregations` are given, the groups aren't collected into lists but
+    aggregated as the stuff is iterated over (in a single pass) and each group
+    maps to a dict of the aggregated values instead. The aggregations are
+    given as a dict of names to either an aggregation or an
+    (aggregation, key getter) tuple, where the key getter (of the same forms
+    as above) gets the value to aggregate from each object:
+     - "count": The number of objects (or of values that aren't None)
+     - "sum", "min", "max": The sum, minimum or maximum of the values (Nones
+     are skipped and min/max are None if there were no values)
+     - "first": The first object (or value)
+     - "list": A list of all the objects (or values)
 
+    Example:
+    >>> group_by(rows, ('region', 'kind'), {'n': 'count', 'isk': ('sum', 'amount')})
+    {('Delve', 'kill'): {'n': 2, 'isk': 1500}, ('Jita', 'trade'): {'n': 1, 'isk': 30}}
+    """
+    if isinstance(key_getter, (list, tuple)):
+        get_key = _KeyGetter(key_getter)
     else:
-        getter_call = key_getter
+        get_key = _KeyGetter([key_getter], single=True)
 
-    for stuff in list_of_stuff:
-        a = getter_call(stuff)
-        if isinstance(a, Callable):
-            a = a()
+    if aggregations is not None:
+        return _group_aggregate(list_of_stuff, get_key, aggregations)
 
-        if a not in group_map:
-            group_map[a] = []
-        group_map[a].append(stuff)
+    group_map: Dict[Hashable, List[T_OBJ]] = {}
+    for stuff in list_of_stuff:
+        a = get_key(stuff)
+        group = group_map.get(a)
+        if group is None:
+            group_map[a] = [stuff]
+        else:
+            group.append(stuff)
 
     return group_map
+
+
+def _spill(pairs: List[Tuple[Any, Any]], tmp_dir: Optional[str]) -> IO[bytes]:
+    """Writes the given (key, object) pairs to a temporary file (in order) and
+    returns it, rewound.
+    """
+    f = tempfile.TemporaryFile(dir=tmp_dir)
+    pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+    for pair in pairs:
+        pickler.dump(pair)
+        pickler.clear_memo()  # Don't keep references to everything written
+    f.seek(0)
+    return f
+
+
+def _read_run(f: IO[bytes]) -> Iterator[Tuple[Any, Any]]:
+    unpickler = pickle.Unpickler(f)
+    while True:
+        try:
+            yield unpickler.load()
+        except EOFError:
+            return
+
+
+def _external_sort(list_of_stuff: Iterable[T_OBJ],
+                   get_key: _KeyGetter,
+                   run_size: int,
+                   tmp_dir: Optional[str]) -> Iterator[Tuple[Any, T_OBJ]]:
+    """Yields (key, object) pairs sorted (stably) by key, sorting up to
+    `run_size` objects at a time in memory and spilling each sorted run to a
+    temporary file if there are more than that.
+    """
+    first_key = operator.itemgetter(0)
+    runs: List[IO[bytes]] = []
+    try:
+        it = iter(list_of_stuff)
+        while True:
+            chunk = [(get_key(stuff), stuff) for stuff in itertools.islice(it, run_size)]
+            chunk.sort(key=first_key)
+            if len(chunk) < run_size and not runs:  # All of it fits in memory
+                yield from chunk
+                return
+            if chunk:
+                runs.append(_spill(chunk, tmp_dir))
+            if len(chunk) < run_size:
+                break
+        del chunk
+        yield from heapq.merge(*[_read_run(f) for f in runs], key=first_key)
+    finally:
+        for f in runs:
+            f.close()
+
+
+def _iter_sorted_groups(list_of_stuff: Iterable[T_OBJ],
+                        get_key: _KeyGetter,
+                        run_size: int,
+                        tmp_dir: Optional[str]) -> Iterator[Tuple[Any, Iterator[T_OBJ]]]:
+    second = operator.itemgetter(1)
+    for key, pairs in itertools.groupby(_external_sort(list_of_stuff, get_key, run_size, tmp_dir),
+                                        operator.itemgetter(0)):
+        yield key, map(second, pairs)
+
+
+def iter_group_by(list_of_stuff: Iterable[T_OBJ],
+                  key_getter: Union[T_KEY_GETTER, List[T_KEY_GETTER], Tuple[T_KEY_GETTER, ...]],
+                  presorted: bool = True,
+                  run_size: int = 100_000,
+                  tmp_dir: Optional[str] = None) -> Iterator[Tuple[Any, Iterator[T_OBJ]]]:
+    """Streaming version of `group_by` that yields (key, group iterator) pairs
+    instead of collecting every group in memory. Takes the same key getters.
+
+    By default the stuff is assumed to already be sorted (or at least grouped)
+    by the key, so each contiguous run of objects with the same key is a group
+    (just like `itertools.groupby`). If the same key shows up again later, it's
+    yielded again as a new group.
+
+    If `presorted` is False, the stuff is sorted by key first (so keys must be
+    orderable): up to `run_size` objects at a time are sorted in memory and if
+    there are more than that, each sorted run is spilled to a temporary file
+    (in `tmp_dir`, using pickle, so the objects must be picklable) and the runs
+    are merged back while iterating. Objects within each group keep the order
+    they came in.
+
+    As with `itertools.groupby`, each group iterator is only valid until the
+    next pair is fetched, so consume it (or make a list of it) first.
+
+    Example:
+    >>> for player_id, events in iter_group_by(read_sorted_events(), 'player_id'):
+    ...     process(player_id, events)
+    """
+    if isinstance(key_getter, (list, tuple)):
+        get_key = _KeyGetter(key_getter)
+    else:
+        get_key = _KeyGetter([key_getter], single=True)
+
+    if presorted:
+        return itertools.groupby(list_of_stuff, get_key)
+
+    if run_size < 1:  # Checked here rather than in the generator, so it's raised right away
+        raise ValueError('run_size must be at least 1')
+    return _iter_sorted_groups(list_of_stuff, get_key, run_size, tmp_dir)
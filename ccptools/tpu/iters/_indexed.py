@@ -0,0 +1,112 @@
+__all__ = [
+    'IndexedCollection',
+]
+
+from ccptools.tpu.structs import *
+
+from ._sketch import HyperLogLog, MinHash
+
+
+class IndexedCollection(object):
+    """A collection that's hashed once so `has_all`, `has_any` and `venn`
+    queries against it don't have to turn it into a set every time (those
+    functions also accept an `IndexedCollection` in place of a list and use
+    its index).
+
+    With `sketch` set, a `HyperLogLog` and a `MinHash` sketch are built as well
+    for approximate overlap queries (`approx_intersection_size` and
+    `approx_jaccard`) against other sketched collections. Those only need the
+    sketches, so call `drop_index()` to free the memory of the full index if
+    that's all that's needed.
+
+    Example:
+    >>> online = IndexedCollection(online_character_ids)
+    >>> online.has_any(fleet_member_ids)
+    True
+    """
+    __slots__ = ('_index', 'hll', 'minhash')
+
+    def __init__(self,
+                 items: Iterable[Hashable],
+                 sketch: bool = False,
+                 hll_precision: int = 14,
+                 minhash_size: int = 256):
+        if isinstance(items, Mapping):
+            items = items.keys()
+        self._index: Optional[FrozenSet[Hashable]] = frozenset(items)
+        self.hll: Optional[HyperLogLog] = None
+        self.minhash: Optional[MinHash] = None
+        if sketch:
+            self.hll = HyperLogLog(self._index, precision=hll_precision)
+            self.minhash = MinHash(self._index, size=minhash_size)
+
+    @property
+    def index(self) -> FrozenSet[Hashable]:
+        if self._index is None:
+            raise ValueError('The index of this collection has been dropped (only the sketches are left)')
+        return self._index
+
+    def drop_index(self):
+        """Frees the full index, keeping only the sketches."""
+        if self.hll is None:
+            raise ValueError('Dropping the index of a collection without sketches would leave nothing')
+        self._index = None
+
+    def __repr__(self):
+        if self._index is None:
+            return f'IndexedCollection(~{len(self.hll)} items, sketch only)'
+        return f'IndexedCollection({len(self._index)} items{", sketched" if self.hll else ""})'
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self.index
+
+    def has_all(self, sub_list: Iterable[Hashable]) -> bool:
+        """Same as `has_all(self, sub_list)`."""
+        if isinstance(sub_list, IndexedCollection):
+            return sub_list.index.issubset(self.index)
+        return self.index.issuperset(sub_list)
+
+    def has_any(self, sub_list: Iterable[Hashable]) -> bool:
+        """Same as `has_any(self, sub_list)` (True for an empty sub_list)."""
+        if isinstance(sub_list, IndexedCollection):
+            sub_list = sub_list.index
+        elif not isinstance(sub_list, (set, frozenset, Mapping)):
+            sub_list = list(sub_list)
+        if not sub_list:
+            return True
+        return not self.index.isdisjoint(sub_list)
+
+    def venn(self, right: Iterable[Hashable]) -> Tuple[List, List, List]:
+        """Same as `venn(self, right)`."""
+        left = self.index
+        right = right.index if isinstance(right, IndexedCollection) else set(right)
+        return list(left.difference(right)), list(left.intersection(right)), list(right.difference(left))
+
+    def _sketches(self, other: 'IndexedCollection'):
+        if self.hll is None or other.hll is None:
+            raise ValueError('Approximate queries need both collections to be created with sketch=True')
+
+    def approx_len(self) -> int:
+        """The estimated number of items (from the HyperLogLog sketch)."""
+        self._sketches(self)
+        return self.hll.count()
+
+    def approx_jaccard(self, other: 'IndexedCollection') -> float:
+        """The estimated Jaccard similarity (size of the intersection over size
+        of the union) with the other collection (from the MinHash sketches).
+        """
+        self._sketches(other)
+        return self.minhash.jaccard(other.minhash)
+
+    def approx_intersection_size(self, other: 'IndexedCollection') -> int:
+        """The estimated number of items in both collections (the Jaccard
+        similarity from MinHash times the size of the union from HyperLogLog).
+        """
+        self._sketches(other)
+        return int(round(self.minhash.jaccard(other.minhash) * (self.hll | other.hll).count()))
@@ -1,13 +1,25 @@
 __all__ = [
     'venn',
+    'VennSide',
+    'iter_venn',
     'startswith',
     'endswith',
     'has',
+    'find_all',
     'has_all',
     'has_any',
 ]
 
 from ccptools.tpu.structs import *
+import functools
+import itertools
+import pickle
+import tempfile
+from typing import IO
+
+from ._indexed import IndexedCollection
+
+_MISSING = object()
 
 
 def venn(left: Union[List, Set, Tuple, Dict], right: Union[List, Set, Tuple, Dict]) -> Tuple[List, List, List]:
@@ -33,18 +45,156 @@ def venn(left: Union[List, Set, Tuple, Dict], right: Union[List, Set, Tuple, Dic
     Using a dict (or dict like iterable object) will only use and return the
     keys, ignoring the values.
 
+    Use an `IndexedCollection` as either input to skip turning it into a set
+    (again).
+
     :param left: Any iterable that can be turned into a set as the left set
-    :type left: list | tuple | set | dict | str | unicode
+    :type left: list | tuple | set | dict | str | unicode | IndexedCollection
     :param right: Any iterable that can be turned into a set as the right set
-    :type right: list | tuple | set | dict | str | unicode
+    :type right: list | tuple | set | dict | str | unicode | IndexedCollection
     :return: A three-tuple of lists (see description)
     :rtype: (list, list, list)
     """
-    left = set(left)
-    right = set(right)
+    left = left.index if isinstance(left, IndexedCollection) else set(left)
+    right = right.index if isinstance(right, IndexedCollection) else set(right)
     return list(left.difference(right)), list(left.intersection(right)), list(right.difference(left))
 
 
+class VennSide(enum.IntEnum):
+    """Which part of a Venn diagram `iter_venn` yields an item for (the values
+    match the index of the same part in what `venn` returns).
+    """
+    LEFT = 0
+    BOTH = 1
+    RIGHT = 2
+
+
+def _merge_venn(left: Iterable[Any], right: Iterable[Any]) -> Iterator[Tuple[VennSide, Any]]:
+    def unique(it, name):
+        prev = _MISSING
+        for x in it:
+            if prev is not _MISSING:
+                if x == prev:
+                    continue
+                if x < prev:
+                    raise ValueError(f'The {name} input is not sorted ({x!r} came after {prev!r})')
+            prev = x
+            yield x
+
+    left_it = unique(left, 'left')
+    right_it = unique(right, 'right')
+    a = next(left_it, _MISSING)
+    b = next(right_it, _MISSING)
+    while a is not _MISSING and b is not _MISSING:
+        if a == b:
+            yield VennSide.BOTH, a
+            a = next(left_it, _MISSING)
+            b = next(right_it, _MISSING)
+        elif a < b:
+            yield VennSide.LEFT, a
+            a = next(left_it, _MISSING)
+        else:
+            yield VennSide.RIGHT, b
+            b = next(right_it, _MISSING)
+    if a is not _MISSING:
+        yield VennSide.LEFT, a
+        for a in left_it:
+            yield VennSide.LEFT, a
+    if b is not _MISSING:
+        yield VennSide.RIGHT, b
+        for b in right_it:
+            yield VennSide.RIGHT, b
+
+
+def _in_memory_venn(left: Iterable[Any], right: Iterable[Any]) -> Iterator[Tuple[VennSide, Any]]:
+    for side, items in zip(VennSide, venn(left, right)):
+        for x in items:
+            yield side, x
+
+
+def _partition_venn(left: Iterable[Any], right: Iterable[Any], max_in_memory: int, partitions: int,
+                    tmp_dir: Optional[str]) -> Iterator[Tuple[VennSide, Any]]:
+    left_it = iter(left)
+    right_it = iter(right)
+    left_buf = list(itertools.islice(left_it, max_in_memory + 1))
+    right_buf = []
+    if len(left_buf) <= max_in_memory:
+        right_buf = list(itertools.islice(right_it, max_in_memory - len(left_buf) + 1))
+        if len(left_buf) + len(right_buf) <= max_in_memory:  # Both fit, so the fast path it is
+            yield from _in_memory_venn(left_buf, right_buf)
+            return
+
+    # Spill both inputs to disk partitioned by hash, so each partition of the
+    # left side can only share items with the same partition of the right
+    files: List[List[IO[bytes]]] = []
+    try:
+        for items in (itertools.chain(left_buf, left_it), itertools.chain(right_buf, right_it)):
+            side_files = [tempfile.TemporaryFile(dir=tmp_dir) for _ in range(partitions)]
+            files.append(side_files)
+            picklers = [pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL) for f in side_files]
+            for x in items:
+                pickler = picklers[hash(x) % partitions]
+                pickler.dump(x)
+                pickler.clear_memo()
+        del left_buf, right_buf
+
+        for left_file, right_file in zip(*files):
+            yield from _in_memory_venn(_read_partition(left_file), _read_partition(right_file))
+            left_file.close()
+            right_file.close()
+    finally:
+        for side_files in files:
+            for f in side_files:
+                f.close()
+
+
+def _read_partition(f: IO[bytes]) -> Iterator[Any]:
+    f.seek(0)
+    unpickler = pickle.Unpickler(f)
+    while True:
+        try:
+            yield unpickler.load()
+        except EOFError:
+            return
+
+
+def iter_venn(left: Iterable[Any],
+              right: Iterable[Any],
+              presorted: bool = False,
+              max_in_memory: int = 1_000_000,
+              partitions: int = 64,
+              tmp_dir: Optional[str] = None) -> Iterator[Tuple[VennSide, Any]]:
+    """Streaming version of `venn` that lazily yields (side, item) pairs, where
+    side is a `VennSide` (LEFT for items unique to the left input, BOTH for
+    items in both and RIGHT for items unique to the right input), for inputs
+    too large to hold as sets in memory.
+
+    As with `venn`, duplicates are ignored (each unique item is yielded once).
+
+    If `presorted` is set, both inputs must be sorted (ascending) iterables and
+    they are merged in a single pass, holding only one item of each in memory
+    at a time, and yielding items in sorted order. A ValueError is raised if
+    either input turns out not to be sorted.
+
+    Otherwise, if both inputs together are no more than `max_in_memory` items,
+    this is just `venn` (in the same order). If they're larger, both are
+    spilled to `partitions` temporary files each (in `tmp_dir`, using pickle,
+    so the items must be picklable) by hash, and each pair of partitions is
+    compared in memory in turn, so only about 1/`partitions` of the unique
+    items need to fit in memory at a time.
+
+    Example:
+    >>> for side, player_id in iter_venn(read_sorted_ids('a.csv'), read_sorted_ids('b.csv'), presorted=True):
+    ...     if side != VennSide.BOTH:
+    ...         report(side.name, player_id)
+    """
+    if presorted:
+        return _merge_venn(left, right)
+    if partitions < 1:
+        raise ValueError('partitions must be at least 1')
+    return _partition_venn(left, right, max_in_memory, partitions, tmp_dir)
+
+
 def startswith(main_list: Union[Tuple[Any], List[Any]], sub_list: Union[Tuple[Any], List[Any]]) -> bool:
     """Returns True if the given main_list starts with the same values
     (in order) as the given sub_list.
@@ -95,56 +245,152 @@ def endswith(main_list: Union[Tuple[Any], List[Any]], sub_list: Union[Tuple[Any]
     return found
 
 
-def has(main_list: Union[Tuple[Any], List[Any]], sub_list: Union[Tuple[Any], List[Any]]) -> bool:
+def _failure_table(sub: Tuple[Any, ...]) -> Tuple[int, ...]:
+    """The Knuth-Morris-Pratt failure table of the given sub-sequence, i.e.
+    for each position, the length of the longest proper prefix of the
+    sub-sequence up to there that's also a suffix of it.
+    """
+    table = [0] * len(sub)
+    k = 0
+    for i in range(1, len(sub)):
+        while k and sub[i] != sub[k]:
+            k = table[k - 1]
+        if sub[i] == sub[k]:
+            k += 1
+        table[i] = k
+    return tuple(table)
+
+
+_cached_failure_table = functools.lru_cache(maxsize=1024)(_failure_table)
+
+
+def _get_failure_table(sub: Tuple[Any, ...]) -> Tuple[int, ...]:
+    try:
+        return _cached_failure_table(sub)
+    except TypeError:  # Unhashable values
+        return _failure_table(sub)
+
+
+def _find_all_indexed(main_list: Union[Tuple[Any], List[Any]], sub: Tuple[Any, ...], table: Tuple[int, ...],
+                      overlapping: bool) -> Iterator[int]:
+    # Same as the KMP search of _find_all_iter except that whenever nothing is
+    # matched so far, we skip ahead to the next occurrence of the first value
+    # with `index()` (which is much faster than stepping through in Python)
+    n = len(main_list)
+    m = len(sub)
+    first = sub[0]
+    i = 0
+    j = 0
+    while i < n:
+        if j == 0:
+            if n - i < m:
+                return
+            try:
+                i = main_list.index(first, i)
+            except ValueError:
+                return
+            i += 1
+            if m == 1:
+                yield i - 1
+            else:
+                j = 1
+            continue
+
+        x = main_list[i]
+        while j and x != sub[j]:
+            j = table[j - 1]
+        if x == sub[j]:
+            j += 1
+            if j == m:
+                yield i - m + 1
+                j = table[j - 1] if overlapping else 0
+        i += 1
+
+
+def _find_all_iter(main_iter: Iterable[Any], sub: Tuple[Any, ...], table: Tuple[int, ...],
+                   overlapping: bool) -> Iterator[int]:
+    m = len(sub)
+    j = 0
+    for i, x in enumerate(main_iter):
+        while j and x != sub[j]:
+            j = table[j - 1]
+        if x == sub[j]:
+            j += 1
+            if j == m:
+                yield i - m + 1
+                j = table[j - 1] if overlapping else 0
+
+
+def find_all(main_list: Iterable[Any], sub_list: Union[Tuple[Any], List[Any]], overlapping: bool = True) -> Iterator[int]:
+    """Yields the start index of every occurrence of the values of the given
+    sub_list (in sequential order) in the given main_list.
+
+    Uses the Knuth-Morris-Pratt algorithm, so this takes linear time no matter
+    how repetitive the values are, and only goes through the main_list once,
+    so it can be any iterable (e.g. a stream of events) and matches are
+    yielded as soon as they're seen.
+
+    The KMP failure table of each sub_list is cached (for hashable values).
+
+    Example:
+    >>> list(find_all(['a', 'a', 'b', 'a', 'a', 'a', 'b'], ['a', 'a', 'b']))
+    [0, 4]
+    >>> list(find_all('aaaa', 'aa')), list(find_all('aaaa', 'aa', overlapping=False))
+    ([0, 1, 2], [0, 2])
+
+    :param main_list: The values to search through
+    :param sub_list: The values to search for
+    :param overlapping: Yield matches that overlap previous ones?
+    """
+    sub = tuple(sub_list)
+    if not sub:
+        i = -1
+        for i, _ in enumerate(main_list):
+            yield i
+        yield i + 1
+        return
+
+    table = _get_failure_table(sub)
+    if isinstance(main_list, (list, tuple)):
+        yield from _find_all_indexed(main_list, sub, table, overlapping)
+    else:
+        yield from _find_all_iter(main_list, sub, table, overlapping)
+
+
+def has(main_list: Iterable[Any], sub_list: Union[Tuple[Any], List[Any]]) -> bool:
     """Returns True if the given main_list has all the same values as the given
     sub_list in sequential order (or "is-ordered-subset").
 
+    The main_list can be any iterable (it's only consumed up to the end of the
+    first match). See `find_all` for how.
+
     :param main_list:
-    :type main_list: list | tuple
+    :type main_list: list | tuple | Iterable
     :param sub_list:
     :type sub_list: list | tuple
     :return:
     :rtype:
     """
-    find_len = len(sub_list)
-    search_len = len(main_list)
-
     if not sub_list:
         return True
 
-    if find_len < search_len:
-        first_sym = sub_list[0]
-        if find_len > 1:
-            idx = -1
-            found = False
-            stopdex = search_len - find_len
-            while not found:
-                try:
-                    idx = main_list.index(first_sym, idx + 1)
-                    if idx > stopdex:
-                        return False
-                    found = True
-                    for i in range(1, find_len):
-                        if sub_list[i] != main_list[idx + i]:
-                            found = False
-                            break
-                except ValueError:
-                    break
-            return found
-        else:
-            return first_sym in main_list
-    elif find_len > search_len:
-        return False
-    else:
-        return find_len == search_len
+    if isinstance(main_list, (str, bytes)) and isinstance(sub_list, type(main_list)):
+        return sub_list in main_list
+
+    for _ in find_all(main_list, sub_list):
+        return True
+    return False
 
 
 def has_all(main_list: Union[Tuple[Any], List[Any]], sub_list: Union[Tuple[Any], List[Any]]) -> bool:
     """Returns True if the given main_list contains all the values of the given
     sub_list (in any order).
 
+    Use an `IndexedCollection` as the main_list to skip turning it into a set
+    (again).
+
     :param main_list:
-    :type main_list: list | tuple | set | dict
+    :type main_list: list | tuple | set | dict | IndexedCollection
     :param sub_list:
     :type sub_list: list | tuple | set | dict
     :return:
@@ -152,6 +398,8 @@ def has_all(main_list: Union[Tuple[Any], List[Any]], sub_list: Union[Tuple[Any],
     """
     if not sub_list:
         return True
+    if isinstance(main_list, IndexedCollection):
+        return main_list.has_all(sub_list)
     sub_set = set(sub_list)
     main_set = set(main_list)
     return sub_set.issubset(main_set)
@@ -161,8 +409,11 @@ def has_any(main_list: Union[Tuple[Any], List[Any]], sub_list: Union[Tuple[Any],
     """Returns true if the given main_list contains any of the values in the
     given sub_list (in any order).
 
+    Use an `IndexedCollection` as the main_list to skip turning it into a set
+    (again).
+
     :param main_list:
-    :type main_list: list | tuple | set | dict
+    :type main_list: list | tuple | set | dict | IndexedCollection
     :param sub_list:
     :type sub_list: list | tuple | set | dict
     :return:
@@ -170,6 +421,8 @@ def has_any(main_list: Union[Tuple[Any], List[Any]], sub_list: Union[Tuple[Any],
     """
     if not sub_list:
         return True
+    if isinstance(main_list, IndexedCollection):
+        return main_list.has_any(sub_list)
     sub_set = set(sub_list)
     main_set = set(main_list)
     for val in sub_set:
@@ -0,0 +1,210 @@
+__all__ = [
+    'PatternMatcher',
+    'PatternMatches',
+    'PatternStream',
+]
+
+from ccptools.tpu.structs import *
+import collections
+
+T_PATTERN_ID = Hashable
+
+
+class PatternMatches(object):
+    """The patterns a `PatternMatcher` found in a sequence (or so far in a
+    `PatternStream`).
+
+    :ivar found: Ids of all patterns that occur anywhere
+    :ivar prefixes: Ids of patterns the sequence starts with
+    :ivar suffixes: Ids of patterns the sequence ends with
+    :ivar matches: (start index, pattern id) of every occurrence, in the order
+                   they end in (only collected if asked for)
+    """
+    __slots__ = ('found', 'prefixes', 'suffixes', 'matches')
+
+    def __init__(self):
+        self.found: Set[T_PATTERN_ID] = set()
+        self.prefixes: Set[T_PATTERN_ID] = set()
+        self.suffixes: Set[T_PATTERN_ID] = set()
+        self.matches: List[Tuple[int, T_PATTERN_ID]] = []
+
+    def __repr__(self):
+        return f'PatternMatches(found={self.found!r}, prefixes={self.prefixes!r}, suffixes={self.suffixes!r})'
+
+
+class PatternMatcher(object):
+    """Matches sequences (of hashable values) against many patterns at once in
+    a single pass, using an Aho-Corasick automaton built once from the
+    patterns.
+
+    This replaces looping over patterns calling `has`, `startswith` and
+    `endswith` for each (which costs the number of patterns times the length
+    of the sequence) with a cost that's linear in the length of the sequence
+    (plus the number of matches).
+
+    Patterns are given either as a list of sequences (in which case their ids
+    are their indexes in the list) or as a dict of ids to sequences.
+
+    Empty patterns occur everywhere (so they're always found, prefixes and
+    suffixes) but aren't listed in the matches.
+
+    Example:
+    >>> matcher = PatternMatcher({'kill': ['warp', 'lock', 'shoot'], 'flee': ['lock', 'warp']})
+    >>> result = matcher.search(['warp', 'lock', 'shoot', 'lock', 'warp'])
+    >>> result.found, result.prefixes, result.suffixes
+    ({'kill', 'flee'}, {'kill'}, {'flee'})
+    """
+
+    def __init__(self, patterns: Union[Iterable[Sequence[Hashable]], Mapping[T_PATTERN_ID, Sequence[Hashable]]]):
+        if isinstance(patterns, Mapping):
+            items = list(patterns.items())
+        else:
+            items = list(enumerate(patterns))
+
+        # Per state: transitions of the trie, failure link and the (id,
+        # length) of every pattern that ends there (including via failure links)
+        goto: List[Dict[Hashable, int]] = [{}]
+        outputs: List[List[Tuple[T_PATTERN_ID, int]]] = [[]]
+        self._empty: Tuple[T_PATTERN_ID, ...] = tuple(pid for pid, p in items if len(p) == 0)
+
+        for pid, pattern in items:
+            state = 0
+            for x in pattern:
+                nxt = goto[state].get(x)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][x] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            if state:
+                outputs[state].append((pid, len(pattern)))
+
+        fail = [0] * len(goto)
+        queue = collections.deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for x, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and x not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(x, 0)
+                outputs[nxt].extend(outputs[fail[nxt]])
+
+        self.patterns: Dict[T_PATTERN_ID, Tuple[Hashable, ...]] = {pid: tuple(p) for pid, p in items}
+        self._goto = goto
+        self._fail = fail
+        self._outputs: List[Tuple[Tuple[T_PATTERN_ID, int], ...]] = [tuple(o) for o in outputs]
+        self._alphabet: FrozenSet[Hashable] = frozenset(x for p in self.patterns.values() for x in p)
+        # Memoized transitions (including failure link walks) per state
+        self._delta: List[Dict[Hashable, int]] = [dict(g) for g in goto]
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def __repr__(self):
+        return f'PatternMatcher(patterns={len(self.patterns)}, states={len(self._goto)})'
+
+    def _step(self, state: int, x: Hashable) -> int:
+        if x not in self._alphabet:
+            return 0
+        delta = self._delta[state]
+        nxt = delta.get(x)
+        if nxt is None:
+            goto = self._goto
+            fail = self._fail
+            s = state
+            while s and x not in goto[s]:
+                s = fail[s]
+            nxt = goto[s].get(x, 0)
+            delta[x] = nxt
+        return nxt
+
+    def iter_matches(self, sequence: Iterable[Hashable]) -> Iterator[Tuple[int, T_PATTERN_ID]]:
+        """Yields (start index, pattern id) for every occurrence of every
+        (non-empty) pattern in the given sequence (which can be any iterable)
+        as soon as the occurrence ends.
+        """
+        state = 0
+        step = self._step
+        outputs = self._outputs
+        for i, x in enumerate(sequence):
+            state = step(state, x)
+            for pid, length in outputs[state]:
+                yield i - length + 1, pid
+
+    def search(self, sequence: Iterable[Hashable], collect_matches: bool = False) -> PatternMatches:
+        """Finds all patterns that occur in the given sequence (which can be any
+        iterable), and which of those it starts and ends with, in a single pass.
+
+        :param collect_matches: Also collect every occurrence in `matches`?
+        """
+        stream = self.stream(collect_matches)
+        stream.feed(sequence)
+        return stream.result()
+
+    def stream(self, collect_matches: bool = False) -> 'PatternStream':
+        """Returns a `PatternStream` to feed elements to one (or a few) at a
+        time.
+        """
+        return PatternStream(self, collect_matches)
+
+
+class PatternStream(object):
+    """Incrementally matches elements fed to it against the patterns of a
+    `PatternMatcher` (see `PatternMatcher.stream()`).
+    """
+    __slots__ = ('matcher', 'position', 'collect_matches', '_state', '_result')
+
+    def __init__(self, matcher: PatternMatcher, collect_matches: bool = False):
+        self.matcher = matcher
+        self.position = 0  # Number of elements fed so far
+        self.collect_matches = collect_matches
+        self._state = 0
+        self._result = PatternMatches()
+        self._result.found.update(matcher._empty)
+        self._result.prefixes.update(matcher._empty)
+
+    def feed(self, elements: Iterable[Hashable]) -> List[Tuple[int, T_PATTERN_ID]]:
+        """Feeds the given elements and returns the (start index, pattern id)
+        of every occurrence that ended within them.
+        """
+        state = self._state
+        position = self.position
+        step = self.matcher._step
+        outputs = self.matcher._outputs
+        result = self._result
+        found = result.found
+        prefixes = result.prefixes
+        new = []
+        for x in elements:
+            state = step(state, x)
+            position += 1
+            if outputs[state]:
+                for pid, length in outputs[state]:
+                    start = position - length
+                    found.add(pid)
+                    if start == 0:
+                        prefixes.add(pid)
+                    new.append((start, pid))
+        self._state = state
+        self.position = position
+        if self.collect_matches:
+            result.matches.extend(new)
+        return new
+
+    def push(self, element: Hashable) -> List[Tuple[int, T_PATTERN_ID]]:
+        """Feeds a single element (see `feed()`)."""
+        return self.feed((element,))
+
+    @property
+    def suffixes(self) -> Set[T_PATTERN_ID]:
+        """Ids of the patterns the elements fed so far end with."""
+        return set(pid for pid, _ in self.matcher._outputs[self._state]).union(self.matcher._empty)
+
+    def result(self) -> PatternMatches:
+        """The patterns found so far (with `suffixes` as of now)."""
+        result = self._result
+        result.suffixes = self.suffixes
+        return result
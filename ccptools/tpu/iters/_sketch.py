@@ -0,0 +1,188 @@
+__all__ = [
+    'stable_hash64',
+    'HyperLogLog',
+    'MinHash',
+]
+
+"""Bounded memory sketches for approximate cardinality and set similarity.
+"""
+from ccptools.tpu.structs import *
+import hashlib
+import heapq
+import math
+
+_MASK64 = (1 << 64) - 1
+
+
+def stable_hash64(x: Any) -> int:
+    """A 64 bit hash of the given value that, unlike `hash()`, is the same in
+    every process (so sketches can be built in one and compared in another).
+
+    Strings, bytes and ints are hashed by value, anything else by its `repr`.
+    """
+    if isinstance(x, str):
+        data = b's' + x.encode('utf-8', 'surrogatepass')
+    elif isinstance(x, (bytes, bytearray)):
+        data = b'b' + bytes(x)
+    elif isinstance(x, int) and not isinstance(x, bool):
+        data = b'i' + x.to_bytes((x.bit_length() + 8) // 8, 'little', signed=True)
+    else:
+        data = b'r' + repr(x).encode('utf-8', 'surrogatepass')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+class HyperLogLog(object):
+    """Estimates the number of unique items added to it using 2**`precision`
+    bytes of memory (16 KiB by default) with a standard error of about
+    1.04 / sqrt(2**`precision`) (0.8% by default).
+
+    Sketches with the same precision (and hash function) can be merged with
+    `|` (or `update_from`) to estimate the size of the union, and the size of
+    an intersection can be estimated from that (see `intersection_size`).
+    """
+    __slots__ = ('precision', 'hash_func', 'registers')
+
+    def __init__(self, items: Iterable[Any] = (), precision: int = 14,
+                 hash_func: Callable[[Any], int] = stable_hash64):
+        if not 4 <= precision <= 18:
+            raise ValueError('precision must be between 4 and 18')
+        self.precision = precision
+        self.hash_func = hash_func
+        self.registers = bytearray(1 << precision)
+        self.update(items)
+
+    def __repr__(self):
+        return f'HyperLogLog(~{len(self)}, precision={self.precision})'
+
+    def add(self, item: Any):
+        self.update((item,))
+
+    def update(self, items: Iterable[Any]):
+        p = self.precision
+        q = 64 - p
+        low_mask = (1 << q) - 1
+        registers = self.registers
+        hash_func = self.hash_func
+        for item in items:
+            h = hash_func(item) & _MASK64
+            idx = h >> q
+            rank = q - (h & low_mask).bit_length() + 1
+            if rank > registers[idx]:
+                registers[idx] = rank
+
+    def _check_compatible(self, other: 'HyperLogLog'):
+        if other.precision != self.precision or other.hash_func is not self.hash_func:
+            raise ValueError('Can only combine HyperLogLogs of the same precision and hash function')
+
+    def update_from(self, other: 'HyperLogLog'):
+        """Merges the given sketch into this one (making this one a sketch of
+        the union of both).
+        """
+        self._check_compatible(other)
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def __or__(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        union = HyperLogLog(precision=self.precision, hash_func=self.hash_func)
+        union.registers = bytearray(self.registers)
+        union.update_from(other)
+        return union
+
+    def count(self) -> int:
+        """The estimated number of unique items added."""
+        m = len(self.registers)
+        if m == 16:
+            alpha = 0.673
+        elif m == 32:
+            alpha = 0.697
+        elif m == 64:
+            alpha = 0.709
+        else:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:  # Small range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def __len__(self):
+        return self.count()
+
+    def intersection_size(self, other: 'HyperLogLog') -> int:
+        """Estimates the number of unique items in both sketches (by
+        inclusion-exclusion, so the error is relative to the union, not the
+        intersection).
+        """
+        return max(0, self.count() + other.count() - (self | other).count())
+
+
+class MinHash(object):
+    """Estimates the Jaccard similarity (size of intersection over size of
+    union) between sets of items by keeping only the `size` smallest hashes of
+    each set (a "bottom-k" MinHash, which needs just one hash per item), with
+    a standard error of about 1 / sqrt(`size`). Sets no larger than `size` are
+    compared exactly.
+
+    Sketches being compared must have the same `size` and hash function.
+    """
+    __slots__ = ('size', 'hash_func', '_heap', '_hashes')
+
+    def __init__(self, items: Iterable[Any] = (), size: int = 256,
+                 hash_func: Callable[[Any], int] = stable_hash64):
+        if size < 1:
+            raise ValueError('size must be at least 1')
+        self.size = size
+        self.hash_func = hash_func
+        self._heap: List[int] = []  # The smallest hashes, negated (so the largest of them is on top)
+        self._hashes: Set[int] = set()
+        self.update(items)
+
+    def __repr__(self):
+        return f'MinHash(size={self.size})'
+
+    @property
+    def hashes(self) -> FrozenSet[int]:
+        """The (up to `size`) smallest hashes of the items added."""
+        return frozenset(self._hashes)
+
+    def add(self, item: Any):
+        self.update((item,))
+
+    def _add_hashes(self, hashes: Iterable[int]):
+        heap = self._heap
+        members = self._hashes
+        size = self.size
+        for h in hashes:
+            if h in members:
+                continue
+            if len(heap) < size:
+                heapq.heappush(heap, -h)
+                members.add(h)
+            elif h < -heap[0]:
+                members.discard(-heapq.heapreplace(heap, -h))
+                members.add(h)
+
+    def update(self, items: Iterable[Any]):
+        hash_func = self.hash_func
+        self._add_hashes(hash_func(item) & _MASK64 for item in items)
+
+    def _check_compatible(self, other: 'MinHash'):
+        if other.size != self.size or other.hash_func is not self.hash_func:
+            raise ValueError('Can only compare MinHashes of the same size and hash function')
+
+    def update_from(self, other: 'MinHash'):
+        """Merges the given sketch into this one (making this one a sketch of
+        the union of both).
+        """
+        self._check_compatible(other)
+        self._add_hashes(other._hashes)
+
+    def jaccard(self, other: 'MinHash') -> float:
+        """The estimated Jaccard similarity of the sets the two sketches were
+        made from.
+        """
+        self._check_compatible(other)
+        union = heapq.nsmallest(self.size, self._hashes | other._hashes)
+        if not union:
+            return 1.0  # Both empty
+        both = self._hashes & other._hashes
+        return sum(1 for h in union if h in both) / len(union)
@@ -1 +1,3 @@
 from ._total import *
+from ._profile import *
+from ._tracker import *
@@ -0,0 +1,329 @@
+__all__ = [
+    'SizeProfile',
+    'profile_size',
+]
+
+from typing import *
+import collections
+import random
+import sys
+import types
+
+_DEFAULT_SIZE = sys.getsizeof(0)  # estimate sizeof object without __sizeof__
+
+# Types whose attributes we never descend into (they'd drag in entire modules)
+_OPAQUE_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    types.CodeType,
+    types.FrameType,
+)
+
+_ITEM = '*'  # Path step used for items of unordered or unkeyed containers
+
+_K_NONE = 0
+_K_ITER = 1
+_K_SEQUENCE = 2
+_K_DICT = 3
+_K_HANDLER = 4
+
+
+def _dict_handler(d):
+    return d.items()
+
+
+class SizeProfile(object):
+    """The result of `profile_size`.
+
+    All sizes are in bytes. If any containers were sampled, the numbers are
+    estimates (see `estimated`).
+
+    :ivar total: The total (deep) size of the profiled object
+    :ivar by_type: Bytes attributed to each type
+    :ivar count_by_type: Number of (seen) objects of each type
+    :ivar by_path: Bytes attributed to each key path (truncated to the
+                   `path_depth` given to `profile_size`)
+    :ivar estimated: Number of containers whose contents were estimated from a
+                     sample rather than walked exactly
+    """
+    __slots__ = ('total', 'by_type', 'count_by_type', 'by_path', 'estimated')
+
+    def __init__(self):
+        self.total: int = 0
+        self.by_type: Dict[type, int] = {}
+        self.count_by_type: Dict[type, int] = {}
+        self.by_path: Dict[Tuple, int] = {}
+        self.estimated: int = 0
+
+    def __repr__(self):
+        return f'SizeProfile(total={self.total}, types={len(self.by_type)}, ' \
+               f'paths={len(self.by_path)}, estimated={self.estimated})'
+
+    def top_types(self, n: int = 10) -> List[Tuple[type, int, int]]:
+        """Returns the `n` types taking up the most bytes as a list of
+        (type, bytes, count) three-tuples.
+        """
+        top = sorted(self.by_type.items(), key=lambda kv: kv[1], reverse=True)[:n]
+        return [(t, s, self.count_by_type.get(t, 0)) for t, s in top]
+
+    def top_paths(self, n: int = 10, cumulative: bool = False) -> List[Tuple[Tuple, int]]:
+        """Returns the `n` key paths taking up the most bytes as a list of
+        (path, bytes) two-tuples.
+
+        If `cumulative` is set, the bytes of each path include everything
+        beneath it (so the root path is always the total).
+        """
+        paths = self.by_path
+        if cumulative:
+            paths = {}
+            for p, s in self.by_path.items():
+                for i in range(len(p) + 1):
+                    prefix = p[:i]
+                    paths[prefix] = paths.get(prefix, 0) + s
+        return sorted(paths.items(), key=lambda kv: kv[1], reverse=True)[:n]
+
+    def report(self, n: int = 10) -> str:
+        """Returns a human readable report of the `n` biggest types and paths.
+        """
+        lines = [f'Total: {self.total:,} bytes{" (estimated)" if self.estimated else ""}', '', 'By type:']
+        for t, s, c in self.top_types(n):
+            lines.append(f'  {s:>14,}  {c:>10,}  {t.__module__}.{t.__qualname__}')
+        lines.append('')
+        lines.append('By path (including everything beneath):')
+        for p, s in self.top_paths(n, cumulative=True):
+            lines.append(f'  {s:>14,}  {"/".join(str(k) for k in p) or "<root>"}')
+        return '\n'.join(lines)
+
+
+def _slot_names(t: type) -> List[str]:
+    names = []
+    for cls in t.__mro__:
+        slots = cls.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for name in slots:
+            if name in ('__dict__', '__weakref__'):
+                continue
+            if name.startswith('__') and not name.endswith('__'):
+                name = f'_{cls.__name__.lstrip("_")}{name}'  # Name mangling
+            names.append(name)
+    return names
+
+
+class _Strategy(object):
+    __slots__ = ('kind', 'handler', 'slots', 'has_dict')
+
+    def __init__(self, kind, handler=None, slots=None, has_dict=False):
+        self.kind = kind
+        self.handler = handler
+        self.slots = slots
+        self.has_dict = has_dict
+
+
+def _merge_handlers(handlers: Optional[Dict[type, Callable]]) -> Dict[type, Callable]:
+    all_handlers: Dict[type, Callable] = {
+        tuple: iter,
+        list: iter,
+        collections.deque: iter,
+        dict: _dict_handler,
+        set: iter,
+        frozenset: iter,
+    }
+    all_handlers.update(handlers or {})  # User handlers take precedence
+    return all_handlers
+
+
+def _resolve_strategy(t: type,
+                      all_handlers: Dict[type, Callable],
+                      handlers: Optional[Dict[type, Callable]],
+                      follow_attrs: bool) -> _Strategy:
+    # Resolves how to walk each type once instead of running isinstance over
+    # all the handlers for every single object
+    for typ, handler in all_handlers.items():
+        if issubclass(t, typ):
+            if handler is _dict_handler and (not handlers or typ not in handlers):
+                kind = _K_DICT
+            elif handler is iter and issubclass(t, (list, tuple, collections.deque)):
+                kind = _K_SEQUENCE
+            elif handler is iter:
+                kind = _K_ITER
+            else:
+                kind = _K_HANDLER
+            break
+    else:
+        kind = _K_NONE
+        handler = None
+
+    slots = None
+    has_dict = False
+    if follow_attrs and not issubclass(t, _OPAQUE_TYPES):
+        slots = _slot_names(t) or None
+        has_dict = any('__dict__' in c.__dict__ for c in t.__mro__)
+    return _Strategy(kind, handler, slots, has_dict)
+
+
+def profile_size(o: Any,
+                 handlers: Optional[Dict[type, Callable[[Any], Iterable]]] = None,
+                 follow_attrs: bool = True,
+                 path_depth: int = 1,
+                 sample_threshold: int = 0,
+                 sample_size: int = 100,
+                 seed: Optional[int] = None,
+                 verbose: bool = False) -> SizeProfile:
+    """Walks an object graph (iteratively, so deep structures are fine) and
+    returns a `SizeProfile` with the approximate memory footprint of the object
+    and all of its contents, attributed per type and per key path.
+
+    Automatically finds the contents of the following builtin containers and
+    their subclasses: tuple, list, deque, dict, set and frozenset. To search
+    other containers, add handlers to iterate over their contents (user
+    handlers take precedence):
+
+        handlers = {SomeContainerClass: iter,
+                    OtherContainerClass: OtherContainerClass.get_elements}
+
+    With `follow_attrs` set (the default), instance `__dict__` and `__slots__`
+    values are followed as well (which covers dataclasses). Classes, modules and
+    functions are counted but never descended into.
+
+    Key paths are tuples of dict keys, sequence indexes and attribute names
+    (like the key lists `nested_get` takes) and are truncated to `path_depth`
+    steps so bytes get rolled up at that level. Items of sets and containers
+    walked by custom handlers use `'*'` as their path step.
+
+    If `sample_threshold` is set, any container with more items than that
+    whose sampled items are all of the same type is estimated by walking only
+    `sample_size` randomly selected items and scaling their sizes up to the
+    full length of the container. Pass a `seed` for repeatable estimates.
+    Items that show up more than once in the sample are counted once instead,
+    but items shared between the container's slots that only show up once
+    in the sample are still scaled up, so such estimates err on the high
+    side.
+
+    :param o: The object to profile
+    :param handlers: Extra container types and how to iterate their contents
+    :param follow_attrs: Follow instance `__dict__` and `__slots__`?
+    :param path_depth: How many steps of the key path to attribute bytes to
+    :param sample_threshold: Sample containers with more items than this
+                             (0 means never sample)
+    :param sample_size: How many items to sample from such containers
+    :param seed: Seed for the random sampling
+    :param verbose: Print each object walked to stderr
+    """
+    all_handlers = _merge_handlers(handlers)
+    strategies: Dict[type, _Strategy] = {}
+    rng = random.Random(seed)
+
+    profile = SizeProfile()
+    by_type = profile.by_type
+    count_by_type = profile.count_by_type
+    by_path = profile.by_path
+    seen = set()
+    total = 0.0
+
+    # Each entry is (object, key path, weight) where the weight is the scaling
+    # factor for objects found inside sampled containers
+    stack: List[Tuple[Any, Tuple, float]] = [(o, (), 1.0)]
+    while stack:
+        obj, path, weight = stack.pop()
+        oid = id(obj)
+        if oid in seen:  # do not double count the same object
+            continue
+        seen.add(oid)
+
+        t = type(obj)
+        s = sys.getsizeof(obj, _DEFAULT_SIZE) * weight
+        if verbose:
+            print(int(s), t, repr(obj), file=sys.stderr)
+
+        total += s
+        by_type[t] = by_type.get(t, 0) + s
+        count_by_type[t] = count_by_type.get(t, 0) + 1
+        rolled = path[:path_depth]
+        by_path[rolled] = by_path.get(rolled, 0) + s
+
+        strategy = strategies.get(t)
+        if strategy is None:
+            strategy = strategies[t] = _resolve_strategy(t, all_handlers, handlers, follow_attrs)
+        deeper = len(path) < path_depth
+        kind = strategy.kind
+
+        if kind != _K_NONE:
+            # Only sized containers walked by their own iterator get sampled
+            # (custom handlers don't need to be sized at all)
+            n = len(obj) if sample_threshold and kind != _K_HANDLER and hasattr(t, '__len__') else 0
+            if n > sample_threshold and n > sample_size:
+                if kind == _K_SEQUENCE:
+                    idxs = sorted(rng.sample(range(n), sample_size))
+                    items = [(i, obj[i]) for i in idxs]
+                elif kind == _K_DICT:
+                    keys = rng.sample(list(obj), sample_size)
+                    items = [(k, (k, obj[k])) for k in keys]
+                else:
+                    items = [(_ITEM, i) for i in rng.sample(list(obj), sample_size)]
+
+                probe = [v[1] if kind == _K_DICT else v for _, v in items]
+                if len(set(map(type, probe))) == 1:
+                    profile.estimated += 1
+                    item_weight = weight * n / sample_size
+                    # Items that turn up more than once in the sample are
+                    # shared between slots, so they're counted once (like an
+                    # exact walk would) rather than scaled up
+                    hits = collections.Counter(map(id, probe))
+                    for k, v in reversed(items):
+                        child_path = path + (k,) if deeper else path
+                        value = v[1] if kind == _K_DICT else v
+                        stack.append((value, child_path, item_weight if hits[id(value)] == 1 else weight))
+                        if kind == _K_DICT:
+                            stack.append((v[0], child_path, item_weight))
+                    kind = _K_NONE  # Done with the contents
+
+            if kind == _K_SEQUENCE:
+                if deeper:
+                    stack.extend((v, path + (i,), weight) for i, v in reversed(list(enumerate(obj))))
+                else:
+                    stack.extend((v, path, weight) for v in reversed(obj))
+            elif kind == _K_DICT:
+                for k, v in reversed(list(obj.items())):
+                    child_path = path + (k,) if deeper else path
+                    stack.append((v, child_path, weight))
+                    stack.append((k, child_path, weight))
+            elif kind == _K_ITER:
+                child_path = path + (_ITEM,) if deeper else path
+                stack.extend((v, child_path, weight) for v in obj)
+            elif kind == _K_HANDLER:
+                child_path = path + (_ITEM,) if deeper else path
+                stack.extend((v, child_path, weight) for v in strategy.handler(obj))
+
+        if strategy.slots:
+            for name in reversed(strategy.slots):
+                try:
+                    v = getattr(obj, name)
+                except AttributeError:
+                    continue
+                stack.append((v, path + (name,) if deeper else path, weight))
+
+        if strategy.has_dict:
+            d = getattr(obj, '__dict__', None)
+            if isinstance(d, dict) and id(d) not in seen:
+                # The instance dict itself counts towards the object's path,
+                # its values towards their attribute names
+                seen.add(id(d))
+                ds = sys.getsizeof(d) * weight
+                total += ds
+                by_type[dict] = by_type.get(dict, 0) + ds
+                count_by_type[dict] = count_by_type.get(dict, 0) + 1
+                by_path[rolled] = by_path.get(rolled, 0) + ds
+                for k, v in reversed(list(d.items())):
+                    stack.append((v, path + (k,) if deeper else path, weight))
+                    stack.append((k, path, weight))
+
+    profile.total = int(round(total))
+    for k in by_type:
+        by_type[k] = int(round(by_type[k]))
+    for k in by_path:
+        by_path[k] = int(round(by_path[k]))
+    return profile
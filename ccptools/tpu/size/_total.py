@@ -2,10 +2,10 @@ __all__ = [
     'total_size',
 ]
 
-
+from typing import *
 import sys
-import itertools
-import collections
+
+from ._profile import _DEFAULT_SIZE, _K_DICT, _K_HANDLER, _K_NONE, _merge_handlers, _resolve_strategy
 
 
 def total_size(o, handlers=None, verbose=False):
@@ -20,33 +20,43 @@ def total_size(o, handlers=None, verbose=False):
         handlers = {SomeContainerClass: iter,
                     OtherContainerClass: OtherContainerClass.get_elements}
 
-    """
-    dict_handler = lambda d: itertools.chain.from_iterable(d.items())
-    all_handlers = {tuple: iter,
-                    list: iter,
-                    collections.deque: iter,
-                    dict: dict_handler,
-                    set: iter,
-                    frozenset: iter,
-                   }
-    handlers = handlers or {}
-    all_handlers.update(handlers)     # user handlers take precedence
-    seen = set()                      # track which object id's have already been seen
-    default_size = sys.getsizeof(0)       # estimate sizeof object without __sizeof__
-
-    def sizeof(o):
-        if id(o) in seen:       # do not double count the same object
-            return 0
-        seen.add(id(o))
-        s = sys.getsizeof(o, default_size)
+    The object graph is walked iteratively so deeply nested structures don't
+    hit the recursion limit. See `profile_size` for a breakdown of where the
+    bytes go (and for following instance attributes).
 
+    """
+    all_handlers = _merge_handlers(handlers)
+    kinds: Dict[type, Tuple[int, Optional[Callable]]] = {}
+    seen = set()
+    total = 0
+    stack = [o]
+    pop = stack.pop
+    extend = stack.extend
+    while stack:
+        obj = pop()
+        oid = id(obj)
+        if oid in seen:  # do not double count the same object
+            continue
+        seen.add(oid)
+        s = sys.getsizeof(obj, _DEFAULT_SIZE)
         if verbose:
-            print(s, type(o), repr(o), file=sys.stderr)
-
-        for typ, handler in all_handlers.items():
-            if isinstance(o, typ):
-                s += sum(map(sizeof, handler(o)))
-                break
-        return s
-
-    return sizeof(o)
+            print(s, type(obj), repr(obj), file=sys.stderr)
+        total += s
+
+        t = type(obj)
+        hit = kinds.get(t)
+        if hit is None:
+            strategy = _resolve_strategy(t, all_handlers, handlers, False)
+            hit = kinds[t] = (strategy.kind, strategy.handler)
+        kind, handler = hit
+        if kind == _K_NONE:
+            continue
+        if kind == _K_DICT:
+            for k, v in obj.items():
+                stack.append(v)
+                stack.append(k)
+        elif kind == _K_HANDLER:
+            extend(handler(obj))
+        else:
+            extend(obj)
+    return total
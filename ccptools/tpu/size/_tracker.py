@@ -0,0 +1,300 @@
+__all__ = [
+    'SizeTracker',
+    'SizeTrackedDict',
+    'SizeTrackedList',
+]
+
+from typing import *
+import abc
+import sys
+
+from ._total import total_size
+
+
+def _scale_sizes(sizes: List[int], total: int) -> List[int]:
+    # Scales the sizes proportionally to ints that add up to exactly `total`
+    # (by rounding the running sum, so the rounding errors don't add up)
+    measured = sum(sizes)
+    if not measured:
+        return [0] * len(sizes)
+    scaled = []
+    running = 0
+    prev = 0
+    for size in sizes:
+        running += size
+        cur = round(running * total / measured)
+        scaled.append(cur - prev)
+        prev = cur
+    return scaled
+
+
+class SizeTracker(abc.ABC):
+    """Base for containers that keep a running estimate of their own memory
+    footprint (as `total_size` would report it) without rescanning everything
+    on every change.
+
+    Each entry is measured with `total_size` once when it's added and that
+    size is subtracted again when it's removed. The size of the container
+    itself is re-read (cheaply) after each change.
+
+    Objects shared between entries are counted once per entry (whereas
+    `total_size` counts them only once), and entries mutated in place aren't
+    noticed, so the estimate can drift. Call `reconcile()` to rescan the
+    whole thing (or set `reconcile_every` to do so every N changes). That
+    re-measures every entry too and scales the entry sizes down so they add
+    up to the rescanned total (sharing the bytes of shared objects out among
+    the entries that share them).
+
+    If `max_bytes` is set, `on_exceeded` is called with the tracker whenever
+    a change leaves it larger than that. The callback is free to remove
+    entries (e.g. via `evict()`).
+    """
+
+    def __init__(self,
+                 max_bytes: Optional[int] = None,
+                 on_exceeded: Optional[Callable[[Any], Any]] = None,
+                 reconcile_every: int = 0,
+                 handlers: Optional[Dict[type, Callable]] = None):
+        self.max_bytes = max_bytes
+        self.on_exceeded = on_exceeded
+        self.reconcile_every = reconcile_every
+        self.handlers = handlers
+        self._entries_bytes = 0
+        self._changes = 0
+        self._in_callback = False
+
+    @property
+    @abc.abstractmethod
+    def data(self) -> Any:
+        """The wrapped container."""
+
+    @abc.abstractmethod
+    def _reset_sizes(self, entries_bytes: int):
+        """Re-measures the size of each entry, scaled so they add up to
+        `entries_bytes`.
+        """
+
+    @property
+    def nbytes(self) -> int:
+        """The current estimate of the total size in bytes."""
+        return sys.getsizeof(self.data) + self._entries_bytes
+
+    def _measure(self, *objs: Any) -> int:
+        return sum(total_size(o, self.handlers) for o in objs)
+
+    def reconcile(self) -> int:
+        """Rescans the entire container with `total_size` to get rid of any
+        drift in the estimate and returns the new estimate.
+        """
+        entries_bytes = total_size(self.data, self.handlers) - sys.getsizeof(self.data)
+        self._reset_sizes(entries_bytes)
+        self._entries_bytes = entries_bytes
+        self._changes = 0
+        return self.nbytes
+
+    def _changed(self, delta: int):
+        self._entries_bytes += delta
+        self._changes += 1
+        if self.reconcile_every and self._changes >= self.reconcile_every:
+            self.reconcile()
+        if self.max_bytes is not None and self.on_exceeded is not None and not self._in_callback:
+            if self.nbytes > self.max_bytes:
+                self._in_callback = True
+                try:
+                    self.on_exceeded(self)
+                finally:
+                    self._in_callback = False
+
+
+class SizeTrackedDict(SizeTracker, MutableMapping):
+    """A dict wrapper that tracks its approximate memory footprint (see
+    `SizeTracker`).
+
+    Wraps the given dict in place (no copy is made), so all changes must go
+    through this wrapper for the estimate to stay accurate.
+
+    Example of a cache bounded by bytes rather than entry count:
+    >>> cache = SizeTrackedDict(max_bytes=10_000_000, on_exceeded=lambda c: c.evict())
+    """
+
+    def __init__(self,
+                 data: Optional[Dict] = None,
+                 max_bytes: Optional[int] = None,
+                 on_exceeded: Optional[Callable[['SizeTrackedDict'], Any]] = None,
+                 reconcile_every: int = 0,
+                 handlers: Optional[Dict[type, Callable]] = None):
+        super().__init__(max_bytes=max_bytes, on_exceeded=on_exceeded, reconcile_every=reconcile_every,
+                         handlers=handlers)
+        self._data = data if data is not None else {}
+        self._sizes: Dict[Any, int] = {k: self._measure(k, v) for k, v in self._data.items()}
+        self._entries_bytes = sum(self._sizes.values())
+
+    @property
+    def data(self) -> Dict:
+        return self._data
+
+    def __repr__(self):
+        return f'SizeTrackedDict({self._data!r}, nbytes={self.nbytes})'
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        old = self._sizes.pop(key, 0)
+        if key in self._data:
+            # Re-insert so the entry counts as the most recent one for `evict()`
+            del self._data[key]
+        self._data[key] = value
+        new = self._measure(key, value)
+        self._sizes[key] = new
+        self._changed(new - old)
+
+    def __delitem__(self, key):
+        del self._data[key]
+        self._changed(-self._sizes.pop(key, 0))
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def clear(self):
+        self._data.clear()
+        self._sizes.clear()
+        self._changed(-self._entries_bytes)
+
+    def _reset_sizes(self, entries_bytes: int):
+        keys = list(self._data)
+        sizes = _scale_sizes([self._measure(k, self._data[k]) for k in keys], entries_bytes)
+        self._sizes = dict(zip(keys, sizes))
+
+    def entry_size(self, key: Any) -> int:
+        """The size (in bytes) measured for the entry under the given key."""
+        return self._sizes[key]
+
+    def evict(self, max_bytes: Optional[int] = None) -> List[Any]:
+        """Removes the oldest entries (in insertion order, where setting an
+        existing key counts as inserting it again) until the estimate is no
+        larger than `max_bytes` (defaults to the `max_bytes` of the tracker).
+
+        Returns the keys that were removed.
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        evicted = []
+        if max_bytes is None:
+            return evicted
+        while self._data and self.nbytes > max_bytes:
+            key = next(iter(self._data))
+            del self[key]
+            evicted.append(key)
+        return evicted
+
+
+class SizeTrackedList(SizeTracker, MutableSequence):
+    """A list wrapper that tracks its approximate memory footprint (see
+    `SizeTracker`).
+
+    Wraps the given list in place (no copy is made), so all changes must go
+    through this wrapper for the estimate to stay accurate.
+
+    Single item changes only measure the items involved. Slice assignments and
+    deletions re-measure the whole list.
+    """
+
+    def __init__(self,
+                 data: Optional[List] = None,
+                 max_bytes: Optional[int] = None,
+                 on_exceeded: Optional[Callable[['SizeTrackedList'], Any]] = None,
+                 reconcile_every: int = 0,
+                 handlers: Optional[Dict[type, Callable]] = None):
+        super().__init__(max_bytes=max_bytes, on_exceeded=on_exceeded, reconcile_every=reconcile_every,
+                         handlers=handlers)
+        self._data = data if data is not None else []
+        self._sizes: List[int] = [self._measure(v) for v in self._data]
+        self._entries_bytes = sum(self._sizes)
+
+    @property
+    def data(self) -> List:
+        return self._data
+
+    def __repr__(self):
+        return f'SizeTrackedList({self._data!r}, nbytes={self.nbytes})'
+
+    def __getitem__(self, index):
+        return self._data[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._data[index] = value
+            self._remeasure()
+            return
+        old = self._sizes[index]
+        self._data[index] = value
+        new = self._measure(value)
+        self._sizes[index] = new
+        self._changed(new - old)
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            del self._data[index]
+            self._remeasure()
+            return
+        del self._data[index]
+        self._changed(-self._sizes.pop(index))
+
+    def __len__(self):
+        return len(self._data)
+
+    def insert(self, index, value):
+        self._data.insert(index, value)
+        new = self._measure(value)
+        self._sizes.insert(index, new)
+        self._changed(new)
+
+    def append(self, value):
+        self._data.append(value)
+        new = self._measure(value)
+        self._sizes.append(new)
+        self._changed(new)
+
+    def pop(self, index=-1):
+        value = self._data.pop(index)
+        self._changed(-self._sizes.pop(index))
+        return value
+
+    def clear(self):
+        self._data.clear()
+        self._sizes.clear()
+        self._changed(-self._entries_bytes)
+
+    def _remeasure(self):
+        old = self._entries_bytes
+        self._sizes = [self._measure(v) for v in self._data]
+        self._changed(sum(self._sizes) - old)
+
+    def _reset_sizes(self, entries_bytes: int):
+        self._sizes = _scale_sizes([self._measure(v) for v in self._data], entries_bytes)
+
+    def entry_size(self, index: int) -> int:
+        """The size (in bytes) measured for the item at the given index."""
+        return self._sizes[index]
+
+    def evict(self, max_bytes: Optional[int] = None) -> List[Any]:
+        """Removes items from the front of the list until the estimate is no
+        larger than `max_bytes` (defaults to the `max_bytes` of the tracker).
+
+        Returns the items that were removed.
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        evicted = []
+        if max_bytes is None:
+            return evicted
+        while self._data and self.nbytes > max_bytes:
+            evicted.append(self.pop(0))
+        return evicted
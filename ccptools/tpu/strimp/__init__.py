@@ -1 +1,3 @@
 from ._getters import *
+from ._cache import *
+from ._bulk import *
@@ -0,0 +1,202 @@
+__all__ = [
+    'LazyImport',
+    'BulkImport',
+    'get_many',
+]
+
+"""Bulk importing of many strings at once (e.g. plugin manifests).
+"""
+from typing import *
+import concurrent.futures
+import importlib
+import time
+
+from ._cache import import_cache
+from ._getters import _resolve
+
+_MISSING = object()
+
+
+class LazyImport(object):
+    """A proxy for something importable via string that doesn't actually
+    import it until first used (attribute access or call).
+
+    Use `resolve()` to get the real object.
+    """
+    __slots__ = ('_lazy_path', '_lazy_target', '_lazy_report')
+
+    def __init__(self, path: str, report: Optional['BulkImport'] = None):
+        object.__setattr__(self, '_lazy_path', path)
+        object.__setattr__(self, '_lazy_target', _MISSING)
+        object.__setattr__(self, '_lazy_report', report)
+
+    def resolve(self) -> Any:
+        """Imports (if needed) and returns the real object.
+
+        :raises ImportError: If the import fails (or AttributeError if the
+                             module doesn't have the attribute)
+        """
+        target = self._lazy_target
+        if target is _MISSING:
+            report = self._lazy_report
+            t0 = time.perf_counter()
+            try:
+                target = _resolve(self._lazy_path)
+            except Exception as ex:
+                if report is not None:
+                    report.errors[self._lazy_path] = ex
+                raise
+            finally:
+                if report is not None:
+                    report.timings[self._lazy_path] = time.perf_counter() - t0
+            object.__setattr__(self, '_lazy_target', target)
+            if report is not None:
+                report.errors.pop(self._lazy_path, None)
+        return target
+
+    @property
+    def is_resolved(self) -> bool:
+        return self._lazy_target is not _MISSING
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.resolve(), name, value)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        if self.is_resolved:
+            return f'LazyImport({self._lazy_path!r}, resolved={self._lazy_target!r})'
+        return f'LazyImport({self._lazy_path!r})'
+
+
+class BulkImport(Mapping):
+    """The result of `get_many`, a mapping of each given string to whatever it
+    resolved to (or the default/`LazyImport` proxy).
+
+    :ivar errors: The exceptions of any strings that failed to resolve
+    :ivar timings: Seconds spent resolving each string. Strings from the same
+                   module share (and each include) the time it took to import
+                   that module.
+    :ivar module_timings: Seconds spent importing each unique module
+    """
+
+    def __init__(self):
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.timings: Dict[str, float] = {}
+        self.module_timings: Dict[str, float] = {}
+
+    def __getitem__(self, path: str) -> Any:
+        return self.results[path]
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self):
+        return len(self.results)
+
+    def __repr__(self):
+        return f'BulkImport(ok={len(self.results) - len(self.errors)}, errors={len(self.errors)})'
+
+    def slowest(self, n: int = 10) -> List[Tuple[str, float]]:
+        """Returns the `n` slowest strings to resolve as (string, seconds)
+        two-tuples.
+        """
+        return sorted(self.timings.items(), key=lambda kv: kv[1], reverse=True)[:n]
+
+
+def _import_timed(mod_name: str) -> Tuple[Any, Optional[BaseException], float]:
+    t0 = time.perf_counter()
+    try:
+        return importlib.import_module(mod_name), None, time.perf_counter() - t0
+    except Exception as ex:
+        return None, ex, time.perf_counter() - t0
+
+
+def _importer(modules: Dict[str, Any], failures: Dict[str, BaseException]) -> Callable[[str], Any]:
+    """Returns an `import_module` function for `_resolve` that uses the given
+    pre-imported modules (and their failures) when possible.
+    """
+    def import_module(mod_name: str) -> Any:
+        module = modules.get(mod_name, _MISSING)
+        if module is _MISSING:
+            ex = failures.get(mod_name)
+            if ex is not None:
+                raise ex.with_traceback(None)
+            module = importlib.import_module(mod_name)
+        return module
+    return import_module
+
+
+def get_many(paths: Iterable[str],
+             default: Any = None,
+             lazy: bool = False,
+             workers: Optional[int] = None) -> BulkImport:
+    """Resolves many import strings (like `get_any` does for one) at once.
+
+    Each unique module is imported only once (strings already in the import
+    cache aren't imported at all) and failures are collected in the `errors`
+    of the returned `BulkImport` instead of being logged (so there's no cost
+    of formatting tracebacks for each one).
+
+    If `workers` is given (and larger than 1), the unique modules are
+    imported in that many threads. Note that this only helps when importing
+    involves waiting on I/O (or on imports that release the GIL).
+
+    If `lazy` is set, nothing is imported up front and each string maps to a
+    `LazyImport` proxy that resolves on first use instead (timings and errors
+    are then recorded in the returned `BulkImport` as they resolve).
+
+    :param paths: The strings to resolve
+    :param default: The value to map strings that fail to resolve to
+    :param lazy: Return `LazyImport` proxies instead of importing right away?
+    :param workers: Number of threads to import modules with
+    """
+    report = BulkImport()
+    paths = list(dict.fromkeys(paths))  # Unique while keeping order
+
+    if lazy:
+        for path in paths:
+            report.results[path] = LazyImport(path, report)
+        return report
+
+    to_import = []
+    for path in paths:
+        if import_cache.enabled and path in import_cache:
+            continue
+        mod_name = path[:path.rindex('.')] if '.' in path else path
+        to_import.append(mod_name)
+    to_import = list(dict.fromkeys(to_import))
+
+    modules: Dict[str, Any] = {}
+    failures: Dict[str, BaseException] = {}
+    if workers and workers > 1 and len(to_import) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            imported = list(zip(to_import, pool.map(_import_timed, to_import)))
+    else:
+        imported = [(m, _import_timed(m)) for m in to_import]
+
+    for mod_name, (module, ex, took) in imported:
+        report.module_timings[mod_name] = took
+        if ex is None:
+            modules[mod_name] = module
+        else:
+            failures[mod_name] = ex
+
+    import_module = _importer(modules, failures)
+    for path in paths:
+        t0 = time.perf_counter()
+        try:
+            report.results[path] = _resolve(path, import_module=import_module)
+        except Exception as ex:
+            report.results[path] = default
+            report.errors[path] = ex
+        took = time.perf_counter() - t0
+        mod_name = path[:path.rindex('.')] if '.' in path else path
+        report.timings[path] = took + report.module_timings.get(mod_name, 0.0)
+
+    return report
@@ -0,0 +1,174 @@
+__all__ = [
+    'ImportCache',
+    'import_cache',
+    'clear_import_cache',
+    'reload_module',
+    'install_reload_hook',
+]
+
+"""Caching of resolved import strings for the String Importing Utilities.
+"""
+from typing import *
+import importlib
+import threading
+import time
+import types
+
+_MISSING = object()
+
+
+class ImportCache(object):
+    """Maps dotted import strings to the module they resolved to (and the
+    name of the attribute in it, if any), keeps cached verdicts of type
+    checks (like "is a class") per string and optionally remembers failures
+    for `negative_ttl` seconds (so repeatedly resolving a broken string
+    doesn't re-run the import machinery every time).
+
+    Only modules are cached, attributes are looked up on them again on every
+    `get`, so monkeypatching (e.g. `mock.patch`) keeps working. Negative
+    caching is off by default (a `negative_ttl` of 0) since failures may be
+    transient (e.g. a module that becomes importable later on).
+
+    Modules are never dropped on their own so call `invalidate()` or
+    `clear()` (or use `reload_module`) when modules get replaced.
+    """
+
+    def __init__(self, negative_ttl: float = 0.0, enabled: bool = True):
+        self.negative_ttl = negative_ttl
+        self.enabled = enabled
+        self._resolved: Dict[str, Tuple[types.ModuleType, Optional[str]]] = {}
+        self._failed: Dict[str, Tuple[float, BaseException]] = {}
+        self._verdicts: Dict[Tuple[str, str], Tuple[Any, bool]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._resolved)
+
+    def __contains__(self, string: str):
+        return string in self._resolved
+
+    def get(self, string: str, default: Any = _MISSING) -> Any:
+        """Returns what the given string currently resolves to (the cached
+        module or the attribute of it) or `default`.
+        """
+        hit = self._resolved.get(string)
+        if hit is None:
+            return default
+        module, attr = hit
+        if attr is None:
+            return module
+        return getattr(module, attr, default)
+
+    def get_failure(self, string: str) -> Optional[BaseException]:
+        """Returns the exception the given string failed to resolve with if
+        that happened less than `negative_ttl` seconds ago.
+        """
+        hit = self._failed.get(string)
+        if hit is None:
+            return None
+        if hit[0] < time.monotonic():
+            self._failed.pop(string, None)
+            return None
+        return hit[1]
+
+    def set(self, string: str, module: types.ModuleType, attr: Optional[str] = None):
+        """Caches the module the given string resolves to, or the module it's
+        an attribute of along with the name of that attribute.
+        """
+        with self._lock:
+            self._resolved[string] = (module, attr)
+            self._failed.pop(string, None)
+
+    def set_failure(self, string: str, ex: BaseException):
+        if self.negative_ttl > 0:
+            with self._lock:
+                self._failed[string] = (time.monotonic() + self.negative_ttl, ex)
+
+    def get_verdict(self, string: str, check: str, obj: Any) -> Optional[bool]:
+        """Returns the cached result of the named check (e.g. "class") for the
+        given object the string resolved to, or None if not cached (or the
+        string resolves to a different object by now).
+        """
+        hit = self._verdicts.get((string, check))
+        if hit is None or hit[0] is not obj:
+            return None
+        return hit[1]
+
+    def set_verdict(self, string: str, check: str, obj: Any, verdict: bool):
+        with self._lock:
+            self._verdicts[(string, check)] = (obj, verdict)
+
+    def invalidate(self, module: Union[str, types.ModuleType]):
+        """Drops everything cached for the given module (or module name) and
+        anything under it (i.e. attributes and submodules).
+        """
+        name = module.__name__ if isinstance(module, types.ModuleType) else module
+        prefix = name + '.'
+
+        def _match(s: str) -> bool:
+            return s == name or s.startswith(prefix)
+
+        with self._lock:
+            for s in [s for s in self._resolved if _match(s)]:
+                del self._resolved[s]
+            for s in [s for s in self._failed if _match(s)]:
+                del self._failed[s]
+            for k in [k for k in self._verdicts if _match(k[0])]:
+                del self._verdicts[k]
+
+    def clear(self):
+        with self._lock:
+            self._resolved.clear()
+            self._failed.clear()
+            self._verdicts.clear()
+
+
+import_cache = ImportCache()
+"""The cache used by `get_any` and friends."""
+
+
+def clear_import_cache(module: Optional[Union[str, types.ModuleType]] = None):
+    """Clears the import cache used by `get_any` and friends, either entirely
+    or only for the given module (or module name) and anything under it.
+    """
+    if module is None:
+        import_cache.clear()
+    else:
+        import_cache.invalidate(module)
+
+
+def reload_module(module: Union[str, types.ModuleType]) -> types.ModuleType:
+    """Reloads the given module (or module name) with `importlib.reload` and
+    invalidates anything cached for it.
+    """
+    if isinstance(module, str):
+        module = importlib.import_module(module)
+    try:
+        return importlib.reload(module)
+    finally:
+        import_cache.invalidate(module)
+
+
+_original_reload = None
+
+
+def install_reload_hook():
+    """Wraps `importlib.reload` so that any module reloaded (by anyone) also
+    gets invalidated in the import cache.
+
+    Calling this more than once has no further effect.
+    """
+    global _original_reload
+    if _original_reload is not None:
+        return
+    _original_reload = importlib.reload
+
+    def reload(module):
+        try:
+            return _original_reload(module)
+        finally:
+            import_cache.invalidate(module)
+
+    reload.__doc__ = _original_reload.__doc__
+    reload.__wrapped__ = _original_reload
+    importlib.reload = reload
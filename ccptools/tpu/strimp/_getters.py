@@ -14,12 +14,15 @@ That is, functions to import and return python stuff via string during runtime.
 import importlib
 import inspect
 from ccptools.tpu import insp
+from ._cache import import_cache
 
 import logging
 log = logging.getLogger(__name__)
 
+_MISSING = object()
 
-def get_any(string, default=None, logger=False, reraise=False):
+
+def get_any(string, default=None, logger=False, reraise=False, use_cache=True):
     """Attempts to import and return anything via the given string.
 
     Anything here essentially means, module or any module attribute (stuff
@@ -51,24 +54,20 @@ def get_any(string, default=None, logger=False, reraise=False):
     :type logger: bool or None or logging.Logger
     :param reraise: Should exceptions and errors encountered be reraised?
     :type reraise: bool
+    :param use_cache: Should the module (or failure) be looked up in and
+                      stored to the import cache (see `import_cache`)?
+                      Failures are only cached if the cache has a
+                      `negative_ttl` (and only for that long).
+    :type use_cache: bool
     :return: The module or whatever the given string was referring to or the
              default value given on failure.
     :rtype: any
     """
     if not isinstance(string, str):
         return string
+
     try:
-        if '.' in string:
-            ridx = string.rindex('.')
-            mod_name = string[:ridx]
-            any_name = string[ridx + 1:]
-            from_module = importlib.import_module(mod_name)
-            if hasattr(from_module, any_name):
-                return getattr(from_module, any_name)
-            else:  # Might be a module...?
-                return importlib.import_module(string)
-        else:  # Must be a module then...?
-            return importlib.import_module(string)
+        return _resolve(string, use_cache)
     except ImportError as ex:
         if logger is not False:
             if logger is True or logger is None:
@@ -94,6 +93,61 @@ def get_any(string, default=None, logger=False, reraise=False):
     return default
 
 
+def _resolve(string, use_cache=True, import_module=importlib.import_module):
+    """Resolves the given string to a module or module attribute (see
+    `get_any`), raising whatever goes wrong. Looks the string up in (and
+    stores the module or failure to) the import cache if it's enabled and
+    `use_cache` is set.
+
+    Modules are imported with the given `import_module` function, so callers
+    can supply modules they've already imported (see `get_many`).
+    """
+    use_cache = use_cache and import_cache.enabled
+    if use_cache:
+        something = import_cache.get(string, _MISSING)
+        if something is not _MISSING:
+            return something
+        failure = import_cache.get_failure(string)
+        if failure is not None:
+            raise failure.with_traceback(None)
+
+    try:
+        if '.' in string:
+            ridx = string.rindex('.')
+            mod_name = string[:ridx]
+            any_name = string[ridx + 1:]
+            from_module = import_module(mod_name)
+            if hasattr(from_module, any_name):
+                something = getattr(from_module, any_name)
+                if use_cache:  # The attribute itself is looked up again on each hit
+                    import_cache.set(string, from_module, any_name)
+                return something
+            else:  # Might be a module...?
+                something = import_module(string)
+        else:  # Must be a module then...?
+            something = import_module(string)
+    except Exception as ex:
+        if use_cache:
+            import_cache.set_failure(string, ex)
+        raise
+    if use_cache:
+        import_cache.set(string, something)
+    return something
+
+
+def _check(string, check, func, something, use_cache):
+    """Runs the given check function on something resolved from the given
+    string, using the cached verdict if there is one.
+    """
+    if not use_cache or not isinstance(string, str) or not import_cache.enabled:
+        return func(something)
+    verdict = import_cache.get_verdict(string, check, something)
+    if verdict is None:
+        verdict = bool(func(something))
+        import_cache.set_verdict(string, check, something, verdict)
+    return verdict
+
+
 def get_module(string, default=None, logger=False, reraise=False):
     """Attempts to import and return a python module via the given string.
 
@@ -133,7 +187,7 @@ def get_module(string, default=None, logger=False, reraise=False):
     return default
 
 
-def get_class(string, default=None, logger=False, reraise=False):
+def get_class(string, default=None, logger=False, reraise=False, use_cache=True):
     """Attempts to import and return a class via the given string.
 
     This is essentially just a call to get_any with the added check to see if
@@ -148,13 +202,15 @@ def get_class(string, default=None, logger=False, reraise=False):
     :type logger: bool or None or logging.Logger
     :param reraise: Should exceptions and errors encountered be reraised?
     :type reraise: bool
+    :param use_cache: Should the import cache be used (see get_any)?
+    :type use_cache: bool
     :return: The module or whatever the given string was referring to or the
              default value given on failure.
     :rtype: class or type or None
     """
     try:
-        something = get_any(string, None, logger=logger, reraise=True)
-        if inspect.isclass(something):
+        something = get_any(string, None, logger=logger, reraise=True, use_cache=use_cache)
+        if _check(string, 'class', inspect.isclass, something, use_cache):
             return something
         else:
             raise ValueError(u'Not a class: %s (it is "%s")' % (string, type(something)))
@@ -171,7 +227,7 @@ def get_class(string, default=None, logger=False, reraise=False):
     return default
 
 
-def get_callable(string, default=None, logger=False, reraise=False):
+def get_callable(string, default=None, logger=False, reraise=False, use_cache=True):
     """Attempts to import and return a callable via the given string.
 
     This is essentially just a call to get_any with the added check to see if
@@ -186,13 +242,15 @@ def get_callable(string, default=None, logger=False, reraise=False):
     :type logger: bool or None or logging.Logger
     :param reraise: Should exceptions and errors encountered be reraised?
     :type reraise: bool
+    :param use_cache: Should the import cache be used (see get_any)?
+    :type use_cache: bool
     :return: The module or whatever the given string was referring to or the
              default value given on failure.
     :rtype: function or method or object or None
     """
     try:
-        something = get_any(string, None, logger=logger, reraise=True)
-        if insp.is_callable(something):
+        something = get_any(string, None, logger=logger, reraise=True, use_cache=use_cache)
+        if _check(string, 'callable', insp.is_callable, something, use_cache):
             return something
         else:
             raise ValueError(u'Not callable: %s (it is "%s")' % (string, type(something)))
@@ -209,7 +267,7 @@ def get_callable(string, default=None, logger=False, reraise=False):
     return default
 
 
-def get_methfunc(string, default=None, logger=False, reraise=False):
+def get_methfunc(string, default=None, logger=False, reraise=False, use_cache=True):
     """Attempts to import and return a callable via the given string.
 
     This is essentially just a call to get_any with the added check to see if
@@ -224,13 +282,15 @@ def get_methfunc(string, default=None, logger=False, reraise=False):
     :type logger: bool or None or logging.Logger
     :param reraise: Should exceptions and errors encountered be reraised?
     :type reraise: bool
+    :param use_cache: Should the import cache be used (see get_any)?
+    :type use_cache: bool
     :return: The module or whatever the given string was referring to or the
              default value given on failure.
     :rtype: function or method or None
     """
     try:
-        something = get_any(string, None, logger=logger, reraise=True)
-        if insp.is_methfunc(something):
+        something = get_any(string, None, logger=logger, reraise=True, use_cache=use_cache)
+        if _check(string, 'methfunc', insp.is_methfunc, something, use_cache):
             return something
         else:
             raise ValueError(u'Not a method or function: %s (it is "%s")' % (string, type(something)))
@@ -247,7 +307,7 @@ def get_methfunc(string, default=None, logger=False, reraise=False):
     return default
 
 
-def get_function(string, default=None, logger=False, reraise=False):
+def get_function(string, default=None, logger=False, reraise=False, use_cache=True):
     """Attempts to import and return a callable via the given string.
 
     This is essentially just a call to get_any with the added check to see if
@@ -262,13 +322,15 @@ def get_function(string, default=None, logger=False, reraise=False):
     :type logger: bool or None or logging.Logger
     :param reraise: Should exceptions and errors encountered be reraised?
     :type reraise: bool
+    :param use_cache: Should the import cache be used (see get_any)?
+    :type use_cache: bool
     :return: The module or whatever the given string was referring to or the
              default value given on failure.
     :rtype: function or method or None
     """
     try:
-        something = get_any(string, None, logger=logger, reraise=True)
-        if inspect.isfunction(something):
+        something = get_any(string, None, logger=logger, reraise=True, use_cache=use_cache)
+        if _check(string, 'function', inspect.isfunction, something, use_cache):
             return something
         else:
             raise ValueError(u'Not a function: %s (it is "%s")' % (string, type(something)))
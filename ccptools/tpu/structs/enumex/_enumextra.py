@@ -9,6 +9,8 @@ _T_ENUM = TypeVar('_T_ENUM', bound='EnumEx')
 
 _NOT_SUPPLIED = object()
 
+_enum_eval: Optional[Callable] = None  # Imported on first use (casting imports this package)
+
 
 class EnumEx(enum.Enum):
     @classmethod
@@ -21,5 +23,7 @@ class EnumEx(enum.Enum):
                         to _NOT_SUPPLIED and makes this method raise an
                         exception on failure
         """
-        from ccptools.tpu.casting import enum_eval
-        return enum_eval(value, cls, default=default, raise_on_fail=(default is _NOT_SUPPLIED))
+        global _enum_eval
+        if _enum_eval is None:
+            from ccptools.tpu.casting import enum_eval as _enum_eval
+        return _enum_eval(value, cls, default=default, raise_on_fail=(default is _NOT_SUPPLIED))
@@ -1,3 +1,5 @@
 from ._universal import *
 from ._jsonsafe import *
 from ._json import *
+from ._binary import *
+from ._merkle import *
@@ -0,0 +1,496 @@
+__all__ = [
+    'BinarySerializer',
+    'BinaryDecoder',
+]
+
+from ccptools.tpu.structs import *
+from ._universal import *
+import struct
+
+# Extension type codes used for types msgpack has no native representation for
+EXT_DATETIME = 1
+EXT_DATE = 2
+EXT_TIME = 3
+EXT_TIMEDELTA = 4
+EXT_DECIMAL = 5
+EXT_BIGINT = 6
+
+_S_U8 = struct.Struct('>B')
+_S_U16 = struct.Struct('>H')
+_S_U32 = struct.Struct('>I')
+_S_U64 = struct.Struct('>Q')
+_S_I8 = struct.Struct('>b')
+_S_I16 = struct.Struct('>h')
+_S_I32 = struct.Struct('>i')
+_S_I64 = struct.Struct('>q')
+_S_F32 = struct.Struct('>f')
+_S_F64 = struct.Struct('>d')
+
+_S_DATETIME = struct.Struct('>HBBBBBI')  # Year, month, day, hour, minute, second, microsecond
+_S_DATE = struct.Struct('>HBB')  # Year, month, day
+_S_TIME = struct.Struct('>BBBI')  # Hour, minute, second, microsecond
+_S_TIMEDELTA = struct.Struct('>iII')  # Days, seconds, microseconds
+_S_OFFSET = struct.Struct('>q')  # UTC offset in microseconds
+
+_FIXEXT = {1: 0xd4, 2: 0xd5, 4: 0xd6, 8: 0xd7, 16: 0xd8}
+
+# Single byte encodings of empty containers (used by `skip_empties`)
+_EMPTY_MARKERS = {
+    b'\x80',  # fixmap
+    b'\x90',  # fixarray
+    b'\xa0',  # fixstr
+    b'\xc4\x00',  # bin 8
+}
+
+
+class BinarySerializer(UniversalSerializer):
+    """A version of the UniversalSerializer that writes a compact binary
+    (msgpack compatible) encoding directly into a growable `bytearray` instead
+    of building an intermediate structure of python primitives.
+
+    Types from the datetime and decimal modules (as well as ints too large for
+    64 bits) are written as msgpack "ext" types so they survive the round trip
+    through `BinaryDecoder` without loss:
+
+        - 1: datetime.datetime
+        - 2: datetime.date
+        - 3: datetime.time
+        - 4: datetime.timedelta
+        - 5: decimal.Decimal
+        - 6: int (larger than 64 bits)
+
+    Timezone aware datetimes and times keep their UTC offset but not the name
+    of their tzinfo.
+
+    Bytes are written as-is using the msgpack "bin" family so there is no need
+    to guess their encoding like `JsonSafeSerializer` does.
+
+    Tuples and sets are written as arrays, just like the UniversalSerializer
+    turns them into lists.
+    """
+
+    def __init__(self, skip_keys=None, skip_values=None, skip_private=True, skip_nones=False, skip_empties=False,
+                 max_depth=0):
+        super().__init__(skip_keys=skip_keys, skip_values=skip_values, skip_private=skip_private,
+                         skip_nones=skip_nones, skip_empties=skip_empties, max_depth=max_depth)
+        self.serialize_map[bool] = self._serialize_bool
+        self._leaf_map = {
+            type(None): self._serialize_none,
+            bool: self._serialize_bool,
+            int: self._serialize_int,
+            float: self._serialize_float,
+            str: self._serialize_str,
+            bytes: self._serialize_bytes,
+        }
+        self._buffer = bytearray()
+
+    def serialize(self, obj) -> bytes:
+        self._breadcrumbs = []  # Just in case!
+        self._buffer = bytearray()
+        self._serialize_any(obj)
+        data = bytes(self._buffer)
+        self._buffer = bytearray()
+        return data
+
+    def _serialize_any(self, obj):
+        # Scalars can't contain anything so they can't loop either, thus we
+        # skip the breadcrumb bookkeeping for those (unless depth is limited)
+        leaf = self._leaf_map.get(type(obj))
+        if leaf is not None and not self.max_depth:
+            return leaf(obj)
+
+        buf = self._buffer
+        start = len(buf)
+        depth = len(self._breadcrumbs)
+        try:
+
+            if obj in self._breadcrumbs:
+                return self._serialize_loop(obj)
+
+            if self.max_depth and depth > self.max_depth:
+                return self._serialize_max_depth(obj)
+
+            serializer = self.serialize_map.get(type(obj), self._serialize_other)
+            self._breadcrumbs.append(obj)
+            serializer(obj)
+            self._breadcrumbs.pop()
+
+        except Exception as ex:
+            # Throw away whatever got partially written and drop any breadcrumbs
+            # left behind by the failure
+            del buf[start:]
+            del self._breadcrumbs[depth:]
+            self._serialize_error(obj, '%s' % ex)
+
+        return None
+
+    def _write_str(self, obj: str):
+        data = obj.encode('utf-8')
+        n = len(data)
+        buf = self._buffer
+        if n < 32:
+            buf.append(0xa0 | n)
+        elif n < 0x100:
+            buf.append(0xd9)
+            buf.append(n)
+        elif n < 0x10000:
+            buf.append(0xda)
+            buf += _S_U16.pack(n)
+        else:
+            buf.append(0xdb)
+            buf += _S_U32.pack(n)
+        buf += data
+
+    def _write_bin(self, obj: bytes):
+        n = len(obj)
+        buf = self._buffer
+        if n < 0x100:
+            buf.append(0xc4)
+            buf.append(n)
+        elif n < 0x10000:
+            buf.append(0xc5)
+            buf += _S_U16.pack(n)
+        else:
+            buf.append(0xc6)
+            buf += _S_U32.pack(n)
+        buf += obj
+
+    def _write_ext(self, code: int, data: bytes):
+        n = len(data)
+        buf = self._buffer
+        fixext = _FIXEXT.get(n)
+        if fixext:
+            buf.append(fixext)
+        elif n < 0x100:
+            buf.append(0xc7)
+            buf.append(n)
+        elif n < 0x10000:
+            buf.append(0xc8)
+            buf += _S_U16.pack(n)
+        else:
+            buf.append(0xc9)
+            buf += _S_U32.pack(n)
+        buf.append(code)
+        buf += data
+
+    def _write_container_header(self, n: int, fix: int, code16: int):
+        buf = self._buffer
+        if n < 16:
+            buf.append(fix | n)
+        elif n < 0x10000:
+            buf.append(code16)
+            buf += _S_U16.pack(n)
+        else:
+            buf.append(code16 + 1)
+            buf += _S_U32.pack(n)
+
+    def _serialize_none(self, obj):
+        self._buffer.append(0xc0)
+
+    def _serialize_bool(self, obj):
+        self._buffer.append(0xc3 if obj else 0xc2)
+
+    def _serialize_int(self, obj):
+        buf = self._buffer
+        if 0 <= obj < 0x80:
+            buf.append(obj)
+        elif -32 <= obj < 0:
+            buf.append(obj & 0xff)
+        elif obj > 0:
+            if obj < 0x100:
+                buf.append(0xcc)
+                buf.append(obj)
+            elif obj < 0x10000:
+                buf.append(0xcd)
+                buf += _S_U16.pack(obj)
+            elif obj < 0x100000000:
+                buf.append(0xce)
+                buf += _S_U32.pack(obj)
+            elif obj < 0x10000000000000000:
+                buf.append(0xcf)
+                buf += _S_U64.pack(obj)
+            else:
+                self._write_big_int(obj)
+        else:
+            if obj >= -0x80:
+                buf.append(0xd0)
+                buf += _S_I8.pack(obj)
+            elif obj >= -0x8000:
+                buf.append(0xd1)
+                buf += _S_I16.pack(obj)
+            elif obj >= -0x80000000:
+                buf.append(0xd2)
+                buf += _S_I32.pack(obj)
+            elif obj >= -0x8000000000000000:
+                buf.append(0xd3)
+                buf += _S_I64.pack(obj)
+            else:
+                self._write_big_int(obj)
+
+    def _write_big_int(self, obj: int):
+        self._write_ext(EXT_BIGINT, obj.to_bytes((obj.bit_length() + 8) // 8, 'big', signed=True))
+
+    def _serialize_float(self, obj):
+        self._buffer.append(0xcb)
+        self._buffer += _S_F64.pack(obj)
+
+    def _serialize_str(self, obj):
+        self._write_str(obj)
+
+    def _serialize_bytes(self, obj):
+        self._write_bin(obj)
+
+    def _serialize_decimal(self, obj):
+        self._write_ext(EXT_DECIMAL, str(obj).encode('ascii'))
+
+    def _serialize_datetime(self, obj):
+        data = _S_DATETIME.pack(obj.year, obj.month, obj.day, obj.hour, obj.minute, obj.second, obj.microsecond)
+        offset = obj.utcoffset()
+        if offset is not None:
+            data += _S_OFFSET.pack(offset // datetime.timedelta(microseconds=1))
+        self._write_ext(EXT_DATETIME, data)
+
+    def _serialize_time(self, obj):
+        data = _S_TIME.pack(obj.hour, obj.minute, obj.second, obj.microsecond)
+        offset = obj.utcoffset()
+        if offset is not None:
+            data += _S_OFFSET.pack(offset // datetime.timedelta(microseconds=1))
+        self._write_ext(EXT_TIME, data)
+
+    def _serialize_date(self, obj):
+        self._write_ext(EXT_DATE, _S_DATE.pack(obj.year, obj.month, obj.day))
+
+    def _serialize_timedelta(self, obj):
+        self._write_ext(EXT_TIMEDELTA, _S_TIMEDELTA.pack(obj.days, obj.seconds, obj.microseconds))
+
+    def _serialize_iters(self, obj):
+        self._write_container_header(len(obj), 0x90, 0xdc)
+        for i in obj:
+            self._serialize_any(i)
+
+    def _serialize_maps(self, obj):
+        buf = self._buffer
+        # Reserve room for the largest header and shrink it once we know how
+        # many entries actually survived the skip filters
+        header_at = len(buf)
+        buf += b'\xdf\x00\x00\x00\x00'
+        count = 0
+        for k, v in obj.items():
+            if k in self.skip_keys or v in self.skip_values:
+                continue
+            if self.skip_private and isinstance(k, str) and k.startswith('_'):
+                continue
+            if self.skip_nones and v is None:
+                continue
+            entry_at = len(buf)
+            self._serialize_key(k)
+            value_at = len(buf)
+            self._serialize_any(v)
+            if self.skip_empties and bytes(buf[value_at:]) in _EMPTY_MARKERS:
+                del buf[entry_at:]
+                continue
+            count += 1
+
+        if count < 16:
+            buf[header_at:header_at + 5] = bytes((0x80 | count,))
+        elif count < 0x10000:
+            buf[header_at:header_at + 5] = b'\xde' + _S_U16.pack(count)
+        else:
+            buf[header_at + 1:header_at + 5] = _S_U32.pack(count)
+
+    def _serialize_key(self, key):
+        """Keys don't count towards the recursion depth so we only go through
+        `_serialize_any` for keys of types we don't know directly.
+        """
+        serializer = self.serialize_map.get(type(key))
+        if serializer is not None:
+            serializer(key)
+        else:
+            self._serialize_any(key)
+
+    def _serialize_derived(self, obj):
+        for t, func in self.serialize_map.items():
+            # Check if the object extends any of our known types and use that
+            if isinstance(obj, t):
+                return func(obj)
+
+        # If all else fails, write unknown serialization
+        return self._serialize_unknown(obj)
+
+    def _serialize_loop(self, obj):
+        self._write_str(super()._serialize_loop(obj))
+
+    def _serialize_error(self, obj, error):
+        self._write_str(super()._serialize_error(obj, error))
+
+    def _serialize_unknown(self, obj):
+        self._write_str(super()._serialize_unknown(obj))
+
+    def _serialize_max_depth(self, obj):
+        self._write_str(super()._serialize_max_depth(obj))
+
+
+class BinaryDecoder(object):
+    """Decodes the output of `BinarySerializer` (or any plain msgpack data that
+    doesn't use ext types unknown to us) back into python objects.
+
+    Arrays are decoded as lists and maps as dicts, except when an array is used
+    as a map key in which case it's decoded as a tuple (to keep it hashable).
+
+    Unknown ext types are returned as `(code, data)` two-tuples.
+    """
+
+    def __init__(self):
+        self._data = b''
+        self._pos = 0
+
+        # One reader per leading type byte so decoding is a single list lookup
+        readers: List[Optional[Callable[[int], Any]]] = [None] * 0x100
+        for b in range(0x00, 0x80):
+            readers[b] = self._read_positive_fixint
+        for b in range(0x80, 0x90):
+            readers[b] = self._read_fixmap
+        for b in range(0x90, 0xa0):
+            readers[b] = self._read_fixarray
+        for b in range(0xa0, 0xc0):
+            readers[b] = self._read_fixstr
+        for b in range(0xe0, 0x100):
+            readers[b] = self._read_negative_fixint
+        for b in range(0xd4, 0xd9):
+            readers[b] = self._read_fixext
+
+        readers[0xc0] = lambda b: None
+        readers[0xc2] = lambda b: False
+        readers[0xc3] = lambda b: True
+        readers[0xc4] = lambda b: bytes(self._take(self._unpack(_S_U8)))
+        readers[0xc5] = lambda b: bytes(self._take(self._unpack(_S_U16)))
+        readers[0xc6] = lambda b: bytes(self._take(self._unpack(_S_U32)))
+        readers[0xc7] = lambda b: self._read_ext(self._unpack(_S_U8))
+        readers[0xc8] = lambda b: self._read_ext(self._unpack(_S_U16))
+        readers[0xc9] = lambda b: self._read_ext(self._unpack(_S_U32))
+        readers[0xca] = lambda b: self._unpack(_S_F32)
+        readers[0xcb] = lambda b: self._unpack(_S_F64)
+        readers[0xcc] = lambda b: self._unpack(_S_U8)
+        readers[0xcd] = lambda b: self._unpack(_S_U16)
+        readers[0xce] = lambda b: self._unpack(_S_U32)
+        readers[0xcf] = lambda b: self._unpack(_S_U64)
+        readers[0xd0] = lambda b: self._unpack(_S_I8)
+        readers[0xd1] = lambda b: self._unpack(_S_I16)
+        readers[0xd2] = lambda b: self._unpack(_S_I32)
+        readers[0xd3] = lambda b: self._unpack(_S_I64)
+        readers[0xd9] = lambda b: str(self._take(self._unpack(_S_U8)), 'utf-8')
+        readers[0xda] = lambda b: str(self._take(self._unpack(_S_U16)), 'utf-8')
+        readers[0xdb] = lambda b: str(self._take(self._unpack(_S_U32)), 'utf-8')
+        readers[0xdc] = lambda b: self._read_array(self._unpack(_S_U16))
+        readers[0xdd] = lambda b: self._read_array(self._unpack(_S_U32))
+        readers[0xde] = lambda b: self._read_map(self._unpack(_S_U16))
+        readers[0xdf] = lambda b: self._read_map(self._unpack(_S_U32))
+        self._readers = readers
+
+    def decode(self, data: Union[bytes, bytearray, memoryview]) -> Any:
+        self._data = memoryview(data)
+        self._pos = 0
+        try:
+            value = self._read()
+            if self._pos != len(self._data):
+                raise ValueError(f'trailing data after position {self._pos} of {len(self._data)}')
+            return value
+        except (IndexError, struct.error) as ex:
+            raise ValueError(f'truncated or corrupt data at position {self._pos}: {ex}') from ex
+        finally:
+            self._data = b''
+
+    def _take(self, n: int) -> memoryview:
+        start = self._pos
+        end = start + n
+        if end > len(self._data):
+            raise ValueError(f'truncated data: wanted {n} bytes at position {start}')
+        self._pos = end
+        return self._data[start:end]
+
+    def _unpack(self, s: struct.Struct) -> Any:
+        value = s.unpack_from(self._data, self._pos)[0]
+        self._pos += s.size
+        return value
+
+    def _read(self) -> Any:
+        b = self._data[self._pos]
+        self._pos += 1
+        reader = self._readers[b]
+        if reader is None:
+            raise ValueError(f'unknown type byte 0x{b:02x} at position {self._pos - 1}')
+        return reader(b)
+
+    def _read_key(self) -> Any:
+        key = self._read()
+        if isinstance(key, list):
+            return self._hashable(key)
+        return key
+
+    def _hashable(self, value: list) -> tuple:
+        return tuple(self._hashable(v) if isinstance(v, list) else v for v in value)
+
+    @staticmethod
+    def _read_positive_fixint(b: int) -> int:
+        return b
+
+    @staticmethod
+    def _read_negative_fixint(b: int) -> int:
+        return b - 0x100
+
+    def _read_fixstr(self, b: int) -> str:
+        return str(self._take(b & 0x1f), 'utf-8')
+
+    def _read_fixarray(self, b: int) -> list:
+        return self._read_array(b & 0x0f)
+
+    def _read_fixmap(self, b: int) -> dict:
+        return self._read_map(b & 0x0f)
+
+    def _read_fixext(self, b: int) -> Any:
+        return self._read_ext(1 << (b - 0xd4))
+
+    def _read_array(self, n: int) -> list:
+        read = self._read
+        return [read() for _ in range(n)]
+
+    def _read_map(self, n: int) -> dict:
+        read = self._read
+        read_key = self._read_key
+        d = {}
+        for _ in range(n):
+            k = read_key()
+            d[k] = read()
+        return d
+
+    def _read_ext(self, n: int) -> Any:
+        code = self._unpack(_S_I8)
+        data = self._take(n)
+
+        if code == EXT_DATETIME:
+            year, month, day, hour, minute, second, microsecond = _S_DATETIME.unpack_from(data)
+            return datetime.datetime(year, month, day, hour, minute, second, microsecond,
+                                     tzinfo=self._read_tz(data, _S_DATETIME.size))
+        if code == EXT_DATE:
+            return datetime.date(*_S_DATE.unpack_from(data))
+        if code == EXT_TIME:
+            hour, minute, second, microsecond = _S_TIME.unpack_from(data)
+            return datetime.time(hour, minute, second, microsecond, tzinfo=self._read_tz(data, _S_TIME.size))
+        if code == EXT_TIMEDELTA:
+            days, seconds, microseconds = _S_TIMEDELTA.unpack_from(data)
+            return datetime.timedelta(days=days, seconds=seconds, microseconds=microseconds)
+        if code == EXT_DECIMAL:
+            return decimal.Decimal(str(data, 'ascii'))
+        if code == EXT_BIGINT:
+            return int.from_bytes(data, 'big', signed=True)
+
+        return code, bytes(data)
+
+    @staticmethod
+    def _read_tz(data: memoryview, offset_at: int) -> Optional[datetime.tzinfo]:
+        if len(data) < offset_at + _S_OFFSET.size:
+            return None
+        offset = _S_OFFSET.unpack_from(data, offset_at)[0]
+        if offset == 0:
+            return datetime.timezone.utc
+        return datetime.timezone(datetime.timedelta(microseconds=offset))
@@ -0,0 +1,231 @@
+__all__ = [
+    'MerkleNode',
+    'MerkleSerializer',
+    'merkle_diff',
+]
+
+from ccptools.tpu.structs import *
+from ._universal import *
+import hashlib
+
+_DIGEST_SIZE = 16
+
+
+def _digest(*parts: bytes) -> bytes:
+    h = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+    for p in parts:
+        h.update(p)
+    return h.digest()
+
+
+class MerkleNode(object):
+    """A node in a tree of digests produced by `MerkleSerializer`.
+
+    Leaf nodes hold the serialized value in `value` and have no `children`.
+
+    Map nodes (dicts and objects) have a dict of key to `MerkleNode` as their
+    `children` while sequence nodes (lists and tuples) have a list. Sets are
+    unordered so their items can't be addressed by key paths, thus set nodes
+    have a list of children ordered by digest.
+
+    The `digest` of a node depends only on its type and content (recursively),
+    so two nodes with the same digest represent identical subtrees.
+    """
+    __slots__ = ('digest', 'value', 'children', 'kind')
+
+    LEAF = 0
+    MAP = 1
+    SEQUENCE = 2
+    SET = 3
+
+    def __init__(self, digest: bytes, value: Any = None,
+                 children: Optional[Union[Dict[Any, 'MerkleNode'], List['MerkleNode']]] = None,
+                 kind: int = LEAF):
+        self.digest = digest
+        self.value = value
+        self.children = children
+        self.kind = kind
+
+    def __eq__(self, other):
+        if isinstance(other, MerkleNode):
+            return self.digest == other.digest
+        return False
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        return f'MerkleNode(digest={self.digest.hex()!r}, kind={self.kind})'
+
+    @property
+    def hexdigest(self) -> str:
+        return self.digest.hex()
+
+    def to_value(self) -> Any:
+        """Rebuilds the plain `UniversalSerializer` style value of this node
+        (sets come back as lists).
+        """
+        if self.kind == MerkleNode.MAP:
+            return {k: v.to_value() for k, v in self.children.items()}
+        if self.kind in (MerkleNode.SEQUENCE, MerkleNode.SET):
+            return [v.to_value() for v in self.children]
+        return self.value
+
+
+class MerkleSerializer(UniversalSerializer):
+    """A version of the UniversalSerializer that computes a stable digest of
+    every subtree while serializing (i.e. a Merkle tree) and returns the root
+    `MerkleNode` of that tree.
+
+    Digests are deterministic across processes and runs (they don't rely on
+    python's randomized `hash`) and don't depend on the insertion order of
+    dict keys.
+
+    Use `merkle_diff` to find the key paths that changed between two trees
+    while skipping any subtrees that are identical.
+    """
+
+    def serialize(self, obj) -> MerkleNode:
+        return super().serialize(obj)
+
+    def _leaf(self, obj: Any, tag: str) -> MerkleNode:
+        return MerkleNode(_digest(tag.encode('utf-8'), b'\x00', repr(obj).encode('utf-8')), obj)
+
+    def _serialize_int(self, obj):
+        # Bools land here too via `_serialize_derived`
+        return self._leaf(obj, type(obj).__name__)
+
+    def _serialize_float(self, obj):
+        return self._leaf(obj, 'float')
+
+    def _serialize_str(self, obj):
+        return self._leaf(obj, 'str')
+
+    def _serialize_bytes(self, obj):
+        return self._leaf(obj, 'bytes')
+
+    def _serialize_decimal(self, obj):
+        return self._leaf(obj, 'decimal')
+
+    def _serialize_datetime(self, obj):
+        return self._leaf(obj, 'datetime')
+
+    def _serialize_time(self, obj):
+        return self._leaf(obj, 'time')
+
+    def _serialize_date(self, obj):
+        return self._leaf(obj, 'date')
+
+    def _serialize_timedelta(self, obj):
+        return self._leaf(obj, 'timedelta')
+
+    def _serialize_none(self, obj):
+        return self._leaf(None, 'none')
+
+    def _serialize_iters(self, obj):
+        children = [self._serialize_any(i) for i in obj]
+        return MerkleNode(_digest(b'seq\x00', *[c.digest for c in children]),
+                          children=children, kind=MerkleNode.SEQUENCE)
+
+    def _serialize_set(self, obj):
+        children = sorted((self._serialize_any(i) for i in obj), key=lambda c: c.digest)
+        return MerkleNode(_digest(b'set\x00', *[c.digest for c in children]),
+                          children=children, kind=MerkleNode.SET)
+
+    def _serialize_maps(self, obj):
+        children = {}
+        pairs = []
+        for k, v in obj.items():
+            if k in self.skip_keys or v in self.skip_values:
+                continue
+            if self.skip_private and isinstance(k, str) and k.startswith('_'):
+                continue
+            if self.skip_nones and v is None:
+                continue
+            node = self._serialize_any(v)
+            if self.skip_empties and self._is_empty(node):
+                continue
+            children[k] = node
+            pairs.append(self._key_digest(k) + node.digest)
+        pairs.sort()
+        return MerkleNode(_digest(b'map\x00', *pairs), children=children, kind=MerkleNode.MAP)
+
+    def _is_empty(self, node: MerkleNode) -> bool:
+        if node.kind == MerkleNode.LEAF:
+            return isinstance(node.value, self._emptyables) and not node.value
+        return not node.children
+
+    def _key_digest(self, key: Any) -> bytes:
+        return _digest(type(key).__name__.encode('utf-8'), b'\x00', repr(key).encode('utf-8'))
+
+    def _serialize_loop(self, obj):
+        return self._leaf(super()._serialize_loop(obj), 'loop')
+
+    def _serialize_error(self, obj, error):
+        return self._leaf(super()._serialize_error(obj, error), 'error')
+
+    def _serialize_unknown(self, obj):
+        return self._leaf(super()._serialize_unknown(obj), 'unknown')
+
+    def _serialize_max_depth(self, obj):
+        return self._leaf(super()._serialize_max_depth(obj), 'max_depth')
+
+
+def merkle_diff(old: MerkleNode, new: MerkleNode) -> List[List[Union[str, int]]]:
+    """Compares two trees from `MerkleSerializer` and returns the key paths
+    (lists of keys and/or indexes usable with `nested_get` and `nested_set`
+    from `ccptools.tpu.iters`) of every value that was changed, added or
+    removed.
+
+    Subtrees with identical digests are skipped entirely so the work done is
+    proportional to the number of changes rather than the size of the trees.
+
+    Paths point at the deepest map key or sequence index that differs. Sets
+    (and nodes that changed type) are reported as a whole.
+
+    Example:
+    >>> s = MerkleSerializer()
+    >>> merkle_diff(s.serialize({'a': {'b': 1, 'c': [1, 2]}}), s.serialize({'a': {'b': 1, 'c': [1, 3]}}))
+    [['a', 'c', 1]]
+    """
+    changes = []
+    stack = [(old, new, [])]
+    while stack:
+        a, b, path = stack.pop()
+        if a is None or b is None:  # Added or removed
+            changes.append(path)
+            continue
+
+        if a.digest == b.digest:
+            continue
+
+        if a.kind != b.kind or a.kind in (MerkleNode.LEAF, MerkleNode.SET):
+            changes.append(path)
+            continue
+
+        # Collect the differing children in order and push them in reverse so
+        # that changes come out in the same order as they appear in the data
+        pending = []
+        a_children = a.children
+        b_children = b.children
+        if a.kind == MerkleNode.MAP:
+            for k, a_child in a_children.items():
+                b_child = b_children.get(k)
+                if b_child is None or a_child.digest != b_child.digest:
+                    pending.append((a_child, b_child, path + [k]))
+            for k, b_child in b_children.items():
+                if k not in a_children:
+                    pending.append((None, b_child, path + [k]))
+
+        else:  # Sequences
+            a_len = len(a_children)
+            b_len = len(b_children)
+            for i in range(max(a_len, b_len)):
+                a_child = a_children[i] if i < a_len else None
+                b_child = b_children[i] if i < b_len else None
+                if a_child is None or b_child is None or a_child.digest != b_child.digest:
+                    pending.append((a_child, b_child, path + [i]))
+
+        stack.extend(reversed(pending))
+
+    return changes
@@ -0,0 +1,37 @@
+import unittest
+import gc
+import json
+
+from ccptools.tpu import insp
+from ccptools.tpu.insp import _insp_old
+
+
+class Handler(object):
+    def on_event(self, event: str, payload: dict = None):
+        pass
+
+
+class AnyNameCacheTest(unittest.TestCase):
+    def test_cached_names(self):
+        h = Handler()
+        self.assertEqual(f'{__name__}.Handler', insp.get_any_name(h))
+        self.assertIn(id(Handler), _insp_old._instance_names)
+        self.assertEqual(f'{__name__}.Handler', insp.get_any_name(Handler()))
+        self.assertEqual(f'{__name__}.Handler', insp.get_any_name(Handler))
+        self.assertIn(id(Handler), _insp_old._object_names)
+        self.assertEqual(f'{__name__}.Handler.on_event', insp.get_any_name(h.on_event))
+        self.assertEqual(f'{__name__}.Handler.on_event', insp.get_any_name(Handler.on_event))
+        self.assertEqual('json.dumps', insp.get_any_name(json.dumps))
+        self.assertEqual('int', insp.get_any_name(3))
+        self.assertEqual('int', insp.get_any_name(int))
+
+    def test_weak(self):
+        class Temporary(object):
+            pass
+
+        self.assertEqual(f'{__name__}.Temporary', insp.get_any_name(Temporary()))
+        key = id(Temporary)
+        self.assertIn(key, _insp_old._instance_names)
+        del Temporary
+        gc.collect()
+        self.assertNotIn(key, _insp_old._instance_names)
@@ -0,0 +1,74 @@
+import unittest
+import gc
+
+from ccptools.tpu import insp
+from ccptools.tpu.insp import _argprofile
+
+
+class Handler(object):
+    def __call__(self, event: str, *, retries: int = 3, strict: bool, **kwargs) -> bool:
+        return True
+
+    def on_event(self, event: str, payload: dict = None):
+        pass
+
+
+def keyword_only(a, *, b, c=1):
+    pass
+
+
+class ArgProfileTest(unittest.TestCase):
+    def test_shared_cache(self):
+        insp.clear_arg_profile_cache()
+        h1, h2 = Handler(), Handler()
+        self.assertIs(insp.get_arg_profile(h1), insp.get_arg_profile(h2))
+        self.assertIs(insp.get_arg_profile(h1.on_event), insp.get_arg_profile(Handler.on_event))
+        self.assertIs(insp.get_argspec(h1.on_event), insp.get_argspec(h2.on_event))
+        self.assertIsNone(insp.get_arg_profile(42))
+
+        profile = insp.get_arg_profile(h1.on_event)
+        self.assertEqual(('self', 'event', 'payload'), profile.args)
+        self.assertEqual(2, profile.required_count)
+        self.assertEqual(3, profile.arg_count)
+
+    def test_weak(self):
+        def temporary(x):
+            pass
+        insp.get_arg_profile(temporary)
+        size = len(_argprofile._cache)
+        del temporary
+        gc.collect()
+        self.assertEqual(size - 1, len(_argprofile._cache))
+
+    def test_keyword_only(self):
+        profile = insp.get_arg_profile(keyword_only)
+        self.assertEqual(('b', 'c'), profile.kwonlyargs)
+        self.assertEqual(('b',), profile.kwonly_required)
+        self.assertTrue(insp.fits_callable_profile(keyword_only, total_arg_count=1, kwonly_names=['c', 'b'],
+                                                   kwonly_required_count=1))
+        self.assertFalse(insp.fits_callable_profile(keyword_only, kwonly_names=['d']))
+        with self.assertRaises(ValueError):
+            insp.fits_callable_profile(keyword_only, kwonly_required_count=0, raise_error=True)
+
+    def test_annotations(self):
+        self.assertTrue(insp.fits_callable_profile(Handler(), annotations={'event': str, 'return': bool}))
+        self.assertTrue(insp.fits_callable_profile(Handler(), annotations={'retries': object}))
+        self.assertFalse(insp.fits_callable_profile(Handler(), annotations={'event': int}))
+        self.assertFalse(insp.fits_callable_profile(keyword_only, annotations={'a': int}))
+
+    def test_callable_profile(self):
+        is_handler = insp.CallableProfile(required_arg_count=2, arg_names=('*', 'event'), has_kwargs=True,
+                                          kwonly_names=['strict'])
+        self.assertTrue(is_handler(Handler()))
+        self.assertFalse(is_handler(Handler().on_event))
+        self.assertFalse(is_handler(keyword_only))
+        self.assertFalse(is_handler(42))
+        self.assertEqual(3, len(is_handler._verdicts))
+        with self.assertRaisesRegex(ValueError, 'Keyword arguments fail'):
+            is_handler.fits(Handler().on_event, raise_error=True)
+        with self.assertRaisesRegex(ValueError, 'Not a callable'):
+            is_handler.fits(42, raise_error=True)
+
+    def test_arg_names_longer_than_args(self):
+        self.assertFalse(insp.fits_callable_profile(keyword_only, arg_names=('a', 'b')))
+        self.assertTrue(insp.fits_callable_profile(keyword_only, arg_names=('a', '*')))
@@ -0,0 +1,113 @@
+import unittest
+
+from ccptools.tpu.structs.serializers import *
+
+import decimal
+import datetime
+
+
+class Foo:
+    def __init__(self, a, b=None):
+        self.a = a
+        self.b = b
+        self._private = 'secret'
+
+
+class BinarySerializerTest(unittest.TestCase):
+    def setUp(self):
+        self.s = BinarySerializer()
+        self.d = BinaryDecoder()
+
+    def roundtrip(self, obj, serializer=None):
+        return self.d.decode((serializer or self.s).serialize(obj))
+
+    def test_scalar(self):
+        self.assertEqual(1, self.roundtrip(1))
+        self.assertEqual(-1, self.roundtrip(-1))
+        self.assertEqual(1.2, self.roundtrip(1.2))
+        self.assertEqual('foo', self.roundtrip('foo'))
+        self.assertEqual(b'\xff\x00foo', self.roundtrip(b'\xff\x00foo'))
+        self.assertIs(True, self.roundtrip(True))
+        self.assertIs(False, self.roundtrip(False))
+        self.assertIsNone(self.roundtrip(None))
+
+    def test_ints(self):
+        for i in (0, 127, 128, 255, 256, 65535, 65536, 2**32, 2**64 - 1, 2**64, 2**100,
+                  -32, -33, -128, -129, -2**15 - 1, -2**31 - 1, -2**63, -2**63 - 1, -2**100):
+            self.assertEqual(i, self.roundtrip(i))
+
+    def test_msgpack_compatible(self):
+        self.assertEqual(b'\x01', self.s.serialize(1))
+        self.assertEqual(b'\xff', self.s.serialize(-1))
+        self.assertEqual(b'\xc0', self.s.serialize(None))
+        self.assertEqual(b'\xa3foo', self.s.serialize('foo'))
+        self.assertEqual(b'\xc4\x03foo', self.s.serialize(b'foo'))
+        self.assertEqual(b'\x93\x01\x02\x03', self.s.serialize([1, 2, 3]))
+        self.assertEqual(b'\x81\xa1a\x01', self.s.serialize({'a': 1}))
+
+    def test_primitive(self):
+        self.assertEqual(decimal.Decimal('2.3400'), self.roundtrip(decimal.Decimal('2.3400')))
+        self.assertEqual(datetime.datetime(2024, 4, 3, 12, 45, 21, 123456),
+                         self.roundtrip(datetime.datetime(2024, 4, 3, 12, 45, 21, 123456)))
+        self.assertEqual(datetime.date(2024, 4, 3), self.roundtrip(datetime.date(2024, 4, 3)))
+        self.assertEqual(datetime.time(12, 23, 45, 7), self.roundtrip(datetime.time(12, 23, 45, 7)))
+        self.assertEqual(datetime.timedelta(days=-5, minutes=6, microseconds=3),
+                         self.roundtrip(datetime.timedelta(days=-5, minutes=6, microseconds=3)))
+
+    def test_timezones(self):
+        tz = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+        dt = datetime.datetime(2024, 4, 3, 12, 45, 21, tzinfo=tz)
+        result = self.roundtrip(dt)
+        self.assertEqual(dt, result)
+        self.assertEqual(dt.utcoffset(), result.utcoffset())
+        self.assertEqual(datetime.timezone.utc,
+                         self.roundtrip(datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)).tzinfo)
+        self.assertIsNone(self.roundtrip(datetime.datetime(2024, 1, 1)).tzinfo)
+
+    def test_object(self):
+        self.assertDictEqual({'a': 7, 'b': 'bar'}, self.roundtrip(Foo(a=7, b='bar')))
+        self.assertDictEqual({'a': 7, 'b': {'a': 'cool', 'b': datetime.datetime(2024, 4, 3, 12, 45, 21)}},
+                             self.roundtrip(Foo(a=7, b=Foo(a='cool', b=datetime.datetime(2024, 4, 3, 12, 45, 21)))))
+
+    def test_iters(self):
+        self.assertDictEqual({1: 2, 'a': 'b', (1, 2): 'c'}, self.roundtrip({1: 2, 'a': 'b', (1, 2): 'c'}))
+        self.assertListEqual([1, 2, 3, 'a', 'b'], self.roundtrip((1, 2, 3, 'a', 'b')))
+        self.assertEqual({1, 2, 3, 'a', 'b'}, set(self.roundtrip({1, 2, 3, 'a', 'b'})))
+        big_list = list(range(70000))
+        self.assertListEqual(big_list, self.roundtrip(big_list))
+        big_dict = {str(i): i for i in range(300)}
+        self.assertDictEqual(big_dict, self.roundtrip(big_dict))
+
+    def test_skips(self):
+        s = BinarySerializer(skip_nones=True, skip_empties=True, skip_keys=['x'])
+        self.assertDictEqual({'c': 1},
+                             self.roundtrip({'a': None, 'b': [], 'c': 1, 'd': '', 'e': {}, 'x': 5, '_y': 3}, s))
+
+    def test_loops_and_depth(self):
+        a = {'a': 1}
+        a['self'] = a
+        result = self.roundtrip(a)
+        self.assertEqual(1, result['a'])
+        self.assertTrue(result['self'].startswith('__LOOP__::'))
+
+        s = BinarySerializer(max_depth=1)
+        result = self.roundtrip({'a': {'b': {'c': 1}}}, s)
+        self.assertTrue(result['a']['b'].startswith('__MAX_DEPTH__::'))
+
+    def test_error(self):
+        class Boom(object):
+            @property
+            def __dict__(self):
+                raise RuntimeError('boom')
+
+        result = self.roundtrip([1, Boom(), 3])
+        self.assertEqual(1, result[0])
+        self.assertTrue(result[1].startswith('__ERROR__::'))
+        self.assertEqual(3, result[2])
+
+    def test_corrupt(self):
+        data = self.s.serialize({'a': [1, 2, 3]})
+        with self.assertRaises(ValueError):
+            self.d.decode(data[:-1])
+        with self.assertRaises(ValueError):
+            self.d.decode(data + b'\x01')
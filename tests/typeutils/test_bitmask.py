@@ -0,0 +1,70 @@
+import array
+import enum
+import unittest
+
+from ccptools.tpu import casting
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Perm(enum.IntFlag):
+    X = 1
+    W = 2
+    R = 4
+    RW = 6  # Not a single bit
+
+
+class TestBitmask(unittest.TestCase):
+    def test_split_and_join(self):
+        for value in (0, 1, 12, 123, 1 << 63, (1 << 200) | 5, 2 ** 64 - 1):
+            parts = casting.split_bitmask(value)
+            self.assertEqual([1 << p for p in range(value.bit_length()) if value >> p & 1], parts)
+            self.assertEqual(value, casting.join_bitmask(parts))
+        self.assertEqual([], casting.split_bitmask(-5))
+        self.assertEqual(0, casting.join_bitmask([]))
+
+    def test_positions(self):
+        for value in (0, 1, 12, 255, 256, 123456789, 2 ** 64 - 1, 2 ** 64, (1 << 200) | 5):
+            self.assertEqual([p for p in range(value.bit_length()) if value >> p & 1],
+                             casting.bitmask_positions(value))
+        self.assertEqual([], casting.bitmask_positions(-1))
+
+    def test_split_bitmasks(self):
+        masks = [3, 3, 0, 12]
+        self.assertEqual([casting.split_bitmask(m) for m in masks], casting.split_bitmasks(masks))
+        self.assertEqual([[0, 1], [0, 1], [], [2, 3]], casting.split_bitmasks(iter(masks), positions=True))
+        result = casting.split_bitmasks(masks)
+        result[0].append(99)
+        self.assertEqual([1, 2], result[1])
+
+    def test_columns(self):
+        masks = array.array('Q', [1, 4, 5, 0])
+        self.assertEqual({0: bytearray([1, 0, 1, 0]), 2: bytearray([0, 1, 1, 0])}, casting.bitmask_columns(masks))
+        self.assertEqual({1: bytearray(4)}, casting.bitmask_columns(masks, positions=[1]))
+        self.assertEqual({}, casting.bitmask_columns([]))
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_columns_numpy(self):
+        columns = casting.bitmask_columns(numpy.array([1, 4, 5, 0], dtype=numpy.uint64))
+        self.assertEqual([0, 2], sorted(columns))
+        self.assertEqual([True, False, True, False], columns[0].tolist())
+
+    def test_flags(self):
+        self.assertEqual([Perm.W, Perm.R], casting.bitmask_to_flags(6, Perm))
+        self.assertEqual([Perm.X, Perm.W, Perm.R], casting.bitmask_to_flags(Perm.X | Perm.RW, Perm))
+        self.assertEqual([Perm.X], casting.bitmask_to_flags(9, Perm))
+        with self.assertRaises(ValueError):
+            casting.bitmask_to_flags(9, Perm, strict=True)
+        self.assertEqual([], casting.bitmask_to_flags(0, Perm))
+        self.assertEqual(6, casting.flags_to_bitmask([Perm.R, Perm.W]))
+        self.assertEqual(7, casting.flags_to_bitmask([Perm.RW, 1]))
+
+        class Color(enum.Flag):
+            RED = enum.auto()
+            BLUE = enum.auto()
+
+        self.assertEqual([Color.RED, Color.BLUE], casting.bitmask_to_flags(3, Color))
+        self.assertEqual(2, casting.flags_to_bitmask([Color.BLUE]))
@@ -0,0 +1,53 @@
+import unittest
+import datetime
+
+from ccptools.tpu.iters import compile_path, nested_get, nested_set
+
+
+class Record(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class CompiledPathTest(unittest.TestCase):
+    def test_get(self):
+        path = compile_path(('a', 7, 'c', -2))
+        obj = {'a': {7: {'c': ['apple', 'banana', 'cantaloupe']}, 5: 'other'}}
+        self.assertEqual('banana', path(obj))
+        self.assertEqual('banana', path.get(obj))
+        self.assertEqual(nested_get(obj, ('a', 7, 'c', -2)), path(obj))
+        self.assertEqual('nope', path({'a': {7: {'c': []}}}, 'nope'))
+        self.assertEqual('nope', path({'a': {}}, 'nope'))
+        self.assertIsNone(path({}))
+
+    def test_mixed_types(self):
+        path = compile_path(['when', 'year'])
+        self.assertEqual(1940, path({'when': datetime.date(1940, 10, 9)}))
+        self.assertEqual(1940, path(Record(when=datetime.date(1940, 10, 9))))
+        self.assertEqual(1940, path(Record(when={'year': 1940})))
+        self.assertEqual(-1, path(Record(), -1))
+        self.assertEqual(1940, path({'when': datetime.date(1940, 10, 9)}))
+
+    def test_set(self):
+        path = compile_path(('a', 'b', 'c'))
+        obj = {'a': {'b': {'c': 7}}}
+        path.set(obj, 9)
+        self.assertEqual({'a': {'b': {'c': 9}}}, obj)
+
+        obj = {}
+        path.set(obj, 9)
+        expected = {}
+        nested_set(expected, ('a', 'b', 'c'), 9)
+        self.assertEqual(expected, obj)
+
+        record = Record(a=Record())
+        path.set(record, 'x')
+        self.assertEqual({'c': 'x'}, record.a.b)
+
+        obj = {'a': [{'c': 7}, {'c': 8}]}
+        compile_path(('a', 1, 'c')).set(obj, 9)
+        self.assertEqual({'a': [{'c': 7}, {'c': 9}]}, obj)
+
+    def test_empty(self):
+        with self.assertRaises(ValueError):
+            compile_path([])
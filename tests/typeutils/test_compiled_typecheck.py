@@ -0,0 +1,139 @@
+import unittest
+import array
+import dataclasses
+import sys
+import typing
+from typing import *
+
+from ccptools.tpu.insp import compile_type_check, check_type, CheckMode
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: int
+
+
+@dataclasses.dataclass
+class Shape:
+    name: str
+    points: List[Point]
+    tags: Optional[Dict[str, str]] = None
+    parent: Optional['Shape'] = None
+
+
+UserId = NewType('UserId', int)
+T_NUM = TypeVar('T_NUM', int, float)
+
+
+class CompiledTypeCheckTest(unittest.TestCase):
+    def assertChecks(self, annotation, good, bad):
+        check = compile_type_check(annotation)
+        for val in good:
+            self.assertTrue(check(val), f'{val!r} should match {annotation!r}')
+        for val in bad:
+            self.assertFalse(check(val), f'{val!r} should not match {annotation!r}')
+
+    def test_cached(self):
+        self.assertIs(compile_type_check(List[int]), compile_type_check(List[int]))
+
+    def test_plain(self):
+        self.assertChecks(int, [1, True], ['1', 1.0, None])
+        self.assertChecks(Any, [1, None, 'x'], [])
+        self.assertChecks(None, [None], [0, ''])
+        self.assertChecks(UserId, [1], ['1'])
+        self.assertChecks(T_NUM, [1, 1.5], ['1'])
+
+    def test_unions(self):
+        self.assertChecks(Union[int, str], [1, 'x'], [1.5, None])
+        self.assertChecks(Optional[int], [1, None], ['x'])
+        self.assertChecks(Optional[List[int]], [None, [1]], [['x'], 'x'])
+        if sys.version_info >= (3, 10):
+            self.assertChecks(eval('int | None'), [1, None], ['x'])
+            self.assertChecks(eval('list[int] | str'), [[1], 'x'], [['x'], 1])
+
+    def test_literal(self):
+        self.assertChecks(Literal['a', 'b', 2], ['a', 'b', 2], ['c', 1, True, [2]])
+
+    def test_containers(self):
+        self.assertChecks(List[int], [[], [1, 2]], [[1, 'x'], (1, 2), None])
+        self.assertChecks(List, [[], [1, 'x']], [(1,)])
+        self.assertChecks(Set[str], [set(), {'a'}], [{1}, ['a']])
+        self.assertChecks(Tuple[int, str], [(1, 'a')], [(1, 2), (1,), (1, 'a', 'b')])
+        self.assertChecks(Tuple[int, ...], [(), (1, 2, 3)], [(1, 'a'), [1]])
+        self.assertChecks(Dict[str, int], [{}, {'a': 1}], [{1: 1}, {'a': 'b'}, [('a', 1)]])
+        self.assertChecks(Mapping[str, List[int]], [{'a': [1]}], [{'a': ['b']}])
+        self.assertChecks(Sequence[int], [[1], (1, 2)], [{1}, ['a']])
+        self.assertChecks(Type[Exception], [ValueError, Exception], [ValueError(), int])
+        self.assertChecks(Callable[[int], int], [len, lambda x: x], [1])
+        if sys.version_info >= (3, 9):
+            self.assertChecks(eval('dict[str, int]'), [{'a': 1}], [{'a': 'b'}])
+            self.assertChecks(eval('list[tuple[int, str]]'), [[(1, 'a')]], [[(1, 2)]])
+
+    def test_dataclasses(self):
+        square = Shape('square', [Point(0, 0), Point(0, 1), Point(1, 1), Point(1, 0)])
+        self.assertChecks(Shape, [square, Shape('child', [], {'a': 'b'}, square)],
+                          [Shape('bad', [Point(0, 'x')]), Shape('bad', [], {'a': 1}),
+                           Shape('bad', [], None, Shape(1, [])), Point(1, 1)])
+        self.assertChecks(List[Point], [[Point(1, 2)]], [[Point('1', 2)]])
+
+    def test_matches_check_type(self):
+        cases = [
+            (1, int), ('a', int), ([1, 2], List[int]), ([1, 'a'], List[int]), ([1, 'a'], List[Union[int, str]]),
+            ((1, 'a'), Tuple[int, str]), ((1, 2), Tuple[int, ...]), ({'a': 1}, Dict[str, int]),
+            ({'a': 'b'}, Dict[str, int]), ({1, 2}, Set[int]), (None, Optional[int]), (1, Any),
+        ]
+        for val, annotation in cases:
+            self.assertEqual(check_type(val, annotation), compile_type_check(annotation)(val), f'{val!r}, {annotation!r}')
+
+    def test_forward_ref(self):
+        with self.assertRaises(TypeError):
+            compile_type_check(List['Nope'])
+
+
+class CheckModeTest(unittest.TestCase):
+    def test_full(self):
+        check = compile_type_check(List[int])
+        self.assertEqual((True, 100), tuple(check.validate(list(range(100)))))
+        self.assertEqual((False, 3), tuple(check.validate([1, 2, 'x', 4])))
+        self.assertEqual((True, 110), tuple(compile_type_check(List[List[int]]).validate([[1] * 10] * 10)))
+
+    def test_first_n(self):
+        check = compile_type_check(List[int], CheckMode.first_n(10))
+        self.assertIsNot(check, compile_type_check(List[int]))
+        self.assertIs(check, compile_type_check(List[int], CheckMode.first_n(10)))
+        self.assertEqual((True, 10), tuple(check.validate(list(range(1000)))))
+        self.assertTrue(check(list(range(1000)) + ['x']))
+        self.assertFalse(check(['x'] + list(range(1000))))
+        self.assertEqual((True, 10), tuple(compile_type_check(Dict[str, int], CheckMode.first_n(10)).validate(
+            {str(i): i for i in range(100)})))
+        self.assertEqual((True, 10), tuple(compile_type_check(Tuple[int, ...], CheckMode.first_n(10)).validate(
+            tuple(range(100)))))
+
+    def test_random_sample(self):
+        check = compile_type_check(List[int], CheckMode.random_sample(20, seed=1))
+        result = check.validate(list(range(1000)))
+        self.assertTrue(result)
+        self.assertEqual(20, result.inspected)
+        self.assertEqual((True, 5), tuple(check.validate(list(range(5)))))
+        self.assertFalse(check(['x'] * 1000))
+        self.assertEqual((True, 20), tuple(compile_type_check(Set[int], CheckMode.random_sample(20)).validate(
+            set(range(100)))))
+
+    def test_homogeneous_containers(self):
+        check = compile_type_check(Collection[int])  # array.array is only a Sequence as of 3.10
+        self.assertEqual((True, 0), tuple(check.validate(array.array('q', range(1000)))))
+        self.assertEqual((False, 0), tuple(check.validate(array.array('d', [1.0, 2.0]))))
+        self.assertEqual((True, 0), tuple(check.validate(b'bytes')))
+        self.assertEqual((True, 0), tuple(compile_type_check(Sequence[Union[int, str]]).validate(bytearray(b'x'))))
+        self.assertEqual((False, 0), tuple(compile_type_check(Sequence[str]).validate(b'bytes')))
+        self.assertEqual((True, 0), tuple(compile_type_check(Collection[float]).validate(array.array('f', [1.5]))))
+
+    def test_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('numpy not installed')
+        check = compile_type_check(Collection[float])
+        self.assertEqual((True, 0), tuple(check.validate(numpy.array([1.0, 2.0]))))
+        self.assertEqual((False, 0), tuple(check.validate(numpy.array([1, 2], dtype='int8'))))
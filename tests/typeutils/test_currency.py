@@ -0,0 +1,79 @@
+import decimal
+import unittest
+
+from ccptools.tpu import casting
+
+D = decimal.Decimal
+
+
+class TestParseCurrency(unittest.TestCase):
+    def test_locales(self):
+        self.assertEqual(('$', D('1234.56')), casting.parse_currency('$1,234.56'))
+        self.assertEqual(('€', D('1234.56')), casting.parse_currency('1.234,56 €', 'de'))
+        self.assertEqual(('EUR', D('1234567.8')), casting.parse_currency('EUR 1.234.567,8 eur', 'de_DE'))
+        self.assertEqual(('€', D('1234.56')), casting.parse_currency('1 234,56 €', 'fr-FR'))
+        self.assertEqual(('kr', D('1234.5')), casting.parse_currency('1 234,5 kr', 'sv_SE.UTF-8'))
+        self.assertEqual(('CHF', D('1234.50')), casting.parse_currency("CHF 1'234.50", 'de_CH'))
+        self.assertEqual(('EUR/USD', D('1.5')), casting.parse_currency('EUR 1.5 USD'))
+        self.assertEqual(('', D('12')), casting.parse_currency('12'))
+        with self.assertRaises(ValueError):
+            casting.parse_currency('1', 'xx')
+
+        swiss = casting.CurrencyLocale('.', ("'",))
+        self.assertEqual(('', D('1234.5')), casting.parse_currency("1'234.5", swiss))
+
+    def test_other_locales_dont_misparse(self):
+        for text in ('1.234,56', '1,5', '1,00', '12,34,567', 'abc', '', '$', '1.2.3'):
+            self.assertEqual((None, None), casting.parse_currency(text), text)
+        self.assertEqual((None, None), casting.parse_currency('1,234.56', 'de'))
+        self.assertEqual(('', D('1.234')), casting.parse_currency('1.234'))
+        self.assertEqual(('', D('1234')), casting.parse_currency('1.234', 'de'))
+
+    def test_separators_arent_currency(self):
+        self.assertEqual(('$', 99), casting.parse_currency('$.99', minor_units=True))
+        self.assertEqual(('', D('0.5')), casting.parse_currency('.5'))
+        self.assertEqual(('', D('5')), casting.parse_currency('5.'))
+        self.assertEqual(('€', D('0.5')), casting.parse_currency(',5 €', 'de'))
+        for text in ('.', '$.', '5..', '$,5', '.5.'):
+            self.assertEqual((None, None), casting.parse_currency(text), text)
+
+    def test_long_whitespace(self):
+        for text in (' ' * 5000 + 'x', '1' + ' ' * 5000 + '1', '$' + ' ' * 5000 + 'x', '-' + ' ' * 5000 + '-x'):
+            self.assertEqual((None, None), casting.parse_currency(text))
+        self.assertEqual(('$', D('5')), casting.parse_currency(' ' * 5000 + '$' + ' ' * 5000 + '5' + ' ' * 5000))
+
+    def test_signs(self):
+        for text in ('-$5', '$-5', '$5-', '5 USD-', '- 5 USD', '−5 $'):
+            currency, amount = casting.parse_currency(text)
+            self.assertEqual(D('-5'), amount, text)
+        self.assertEqual(D('5'), casting.parse_currency('+$5')[1])
+        for text in ('--5', '+5-', '-$5-', '- $ - 5', '−5 $+'):
+            self.assertEqual((None, None), casting.parse_currency(text), text)
+
+    def test_minor_units(self):
+        self.assertEqual(('$', 123456), casting.parse_currency('$1,234.56', minor_units=True))
+        self.assertEqual(('$', -1), casting.parse_currency('-$0.01', minor_units=True))
+        self.assertEqual(('JPY', 1000), casting.parse_currency('JPY 1,000', minor_units=True))
+        self.assertEqual(('KWD', 1500), casting.parse_currency('KWD 1.5', minor_units=True))
+        self.assertEqual(('BTC', 150000000), casting.parse_currency('1.5 BTC', minor_units=True, minor_digits=8))
+        self.assertEqual(('$', 12), casting.parse_currency('$0.125', minor_units=True))  # Half to even
+        self.assertEqual(('$', 13), casting.get_currency_parser().parse('$0.125', True, rounding=decimal.ROUND_HALF_UP))
+        self.assertEqual(('$', 13), casting.parse_currency('$0.125', minor_units=True, rounding=decimal.ROUND_UP))
+        self.assertEqual([('$', 12)], casting.parse_currencies(['$0.129'], minor_units=True,
+                                                               rounding=decimal.ROUND_DOWN))
+        # No float rounding errors
+        self.assertEqual(('$', 1000000000000000001), casting.parse_currency('$10,000,000,000,000,000.01',
+                                                                          minor_units=True))
+
+    def test_batch(self):
+        prices = ['$1.99', '$1.99', 'n/a', '$1,000']
+        self.assertEqual([casting.parse_currency(p) for p in prices], casting.parse_currencies(prices))
+        self.assertEqual([('€', 199), ('€', 100000)], casting.parse_currencies(iter(['1,99 €', '1.000 €']), 'de',
+                                                                             minor_units=True))
+        self.assertIs(casting.get_currency_parser('de'), casting.get_currency_parser('de'))
+        many = [f'${i}' for i in range(10000)] * 2  # More unique texts than are memoized
+        self.assertEqual([('$', D(t[1:])) for t in many], casting.parse_currencies(many))
+
+    def test_legacy(self):
+        self.assertEqual(('USD', 1234.5), casting.parse_currency_text('USD 1,234.5'))
+        self.assertEqual((None, None), casting.parse_currency_text('n/a 5 x 5'))
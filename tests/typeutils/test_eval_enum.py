@@ -66,3 +66,38 @@ class TestEnumEval(unittest.TestCase):
         self.assertEqual(SomeEnum.DELTA, SomeEnum.from_any(OtherEnum.TWO))
         self.assertEqual(SomeEnum.DELTA, SomeEnum.from_any('Yomama', SomeEnum.DELTA))
         self.assertIsNone(SomeEnum.from_any('Yomama', None))
+
+    def test_lookup_tables(self):
+        class Color(enum.Enum):
+            RED = 'r'
+            GREEN = 'g'
+            CRIMSON = 'r'  # Alias
+
+        self.assertEqual(Color.RED, casting.enum_eval('red', Color))
+        self.assertEqual(Color.RED, casting.enum_eval('CRIMSON', Color))
+        self.assertEqual(Color.RED, casting.enum_eval(' crimson', Color))
+        self.assertEqual(Color.GREEN, casting.enum_eval('g', Color))
+        self.assertEqual(Color.GREEN, casting.enum_eval(b' G ', Color))
+        self.assertIsNone(casting.enum_eval('b', Color))
+        with self.assertRaises(ValueError):
+            casting.enum_eval('b', Color, raise_on_fail=True)
+
+        class Perm(enum.IntFlag):
+            R = 4
+            W = 2
+            X = 1
+
+        self.assertEqual(Perm.R | Perm.W, casting.enum_eval('6', Perm))
+        self.assertEqual(Perm.X, casting.enum_eval('x', Perm))
+
+    def test_enum_eval_many(self):
+        class SomeEnum(EnumEx):
+            ALPHA = 0
+            BETA = 1
+
+        values = ['alpha', 'BETA', 1, '0x1', b'beta', SomeEnum.ALPHA, 'gamma', None, 'alpha', 7]
+        self.assertEqual([casting.enum_eval(v, SomeEnum, SomeEnum.BETA) for v in values],
+                         casting.enum_eval_many(values, SomeEnum, SomeEnum.BETA))
+        self.assertEqual([SomeEnum.ALPHA, None], casting.enum_eval_many(iter(['Alpha', 'x']), SomeEnum))
+        with self.assertRaises(ValueError):
+            casting.enum_eval_many(['alpha', 'gamma'], SomeEnum, raise_on_fail=True)
@@ -0,0 +1,55 @@
+import array
+import datetime
+import unittest
+
+from ccptools.tpu import casting
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_MIXED = ['1', ' 2.5 ', '0x1f', '0b101', '1e3', '-7', 'nan?', '', b'42', b'x', 3, 4.75, True, None, object(),
+          datetime.timedelta(seconds=90), '1_000', '007', 2 ** 70]
+
+
+class TestEvalMany(unittest.TestCase):
+    def test_same_as_scalar(self):
+        for values in (_MIXED, ['1.5'] * 10 + _MIXED, [1] * 10 + _MIXED, [2.5] * 10 + _MIXED, [b'1'] * 10 + _MIXED):
+            self.assertEqual([casting.float_eval(v, None) for v in values], casting.float_eval_many(values, None))
+            self.assertEqual([casting.int_eval(v, -1) for v in values], casting.int_eval_many(values, -1))
+            self.assertEqual([casting.bool_eval(v) for v in values], casting.bool_eval_many(values))
+
+    def test_iterables(self):
+        self.assertEqual([1.0, 2.0], casting.float_eval_many(iter(['1', '2'])))
+        self.assertEqual([3, 4], casting.int_eval_many(str(i) for i in (3, 4)))
+        self.assertEqual([True, False], casting.bool_eval_many(iter(['on', 'off'])))
+        self.assertEqual([], casting.float_eval_many([]))
+
+    def test_array_output(self):
+        col = casting.float_eval_many(['1.5', 'n/a', 3], output='array')
+        self.assertEqual(array.array('d', [1.5, 0.0, 3.0]), col.values)
+        self.assertEqual(bytearray([0, 1, 0]), col.failed)
+
+        col = casting.int_eval_many(['12', 'x', 2 ** 70, '0x10'], output='array')
+        self.assertEqual(array.array('q', [12, 0, 0, 16]), col.values)
+        self.assertEqual(bytearray([0, 1, 1, 0]), col.failed)
+
+        self.assertEqual(array.array('B', [1, 0, 1]), casting.bool_eval_many(['yes', 'no', 2], output='array'))
+
+    def test_raise_on_fail(self):
+        with self.assertRaises(ValueError):
+            casting.float_eval_many(['1', 'x'], raise_on_fail=True)
+        with self.assertRaises(ValueError):
+            casting.int_eval_many(['1', 'x'], raise_on_fail=True)
+        with self.assertRaises(OverflowError):
+            casting.int_eval_many([1, 2 ** 70], output='array', raise_on_fail=True)
+        with self.assertRaises(ValueError):
+            casting.float_eval_many(['1'], output='dataframe')
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_numpy_output(self):
+        col = casting.float_eval_many(['1.5', 'n/a'], output='numpy')
+        self.assertEqual([1.5, 0.0], col.values.tolist())
+        self.assertEqual([False, True], col.failed.tolist())
+        self.assertEqual([True, False], casting.bool_eval_many(['y', 'n'], output='numpy').tolist())
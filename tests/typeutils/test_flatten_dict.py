@@ -0,0 +1,47 @@
+import unittest
+
+from ccptools.tpu import iters
+
+
+class FlattenDictTest(unittest.TestCase):
+    nested = {'a': {7: {'c': 'value'}, 5: 'other', 'e': {}}, 'b': [1, {'x': 1}], 'c': {'d': {'e': {'f': None}}}}
+    flat = {('a', 7, 'c'): 'value', ('a', 5): 'other', ('b',): [1, {'x': 1}], ('c', 'd', 'e', 'f'): None}
+
+    def test_iter_flatten_dict(self):
+        gen = iters.iter_flatten_dict(self.nested)
+        self.assertEqual((('a', 7, 'c'), 'value'), next(gen))
+        self.assertEqual(list(self.flat.items()), [(('a', 7, 'c'), 'value')] + list(gen))
+        self.assertEqual([], list(iters.iter_flatten_dict({})))
+
+    def test_flatten_dict(self):
+        self.assertEqual(self.flat, iters.flatten_dict(self.nested))
+        self.assertEqual(list(self.flat), list(iters.flatten_dict(self.nested)))
+        self.assertEqual({'a.7.c': 'value', 'a.5': 'other', 'b': [1, {'x': 1}], 'c.d.e.f': None},
+                         iters.str_flatten_dict(self.nested))
+        self.assertEqual({'1': 'b'}, iters.str_flatten_dict({1: 'a', '1': 'b'}))
+        self.assertEqual({'<a>/<7>/<c>': 'value'}, iters.str_flatten_dict({'a': {7: {'c': 'value'}}}, '/',
+                                                                          lambda k: f'<{k}>'))
+
+    def test_deep(self):
+        deep = 'leaf'
+        for i in range(5000):
+            deep = {i: deep}
+        flat = iters.flatten_dict(deep)
+        self.assertEqual({tuple(range(4999, -1, -1)): 'leaf'}, flat)
+        self.assertEqual(flat, iters.flatten_dict(iters.unflatten_dict(flat)))  # == on it would hit the recursion limit
+
+    def test_unflatten_dict(self):
+        nested = dict(self.nested)
+        nested['a'] = {k: v for k, v in nested['a'].items() if k != 'e'}  # Empty dicts have no leaves
+        self.assertEqual(nested, iters.unflatten_dict(self.flat))
+        self.assertEqual({'a': 1, 'b': {'c': 2}}, iters.unflatten_dict({'a': 1, ('b', 'c'): 2}))
+        self.assertEqual({'a': {'b': {'c': 'value'}, 'd': 'other'}},
+                         iters.str_unflatten_dict({'a.b.c': 'value', 'a.d': 'other'}))
+
+    def test_unflatten_conflicts(self):
+        with self.assertRaises(ValueError):
+            iters.unflatten_dict({('a',): 1, ('a', 'b'): 2})
+        with self.assertRaises(ValueError):
+            iters.unflatten_dict({('a', 'b'): 2, ('a',): 1})
+        with self.assertRaises(ValueError):
+            iters.unflatten_dict({(): 1})
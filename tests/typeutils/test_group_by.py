@@ -87,3 +87,100 @@ class GroupByTest(unittest.TestCase):
         }
 
         self.assertEqual(expected_grouping_by_letter, iters.group_by(list_of_names, -1))
+
+
+class Kill(object):
+    def __init__(self, region, kind, isk):
+        self.region = region
+        self.kind = kind
+        self.isk = isk
+
+
+kills = [
+    Kill('Delve', 'kill', 1000),
+    Kill('Jita', 'trade', 30),
+    Kill('Delve', 'kill', 500),
+    Kill('Delve', 'loss', None),
+    {'region': 'Jita', 'kind': 'trade', 'isk': 70},
+]
+
+
+class GroupByAggregateTest(unittest.TestCase):
+    def test_multiple_keys(self):
+        groups = iters.group_by(kills, ('region', 'kind'))
+        self.assertEqual([('Delve', 'kill'), ('Jita', 'trade'), ('Delve', 'loss')], list(groups))
+        self.assertEqual([kills[1], kills[4]], groups[('Jita', 'trade')])
+        self.assertEqual({(1940, 10): [lennon], (1942, 6): [mccartney]},
+                         iters.group_by([lennon, mccartney], ['year', lambda d: d.month]))
+        self.assertEqual({(1940, 2): [lennon]}, iters.group_by([lennon], ('year', 'weekday')))
+        self.assertEqual({(1940,): [lennon]}, iters.group_by([lennon], ['year']))
+        self.assertEqual({('Jita',): [kills[1]]}, iters.group_by([kills[1]], ('region',)))
+        self.assertEqual({('Jita',): [{'r': 'Jita'}]}, iters.group_by([{'r': 'Jita'}], ['r']))
+        self.assertEqual({(1,): [(0, 1)]}, iters.group_by([(0, 1)], [1]))
+        self.assertEqual({(2,): [(0, 1)]}, iters.group_by([(0, 1)], [lambda t: t[1] + 1]))
+
+    def test_aggregations(self):
+        groups = iters.group_by(kills, 'region', {
+            'n': 'count',
+            'priced': ('count', 'isk'),
+            'isk': ('sum', 'isk'),
+            'cheapest': ('min', 'isk'),
+            'priciest': ('max', 'isk'),
+            'first': 'first',
+            'kinds': ('list', 'kind'),
+        })
+        self.assertEqual({'n': 3, 'priced': 2, 'isk': 1500, 'cheapest': 500, 'priciest': 1000, 'first': kills[0],
+                          'kinds': ['kill', 'kill', 'loss']}, groups['Delve'])
+        self.assertEqual({'n': 2, 'priced': 2, 'isk': 100, 'cheapest': 30, 'priciest': 70, 'first': kills[1],
+                          'kinds': ['trade', 'trade']}, groups['Jita'])
+
+        self.assertEqual({'Delve': {'isk': None}}, iters.group_by(kills[3:4], 'region', {'isk': ('max', 'isk')}))
+        self.assertEqual({1940: {'dates': [lennon, starr]}}, iters.group_by([lennon, starr], 'year', {'dates': 'list'}))
+
+    def test_bad_aggregations(self):
+        with self.assertRaises(ValueError):
+            iters.group_by(kills, 'region', {'n': 'median'})
+        with self.assertRaises(ValueError):
+            iters.group_by(kills, 'region', {'n': 'sum'})
+
+    def test_missing_keys(self):
+        self.assertEqual({None: [kills[0]]}, iters.group_by(kills[:1], 'nope'))
+        self.assertEqual({'Delve': [kills[0]], None: [{}]}, iters.group_by([kills[0], {}], 'region'))
+        self.assertEqual({'n': [('n', 1)], None: [()]}, iters.group_by([('n', 1), ()], 0))
+
+
+class IterGroupByTest(unittest.TestCase):
+    names = ['lennon', 'mccartney', 'harrison', 'starr', 'jagger', 'richards', 'watts', 'wood', 'jones', 'wyman']
+
+    def test_presorted(self):
+        dates = sorted([lennon, mccartney, harrison, starr, jagger, wyman], key=lambda d: d.year)
+        groups = [(k, list(g)) for k, g in iters.iter_group_by(dates, 'year')]
+        self.assertEqual([(1936, [wyman]), (1940, [lennon, starr]), (1942, [mccartney]),
+                          (1943, [harrison, jagger])], groups)
+        self.assertEqual([('a', [(1, 'a')]), ('b', [(2, 'b')]), ('a', [(3, 'a')])],
+                         [(k, list(g)) for k, g in iters.iter_group_by([(1, 'a'), (2, 'b'), (3, 'a')], 1)])
+
+    def test_in_memory_sort(self):
+        groups = {k: list(g) for k, g in iters.iter_group_by(iter(self.names), -1, presorted=False)}
+        self.assertEqual(iters.group_by(self.names, -1), groups)
+        self.assertEqual(['d', 'n', 'r', 's', 'y'], list(groups))
+
+    def test_external_sort(self):
+        for run_size in (1, 3, 5, 10):
+            groups = [(k, list(g)) for k, g in iters.iter_group_by(self.names, lambda n: n[-1], presorted=False,
+                                                                   run_size=run_size)]
+            expected = sorted(iters.group_by(self.names, -1).items())
+            self.assertEqual(expected, groups)
+
+        rows = [{'player': i % 7, 'n': i} for i in range(1000)]
+        groups = [(k, list(g)) for k, g in iters.iter_group_by(rows, 'player', presorted=False, run_size=64)]
+        self.assertEqual(list(range(7)), [k for k, _ in groups])
+        self.assertEqual(list(range(3, 1000, 7)), [r['n'] for r in groups[3][1]])
+
+    def test_empty(self):
+        self.assertEqual([], list(iters.iter_group_by([], 'year', presorted=False)))
+        self.assertEqual([], list(iters.iter_group_by([], 'year')))
+
+    def test_bad_run_size(self):
+        with self.assertRaises(ValueError):
+            iters.iter_group_by(self.names, -1, presorted=False, run_size=0)  # Raised without iterating
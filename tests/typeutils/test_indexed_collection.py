@@ -0,0 +1,81 @@
+import unittest
+
+from ccptools.tpu import iters
+
+
+class IndexedCollectionTest(unittest.TestCase):
+    def test_queries(self):
+        main = iters.IndexedCollection([1, 2, 3, 4, 4])
+        self.assertEqual(4, len(main))
+        self.assertIn(3, main)
+        self.assertTrue(main.has_all([1, 2]))
+        self.assertFalse(main.has_all([1, 5]))
+        self.assertTrue(main.has_any([5, 4]))
+        self.assertFalse(main.has_any(iter([5, 6])))
+        self.assertTrue(main.has_any([]))
+        self.assertEqual(([1, 2], [3, 4], [5, 6]), main.venn([3, 4, 5, 6]))
+        self.assertEqual(([1, 2], [3, 4], [5, 6]), main.venn(iters.IndexedCollection([3, 4, 5, 6])))
+        self.assertTrue(main.has_all(iters.IndexedCollection([1, 2])))
+        self.assertEqual([1, 2, 3, 4], sorted(iters.IndexedCollection({1: 'a', 2: 'b', 3: 'c', 4: 'd'})))
+
+    def test_module_functions(self):
+        main = iters.IndexedCollection([1, 2, 3, 4])
+        self.assertTrue(iters.has_all(main, [1, 2]))
+        self.assertFalse(iters.has_all(main, [1, 5]))
+        self.assertTrue(iters.has_any(main, [5, 1]))
+        self.assertFalse(iters.has_any(main, [5, 6]))
+        self.assertEqual(([1, 2], [3, 4], [5, 6]), iters.venn(main, [3, 4, 5, 6]))
+        self.assertEqual(([5, 6], [3, 4], [1, 2]), iters.venn([3, 4, 5, 6], main))
+
+    def test_sketches(self):
+        a = iters.IndexedCollection(range(0, 20000), sketch=True)
+        b = iters.IndexedCollection(range(10000, 30000), sketch=True)
+        self.assertAlmostEqual(20000, a.approx_len(), delta=20000 * 0.05)
+        self.assertAlmostEqual(1 / 3, a.approx_jaccard(b), delta=0.15)
+        self.assertAlmostEqual(10000, a.approx_intersection_size(b), delta=10000 * 0.4)
+        b.drop_index()
+        with self.assertRaises(ValueError):
+            b.has_any([1])
+        self.assertAlmostEqual(1 / 3, a.approx_jaccard(b), delta=0.15)
+        with self.assertRaises(ValueError):
+            a.approx_jaccard(iters.IndexedCollection([1]))
+        with self.assertRaises(ValueError):
+            iters.IndexedCollection([1]).drop_index()
+
+
+class SketchTest(unittest.TestCase):
+    def test_stable_hash(self):
+        self.assertEqual(iters.stable_hash64('abc'), iters.stable_hash64('abc'))
+        self.assertNotEqual(iters.stable_hash64('1'), iters.stable_hash64(1))
+        self.assertNotEqual(iters.stable_hash64(b'1'), iters.stable_hash64('1'))
+        self.assertEqual(iters.stable_hash64((1, 2)), iters.stable_hash64((1, 2)))
+        self.assertLess(iters.stable_hash64(-5), 1 << 64)
+
+    def test_hyperloglog(self):
+        hll = iters.HyperLogLog(precision=12)
+        self.assertEqual(0, len(hll))
+        hll.update(str(i) for i in range(50000))
+        hll.update(str(i) for i in range(25000))  # Duplicates don't count
+        self.assertAlmostEqual(50000, hll.count(), delta=50000 * 0.05)
+        small = iters.HyperLogLog(['a', 'b', 'c'])
+        self.assertEqual(3, small.count())
+
+        other = iters.HyperLogLog((str(i) for i in range(40000, 60000)), precision=12)
+        self.assertAlmostEqual(60000, (hll | other).count(), delta=60000 * 0.05)
+        self.assertAlmostEqual(10000, hll.intersection_size(other), delta=6000)
+        with self.assertRaises(ValueError):
+            hll | small
+        with self.assertRaises(ValueError):
+            iters.HyperLogLog(precision=2)
+
+    def test_minhash(self):
+        a = iters.MinHash(range(0, 1000))
+        b = iters.MinHash(range(500, 1500))
+        self.assertAlmostEqual(1 / 3, a.jaccard(b), delta=0.15)
+        self.assertEqual(1.0, a.jaccard(iters.MinHash(range(0, 1000))))
+        self.assertEqual(1.0, iters.MinHash().jaccard(iters.MinHash()))
+        a.update_from(b)
+        self.assertEqual(1.0, a.jaccard(iters.MinHash(range(0, 1500))))
+        with self.assertRaises(ValueError):
+            a.jaccard(iters.MinHash(size=16))
+        self.assertEqual(0.5, iters.MinHash('abc').jaccard(iters.MinHash('bcd')))  # Exact for small sets
@@ -0,0 +1,113 @@
+import array
+import ipaddress
+import random
+import unittest
+
+from ccptools.tpu import casting
+
+
+class TestIpConversion(unittest.TestCase):
+    def test_ip_to_int(self):
+        self.assertEqual(0, casting.ip_to_int('0.0.0.0'))
+        self.assertEqual(3232235783, casting.ip_to_int('192.168.1.7'))
+        self.assertEqual(4294967295, casting.ip_to_int('255.255.255.255'))
+        self.assertEqual(16909060, casting.ip_to_int('01.2.3.4'))  # Still lenient
+        for bad in ('1.2.3', '256.1.1.1', '1.2.3.4.5', 'a.b.c.d'):
+            with self.assertRaises(ValueError):
+                casting.ip_to_int(bad)
+        self.assertEqual('192.168.1.7', casting.int_to_ip(3232235783))
+        self.assertEqual('0.0.0.0', casting.int_to_ip(0))
+
+    def test_ipv6(self):
+        self.assertEqual(1, casting.ipv6_to_int('::1'))
+        with self.assertRaises(ValueError):
+            casting.ipv6_to_int('::1\x00')
+        self.assertEqual(int(ipaddress.IPv6Address('2001:db8::ff00:42:8329')),
+                         casting.ipv6_to_int('2001:0db8:0000:0000:0000:ff00:0042:8329'))
+        self.assertEqual('2001:db8::ff00:42:8329', casting.int_to_ipv6(casting.ipv6_to_int('2001:db8::ff00:42:8329')))
+        self.assertEqual(0xffff01020304, casting.ipv6_to_int('::ffff:1.2.3.4'))
+        with self.assertRaises(ValueError):
+            casting.ipv6_to_int('1.2.3.4')
+        with self.assertRaises(ValueError):
+            casting.int_to_ipv6(1 << 128)
+
+    def test_ips_to_array(self):
+        expected = array.array('I', [167772161, 3232235783])
+        self.assertEqual(expected, casting.ips_to_array(b'10.0.0.1\n192.168.1.7\n'))
+        self.assertEqual(expected, casting.ips_to_array('10.0.0.1,192.168.1.7', sep=','))
+        self.assertEqual(expected, casting.ips_to_array(b'10.0.0.1\n\n192.168.1.7\n', sep='\n'))
+        self.assertEqual(expected, casting.ips_to_array('010.0.0.1\n192.168.1.7\n', sep='\n'))
+        self.assertEqual(expected, casting.ips_to_array(['10.0.0.1', b'192.168.1.7']))
+        self.assertEqual(expected, casting.ips_to_array(['010.0.0.1', 'nope', '192.168.1.7'], skip_invalid=True))
+        self.assertEqual(array.array('I', [16909060]), casting.ips_to_array(['1.2.3.4', 'a\x00'], skip_invalid=True))
+        with self.assertRaises(ValueError):
+            casting.ips_to_array(['1.2.3.4', '1.2.3.4\x00'])
+        self.assertEqual(array.array('I'), casting.ips_to_array(b''))
+        with self.assertRaises(ValueError):
+            casting.ips_to_array(b'10.0.0.1 nope')
+
+
+class TestCidr(unittest.TestCase):
+    def test_parse_cidr(self):
+        self.assertEqual(casting.IPNetwork(3232235776, 24, 4), casting.parse_cidr('192.168.1.0/24'))
+        self.assertEqual(casting.IPNetwork(3232235776, 24, 4), casting.parse_cidr('192.168.1.77/24'))
+        self.assertEqual(casting.IPNetwork(3232235783, 32, 4), casting.parse_cidr('192.168.1.7'))
+        net = casting.parse_cidr('2001:db8::/32')
+        self.assertEqual(6, net.version)
+        self.assertEqual('2001:db8::/32', str(net))
+        self.assertEqual(int(ipaddress.ip_network('2001:db8::/32').broadcast_address), net.last)
+
+        net = casting.parse_cidr('10.0.0.0/8')
+        self.assertEqual('10.0.0.0/8', str(net))
+        self.assertEqual(0xFF000000, net.netmask)
+        self.assertTrue(net.contains(casting.ip_to_int('10.255.255.255')))
+        self.assertFalse(net.contains(casting.ip_to_int('11.0.0.0')))
+
+        for bad in ('10.0.0.0/33', '10.0.0.0/x', '10.0.0.0/', 'nope/8', '::/129', '10.0.0.0/٨', '10.0.0.0/²'):
+            with self.assertRaises(ValueError):
+                casting.parse_cidr(bad)
+        with self.assertRaises(ValueError):
+            casting.parse_cidr('192.168.1.77/24', strict=True)
+
+    def test_index(self):
+        index = casting.CidrIndex({'10.0.0.0/8': 'corp', '10.1.0.0/16': 'lab', '10.1.2.0/24': 'rack',
+                                   '2001:db8::/32': 'v6'})
+        self.assertEqual(4, len(index))
+        self.assertEqual('rack', index.get('10.1.2.3'))
+        self.assertEqual('lab', index.get('10.1.3.3'))
+        self.assertEqual('corp', index.get('10.255.255.255'))
+        self.assertIsNone(index.get('11.0.0.0'))
+        self.assertEqual('-', index.get('9.255.255.255', '-'))
+        self.assertEqual('v6', index.get('2001:db8::1'))
+        self.assertEqual('v6', index.get(casting.ipv6_to_int('2001:db8::1'), version=6))
+        self.assertIsNone(index.get(casting.ipv6_to_int('2001:db9::1'), version=6))
+        self.assertIn('10.0.0.1', index)
+        self.assertNotIn('8.8.8.8', index)
+        self.assertEqual((casting.parse_cidr('10.1.0.0/16'), 'lab'), index.lookup('10.1.200.1'))
+        ips = casting.ips_to_array('10.1.2.3 10.2.0.1 11.0.0.0')
+        self.assertEqual(['rack', 'corp', None], index.get_many(ips))
+
+        index = casting.CidrIndex(['0.0.0.0/0', '255.255.255.255/32'])
+        self.assertEqual(casting.parse_cidr('255.255.255.255'), index.lookup('255.255.255.255')[1])
+        self.assertEqual(casting.parse_cidr('0.0.0.0/0'), index.lookup('255.255.255.254')[1])
+        self.assertIsNone(casting.CidrIndex([]).get('1.2.3.4'))
+
+    def test_index_matches_brute_force(self):
+        rnd = random.Random(7)
+        networks = set()
+        while len(networks) < 300:
+            prefix_len = rnd.randint(4, 30)
+            networks.add(str(ipaddress.ip_network((rnd.getrandbits(32) & ~((1 << (32 - prefix_len)) - 1),
+                                                   prefix_len))))
+        parsed = [ipaddress.ip_network(n) for n in networks]
+        index = casting.CidrIndex({n: n for n in networks})
+        # Addresses at and around network edges as well as random ones
+        ips = [rnd.getrandbits(32) for _ in range(2000)]
+        for net in parsed:
+            ips.extend(int(a) + d for a in (net.network_address, net.broadcast_address) for d in (-1, 0, 1))
+        ips = [ip for ip in ips if 0 <= ip < 1 << 32]
+        for ip, got in zip(ips, index.get_many(ips)):
+            addr = ipaddress.ip_address(ip)
+            matching = [n for n in parsed if addr in n]
+            expected = str(max(matching, key=lambda n: n.prefixlen)) if matching else None
+            self.assertEqual(expected, got, str(addr))
@@ -0,0 +1,43 @@
+import unittest
+import random
+
+from ccptools.tpu import iters
+from ccptools.tpu.iters import VennSide
+
+
+def split(pairs):
+    parts = ([], [], [])
+    for side, x in pairs:
+        parts[side].append(x)
+    return parts
+
+
+class IterVennTest(unittest.TestCase):
+    def test_sorted(self):
+        pairs = list(iters.iter_venn([1, 2, 3, 3, 4], iter([3, 4, 5, 6, 6, 6]), presorted=True))
+        self.assertEqual([(VennSide.LEFT, 1), (VennSide.LEFT, 2), (VennSide.BOTH, 3), (VennSide.BOTH, 4),
+                          (VennSide.RIGHT, 5), (VennSide.RIGHT, 6)], pairs)
+        self.assertEqual(([], [], ['a']), split(iters.iter_venn([], ['a'], presorted=True)))
+        self.assertEqual(([1, 2], [], []), split(iters.iter_venn([1, 2], [], presorted=True)))
+
+    def test_not_sorted(self):
+        with self.assertRaises(ValueError):
+            list(iters.iter_venn([1, 3, 2], [1], presorted=True))
+
+    def test_in_memory(self):
+        self.assertEqual(iters.venn([3, 1, 2, 4], [6, 4, 5, 3]), split(iters.iter_venn([3, 1, 2, 4], [6, 4, 5, 3])))
+
+    def test_partitioned(self):
+        rng = random.Random(5)
+        left = [rng.randint(0, 500) for _ in range(400)]
+        right = [rng.randint(250, 750) for _ in range(400)]
+        expected = [sorted(part) for part in iters.venn(left, right)]
+        for max_in_memory in (0, 10, 399, 500):
+            parts = split(iters.iter_venn(iter(left), iter(right), max_in_memory=max_in_memory, partitions=7))
+            self.assertEqual(expected, [sorted(part) for part in parts])
+        self.assertEqual(expected, [sorted(part) for part in split(iters.iter_venn(
+            sorted(left), sorted(right), presorted=True))])
+
+    def test_strings(self):
+        parts = split(iters.iter_venn('ABCD', 'CDEF', max_in_memory=2, partitions=3))
+        self.assertEqual([{'A', 'B'}, {'C', 'D'}, {'E', 'F'}], [set(p) for p in parts])
@@ -0,0 +1,69 @@
+import unittest
+import copy
+import random
+
+from ccptools.tpu import iters
+
+
+class LayeredDictTest(unittest.TestCase):
+    def setUp(self):
+        self.defaults = {'db': {'host': 'localhost', 'port': 5432, 'opts': {'ssl': False}}, 'debug': False,
+                         'tags': ['a']}
+        self.file = {'db': {'host': 'db.local', 'opts': {'timeout': 5}}, 'name': 'app'}
+        self.env = {'db': {'opts': 'raw'}, 'debug': True}
+
+    def test_matches_nested_dict_update(self):
+        expected = copy.deepcopy(self.defaults)
+        for layer in (self.file, self.env):
+            iters.nested_dict_update(expected, copy.deepcopy(layer))
+
+        before = copy.deepcopy([self.defaults, self.file, self.env])
+        layered = iters.nested_dict_overlay(self.defaults, self.file, self.env)
+        self.assertEqual(expected, layered.to_dict())
+        self.assertEqual(list(expected), list(layered))
+        self.assertEqual(list(expected['db']), list(layered['db']))
+        self.assertEqual(len(expected), len(layered))
+        self.assertEqual(expected, layered)
+        self.assertEqual(before, [self.defaults, self.file, self.env])  # Nothing changed
+
+    def test_sharing(self):
+        layered = iters.nested_dict_overlay(self.defaults, self.file)
+        self.assertIs(self.defaults['tags'], layered['tags'])
+        self.assertIsInstance(layered['db'], iters.LayeredDict)
+        self.assertIs(self.defaults['tags'], layered.to_dict()['tags'])
+        self.assertEqual({'ssl': False, 'timeout': 5}, layered['db']['opts'])
+        self.assertEqual(5432, iters.nested_get(layered, ('db', 'port')))
+        self.assertIn('name', layered)
+        self.assertNotIn('nope', layered)
+        self.assertIsNone(layered.get('nope'))
+        with self.assertRaises(KeyError):
+            layered['nope']
+
+    def test_overlay_and_changes(self):
+        base = iters.nested_dict_overlay(self.defaults, self.file)
+        self.assertEqual([('db', 'host'), ('db', 'opts', 'timeout'), ('name',)], base.changes)
+
+        request = base.overlay({'db': {'port': 5432, 'host': 'other'}, 'debug': False, 'new': {'x': 1}})
+        self.assertEqual(3, len(request.layers))
+        self.assertEqual([('db', 'host'), ('new',)], request.changes)
+        self.assertEqual('db.local', base['db']['host'])
+        self.assertEqual('other', request['db']['host'])
+
+        self.assertEqual([('db', 'opts')], iters.nested_dict_overlay(self.defaults, {'db': {'opts': 1}}).changes)
+        self.assertEqual([], iters.nested_dict_overlay(self.defaults, {'db': {}}).changes)
+
+    def test_random(self):
+        rng = random.Random(7)
+
+        def make(depth):
+            return {rng.choice('abcdef'): make(depth - 1) if depth and rng.random() < 0.5 else rng.randint(0, 3)
+                    for _ in range(rng.randint(0, 5))}
+
+        for _ in range(200):
+            layers = [make(3) for _ in range(rng.randint(1, 4))]
+            expected = {}
+            for layer in layers:
+                iters.nested_dict_update(expected, copy.deepcopy(layer))
+            layered = iters.nested_dict_overlay(*layers)
+            self.assertEqual(expected, layered.to_dict())
+            self.assertEqual(iters.flatten_dict(expected), iters.flatten_dict(layered.to_dict()))
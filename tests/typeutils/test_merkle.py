@@ -0,0 +1,67 @@
+import unittest
+
+from ccptools.tpu.structs.serializers import *
+from ccptools.tpu import iters
+
+import datetime
+
+
+class Ship:
+    def __init__(self, name, hp, modules=None):
+        self.name = name
+        self.hp = hp
+        self.modules = modules or []
+        self._cache = object()
+
+
+class MerkleSerializerTest(unittest.TestCase):
+    def setUp(self):
+        self.s = MerkleSerializer()
+
+    def test_stable_digests(self):
+        a = {'a': 1, 'b': [1, 2, {'c': datetime.date(2024, 1, 1)}]}
+        b = {'b': [1, 2, {'c': datetime.date(2024, 1, 1)}], 'a': 1}
+        self.assertEqual(self.s.serialize(a).digest, self.s.serialize(b).digest)
+        self.assertEqual(self.s.serialize(a).digest, MerkleSerializer().serialize(a).digest)
+
+    def test_type_sensitive(self):
+        self.assertNotEqual(self.s.serialize(1).digest, self.s.serialize('1').digest)
+        self.assertNotEqual(self.s.serialize(1).digest, self.s.serialize(True).digest)
+        self.assertNotEqual(self.s.serialize([1]).digest, self.s.serialize({0: 1}).digest)
+        self.assertNotEqual(self.s.serialize({'a': 1}).digest, self.s.serialize({'a': '1'}).digest)
+
+    def test_to_value(self):
+        value = {'a': 7, 'b': [1, 'x', None], 'c': {'d': b'e'}}
+        self.assertEqual(value, self.s.serialize(value).to_value())
+        self.assertEqual({'name': 'Rifter', 'hp': 100, 'modules': []}, self.s.serialize(Ship('Rifter', 100)).to_value())
+
+    def test_sets(self):
+        self.assertEqual(self.s.serialize({1, 2, 3}).digest, self.s.serialize({3, 2, 1}).digest)
+
+
+class MerkleDiffTest(unittest.TestCase):
+    def setUp(self):
+        self.s = MerkleSerializer()
+
+    def diff(self, old, new):
+        return merkle_diff(self.s.serialize(old), self.s.serialize(new))
+
+    def test_identical(self):
+        self.assertEqual([], self.diff({'a': [1, 2, 3]}, {'a': [1, 2, 3]}))
+
+    def test_changes(self):
+        self.assertEqual([['a', 'c', 1]], self.diff({'a': {'b': 1, 'c': [1, 2]}}, {'a': {'b': 1, 'c': [1, 3]}}))
+        self.assertEqual([['a'], ['c']], self.diff({'a': 1, 'b': 2}, {'a': 2, 'b': 2, 'c': 3}))
+        self.assertEqual([['b']], self.diff({'a': 1, 'b': 2}, {'a': 1}))
+        self.assertEqual([[2], [3]], self.diff([1, 2, 3], [1, 2, 4, 5]))
+        self.assertEqual([['a']], self.diff({'a': {'b': 1}}, {'a': [1]}))
+        self.assertEqual([[]], self.diff(1, 2))
+
+    def test_paths_work_with_nested_get(self):
+        old = {'fleet': [Ship('Rifter', 100, ['gun']), Ship('Merlin', 200)]}
+        new = {'fleet': [Ship('Rifter', 100, ['gun']), Ship('Merlin', 150)]}
+        changes = self.diff(old, new)
+        self.assertEqual([['fleet', 1, 'hp']], changes)
+        self.assertEqual(150, iters.nested_get(new, changes[0]))
+        iters.nested_set(old, changes[0], iters.nested_get(new, changes[0]))
+        self.assertEqual([], self.diff(old, new))
@@ -0,0 +1,69 @@
+import sys
+import unittest
+
+from ccptools.tpu import casting
+from ccptools.tpu.casting import NumberKind
+
+
+class TestScanNumber(unittest.TestCase):
+    def test_kinds(self):
+        for value in ('0', '1234', '-1234', '+1', ' 12 ', '1_000', '007', '١٢', b'42', b' -7'):
+            self.assertEqual(NumberKind.INT, casting.scan_number(value), value)
+        for value in ('0x1F', '-0X_ff', '0o17', '0b101', b'0x10', '0x5١', '0o٧', '0b_١٠'):
+            self.assertEqual(NumberKind.PREFIXED_INT, casting.scan_number(value), value)
+        for value in ('1.5', '-1.5', '1.', '.5', '1e3', '1.5E-3', '1_0.0_1', '١.٥', b'2.5'):
+            self.assertEqual(NumberKind.FLOAT, casting.scan_number(value), value)
+        for value in ('inf', '-Infinity', 'NaN', b'nan'):
+            self.assertEqual(NumberKind.NONFINITE, casting.scan_number(value), value)
+        for value in ('', ' ', '-', '.', '1,000', '1..2', '1_', '_1', '1__0', 'e3', '0x', '0b2', '12a', 'n/a',
+                      '1\x1c', '²', b'x', b'1.2.3',
+                      '0o٨', '0b٢', '0o_8', b'0b2'):
+            self.assertEqual(NumberKind.INVALID, casting.scan_number(value), value)
+
+    def test_same_as_builtins(self):
+        values = ['1', '-2', '0x1f', '0o7', '0b1', '1.5', '1e5', '.5', '5.', 'inf', 'nan', '1_0', ' 3 ', '007',
+                  'x', '', '1,5', '0x', '--1', '+-1', '1e', '1.2.3', 'infinite', ' 1 ',
+                  '0x5١', '0o٧', '0b١', '0o٨']
+        for value in values:
+            kind = casting.scan_number(value)
+            for func, accepts in ((int, kind == NumberKind.INT),
+                                  (lambda v: int(v, 0), kind == NumberKind.PREFIXED_INT),
+                                  (float, kind != NumberKind.INVALID and kind != NumberKind.PREFIXED_INT)):
+                if accepts:
+                    func(value)
+                elif func is float:
+                    self.assertRaises(ValueError, func, value)
+
+
+class TestScannedEvals(unittest.TestCase):
+    def test_int_eval(self):
+        self.assertEqual(31, casting.int_eval(' 0x1F '))
+        self.assertEqual(3, casting.int_eval(b'0b11'))
+        self.assertEqual(1000, casting.int_eval('1e3'))
+        self.assertEqual(7, casting.int_eval('007'))
+        self.assertEqual(10 ** 30, casting.int_eval('0' + '1' + '0' * 30))  # No detour through float
+        self.assertEqual(-1, casting.int_eval('inf', -1))
+        self.assertEqual(-1, casting.int_eval('1e400', -1))
+        self.assertEqual(-1, casting.int_eval('nan', -1))
+        with self.assertRaises(ValueError):
+            casting.int_eval('n/a', raise_on_fail=True)
+        with self.assertRaises(ValueError):
+            casting.int_eval('inf', raise_on_fail=True)
+
+    def test_too_many_digits(self):
+        digits = '1' * 5000  # More than sys.get_int_max_str_digits() allows by default (where there's a limit)
+        if hasattr(sys, 'get_int_max_str_digits') and sys.get_int_max_str_digits():
+            self.assertEqual(-1, casting.int_eval(digits, -1))
+            with self.assertRaises(ValueError):
+                casting.int_eval(digits, raise_on_fail=True)
+        else:
+            self.assertEqual(int(digits), casting.int_eval(digits, -1))
+        self.assertEqual(int(digits[:10]), casting.int_eval_many([digits, digits[:10]], -1)[1])
+        self.assertTrue(casting.bool_eval(digits))
+        self.assertFalse(casting.bool_eval('0' * 5000))
+
+    def test_bool_eval(self):
+        for value in ('+1', '1e3', '.5', '5.', '1_000', '0x1', ' -0.5 '):
+            self.assertTrue(casting.bool_eval(value), value)
+        for value in ('0e0', '-0', '0x0', '0.', 'inf', 'nan', '²', '1,5'):
+            self.assertFalse(casting.bool_eval(value), value)
@@ -0,0 +1,54 @@
+import unittest
+import random
+
+from ccptools.tpu import iters
+
+
+class PatternMatcherTest(unittest.TestCase):
+    def test_search(self):
+        matcher = iters.PatternMatcher({'kill': ['warp', 'lock', 'shoot'], 'flee': ['lock', 'warp'],
+                                        'lock': ['lock']})
+        result = matcher.search(['warp', 'lock', 'shoot', 'lock', 'warp'], collect_matches=True)
+        self.assertEqual({'kill', 'flee', 'lock'}, result.found)
+        self.assertEqual({'kill'}, result.prefixes)
+        self.assertEqual({'flee'}, result.suffixes)
+        self.assertEqual([(1, 'lock'), (0, 'kill'), (3, 'lock'), (3, 'flee')], result.matches)
+
+        result = matcher.search([])
+        self.assertEqual(set(), result.found)
+
+    def test_list_patterns(self):
+        matcher = iters.PatternMatcher(['he', 'she', 'his', 'hers', ''])
+        self.assertEqual(5, len(matcher))
+        self.assertEqual([(1, 1), (2, 0), (2, 3)], list(matcher.iter_matches('ushers')))
+        result = matcher.search('ushers')
+        self.assertEqual({0, 1, 3, 4}, result.found)
+        self.assertEqual({4}, result.prefixes)
+        self.assertEqual({3, 4}, result.suffixes)
+
+    def test_stream(self):
+        matcher = iters.PatternMatcher([(1, 2, 3), (3, 1), (2,)])
+        stream = matcher.stream()
+        self.assertEqual([], stream.push(1))
+        self.assertEqual([(1, 2)], stream.push(2))
+        self.assertEqual({2}, stream.suffixes)
+        self.assertEqual([(0, 0), (2, 1), (4, 2)], stream.feed(iter([3, 1, 2])))
+        self.assertEqual(5, stream.position)
+        result = stream.result()
+        self.assertEqual({0, 1, 2}, result.found)
+        self.assertEqual({0}, result.prefixes)
+        self.assertEqual({2}, result.suffixes)
+
+    def test_random_against_has(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            patterns = [tuple(rng.choice('abc') for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 8))]
+            matcher = iters.PatternMatcher(patterns)
+            for _ in range(5):
+                seq = [rng.choice('abcd') for _ in range(rng.randint(0, 20))]
+                result = matcher.search(seq)
+                self.assertEqual({i for i, p in enumerate(patterns) if iters.has(seq, p)}, result.found)
+                self.assertEqual({i for i, p in enumerate(patterns) if iters.startswith(seq, p)}, result.prefixes)
+                self.assertEqual({i for i, p in enumerate(patterns) if iters.endswith(seq, p)}, result.suffixes)
+                self.assertEqual(sorted((s, i) for i, p in enumerate(patterns) for s in iters.find_all(seq, p)),
+                                 sorted(matcher.iter_matches(seq)))
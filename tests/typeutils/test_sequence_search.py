@@ -0,0 +1,50 @@
+import unittest
+import random
+
+from ccptools.tpu import iters
+
+
+def naive_find_all(main, sub):
+    main, sub = list(main), list(sub)
+    return [i for i in range(len(main) - len(sub) + 1) if main[i:i + len(sub)] == sub]
+
+
+class FindAllTest(unittest.TestCase):
+    def test_find_all(self):
+        self.assertEqual([0, 4], list(iters.find_all(['a', 'a', 'b', 'a', 'a', 'a', 'b'], ['a', 'a', 'b'])))
+        self.assertEqual([0, 1, 2], list(iters.find_all('aaaa', 'aa')))
+        self.assertEqual([0, 2], list(iters.find_all('aaaa', 'aa', overlapping=False)))
+        self.assertEqual([0, 1, 2], list(iters.find_all([1, 2], [])))
+        self.assertEqual([], list(iters.find_all([], [1])))
+        self.assertEqual([1, 3], list(iters.find_all((5, 1, 5, 1), (1,))))
+
+    def test_streams(self):
+        self.assertEqual([1, 4], list(iters.find_all(iter([0, 0, 1, 2, 0, 1, 2]), [0, 1, 2])))
+        self.assertEqual([3], list(iters.find_all((x for x in range(10)), [3, 4, 5])))
+        self.assertEqual([0], list(iters.find_all(iter([[1], [2]]), [[1], [2]])))  # Unhashable values
+
+    def test_random_against_naive(self):
+        rng = random.Random(42)
+        for _ in range(500):
+            main = [rng.choice('ab') for _ in range(rng.randint(0, 30))]
+            sub = [rng.choice('ab') for _ in range(rng.randint(1, 4))]
+            expected = naive_find_all(main, sub)
+            self.assertEqual(expected, list(iters.find_all(main, sub)), (main, sub))
+            self.assertEqual(expected, list(iters.find_all(tuple(main), sub)), (main, sub))
+            self.assertEqual(expected, list(iters.find_all(iter(main), sub)), (main, sub))
+            self.assertEqual(bool(expected), iters.has(main, sub))
+            self.assertEqual(bool(expected), iters.has(iter(main), sub))
+
+    def test_has(self):
+        self.assertTrue(iters.has([1, 2, 3, 4], [2, 3]))
+        self.assertTrue(iters.has([1, 2, 3, 4], []))
+        self.assertTrue(iters.has([1, 2], [1, 2]))
+        self.assertFalse(iters.has([1, 2], [3, 4]))
+        self.assertFalse(iters.has([1, 2], [1, 2, 3]))
+        self.assertTrue(iters.has('lennon', 'nno'))
+        self.assertTrue(iters.has(['l', 'e', 'n'], 'en'))
+        self.assertTrue(iters.has(range(100), [50, 51]))
+
+    def test_worst_case(self):
+        main = [0] * 20000 + [1]
+        self.assertEqual([10000], list(iters.find_all(main, [0] * 10000 + [1])))
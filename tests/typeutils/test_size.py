@@ -0,0 +1,213 @@
+import unittest
+
+from ccptools.tpu import size
+
+import collections
+import contextlib
+import dataclasses
+import io
+import sys
+
+
+@dataclasses.dataclass
+class Player:
+    name: str
+    skills: list
+
+
+class Slotted(object):
+    __slots__ = ('a', '__b')
+
+    def __init__(self):
+        self.a = 'a' * 1000
+        self.__b = list(range(100))
+
+
+class TotalSizeTest(unittest.TestCase):
+    def test_containers(self):
+        self.assertEqual(sys.getsizeof([]), size.total_size([]))
+        s = 'x' * 100
+        self.assertEqual(sys.getsizeof([s]) + sys.getsizeof(s), size.total_size([s]))
+        self.assertEqual(sys.getsizeof([s, s]) + sys.getsizeof(s), size.total_size([s, s]))
+        d = {'key': s}
+        self.assertEqual(sys.getsizeof(d) + sys.getsizeof('key') + sys.getsizeof(s), size.total_size(d))
+        q = collections.deque([s])
+        self.assertEqual(sys.getsizeof(q) + sys.getsizeof(s), size.total_size(q))
+
+    def test_deep_nesting(self):
+        nested = []
+        for _ in range(sys.getrecursionlimit() * 5):
+            nested = [nested]
+        self.assertEqual(sys.getsizeof([[]]) * (sys.getrecursionlimit() * 5) + sys.getsizeof([]),
+                         size.total_size(nested))
+
+    def test_ignores_attributes(self):
+        p = Player('x' * 1000, [])
+        self.assertEqual(sys.getsizeof(p), size.total_size(p))
+
+    def test_handlers(self):
+        class Box(object):
+            def __init__(self, *items):
+                self.items = items
+
+        s = 'y' * 100
+        self.assertEqual(sys.getsizeof(Box(s)) + sys.getsizeof(s),
+                         size.total_size(Box(s), handlers={Box: lambda b: b.items}))
+
+    def test_iter_handler_without_len(self):
+        class Bag(object):
+            def __init__(self, *items):
+                self.items = items
+
+            def __iter__(self):
+                return iter(self.items)
+
+        s = 'y' * 100
+        self.assertEqual(sys.getsizeof(Bag()), size.total_size(Bag(), handlers={Bag: iter}))
+        self.assertEqual(sys.getsizeof(Bag(s)) + sys.getsizeof(s), size.total_size(Bag(s), handlers={Bag: iter}))
+        self.assertEqual(0, size.profile_size(Bag(s), handlers={Bag: iter}, sample_threshold=1, sample_size=1,
+                                              follow_attrs=False).estimated)
+
+
+class ProfileSizeTest(unittest.TestCase):
+    def test_follows_attributes(self):
+        p = Player('x' * 1000, [])
+        profile = size.profile_size(p)
+        self.assertEqual(sys.getsizeof(p) + sys.getsizeof(p.__dict__) + sys.getsizeof(p.name)
+                         + sys.getsizeof(p.skills) + sys.getsizeof('name') + sys.getsizeof('skills'),
+                         profile.total)
+        self.assertEqual(sys.getsizeof(p.name), profile.by_path[('name',)])
+
+    def test_slots(self):
+        o = Slotted()
+        profile = size.profile_size(o)
+        self.assertIn(('a',), profile.by_path)
+        self.assertIn(('_Slotted__b',), profile.by_path)
+        self.assertGreater(profile.total, size.total_size(o) + 1000)
+
+    def test_by_type(self):
+        data = {'players': [Player(f'p{i}', [i]) for i in range(10)]}
+        profile = size.profile_size(data, path_depth=2)
+        self.assertEqual(10, profile.count_by_type[Player])
+        self.assertEqual(profile.total, sum(profile.by_type.values()))
+        self.assertEqual(profile.total, sum(profile.by_path.values()))
+        self.assertIn(Player, [t for t, _, _ in profile.top_types(20)])
+        self.assertEqual(((), profile.total), profile.top_paths(1, cumulative=True)[0])
+        self.assertIn('players/0', profile.report(20))
+
+    def test_sampled(self):
+        data = [Player(str(i) * 10, list(range(20))) for i in range(5000)]
+        exact = size.profile_size(data)
+        sampled = size.profile_size(data, sample_threshold=1000, sample_size=500, seed=42)
+        self.assertEqual(0, exact.estimated)
+        self.assertEqual(1, sampled.estimated)
+        self.assertAlmostEqual(1.0, sampled.total / exact.total, delta=0.1)
+
+    def test_sampling_shared_items(self):
+        data = [i % 10 for i in range(100000)]
+        sampled = size.profile_size(data, sample_threshold=1000, sample_size=100, seed=42)
+        self.assertEqual(1, sampled.estimated)
+        self.assertEqual(size.total_size(data), sampled.total)
+
+    def test_verbose_prints_ints(self):
+        out = io.StringIO()
+        with contextlib.redirect_stderr(out):
+            size.profile_size([str(i) * 10 for i in range(100)], sample_threshold=10, sample_size=7, verbose=True)
+        for line in out.getvalue().splitlines():
+            self.assertTrue(line.split(' ', 1)[0].isdigit(), line)
+
+    def test_sampling_skips_mixed_containers(self):
+        data = [i if i % 2 else str(i) * 10 for i in range(5000)]
+        exact = size.profile_size(data)
+        sampled = size.profile_size(data, sample_threshold=1000, sample_size=100, seed=42)
+        self.assertEqual(0, sampled.estimated)
+        self.assertEqual(exact.total, sampled.total)
+
+
+class SizeTrackedDictTest(unittest.TestCase):
+    def test_running_estimate(self):
+        d = size.SizeTrackedDict()
+        self.assertEqual(size.total_size({}), d.nbytes)
+        for i in range(100):
+            d[f'key{i}'] = 'v' * (i * 10)
+        self.assertEqual(size.total_size(d.data), d.nbytes)
+        del d['key50']
+        d['key10'] = 'x' * 1000
+        self.assertEqual(size.total_size(d.data), d.nbytes)
+        self.assertEqual(size.total_size(d.data), d.reconcile())
+
+    def test_wraps_in_place(self):
+        raw = {'a': 'x' * 100}
+        d = size.SizeTrackedDict(raw)
+        self.assertEqual(size.total_size(raw), d.nbytes)
+        d['b'] = 'y'
+        self.assertIn('b', raw)
+
+    def test_reconcile_drift(self):
+        d = size.SizeTrackedDict(reconcile_every=2)
+        d['a'] = []
+        d['a'].extend(range(1000))  # Not noticed
+        self.assertLess(d.nbytes, size.total_size(d.data))
+        d['b'] = 1  # Second change triggers reconcile
+        self.assertEqual(size.total_size(d.data), d.nbytes)
+
+    def test_delete_after_reconcile(self):
+        shared = list(range(10000))
+        d = size.SizeTrackedDict({i: shared for i in range(100)})
+        self.assertGreater(d.nbytes, size.total_size(d.data))  # Counted once per entry
+        self.assertEqual(size.total_size(d.data), d.reconcile())
+        self.assertEqual(d.nbytes - sys.getsizeof(d.data), sum(d.entry_size(k) for k in d))
+        for i in range(100):
+            del d[i]
+            self.assertGreaterEqual(d.nbytes, sys.getsizeof(d.data))
+        self.assertEqual(size.total_size(d.data), d.nbytes)
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            size.SizeTracker()
+
+    def test_threshold_and_evict(self):
+        hits = []
+
+        def evict(tracker):
+            hits.append(tracker.nbytes)
+            tracker.evict()
+
+        d = size.SizeTrackedDict(max_bytes=5000, on_exceeded=evict)
+        for i in range(20):
+            d[i] = 'z' * 1000
+        self.assertTrue(hits)
+        self.assertLessEqual(d.nbytes, 5000)
+        self.assertIn(19, d)
+        self.assertNotIn(0, d)
+
+
+class SizeTrackedListTest(unittest.TestCase):
+    def test_running_estimate(self):
+        lst = size.SizeTrackedList()
+        for i in range(50):
+            lst.append('v' * (i * 10))
+        lst.insert(0, 'first')
+        lst[3] = 'changed'
+        del lst[10]
+        lst.pop()
+        self.assertEqual(size.total_size(lst.data), lst.nbytes)
+        lst[5:10] = ['a' * 500]
+        del lst[:2]
+        self.assertEqual(size.total_size(lst.data), lst.nbytes)
+
+    def test_evict(self):
+        lst = size.SizeTrackedList([str(i) * 100 for i in range(10)], max_bytes=500)
+        evicted = lst.evict()
+        self.assertEqual('0' * 100, evicted[0])
+        self.assertLessEqual(lst.nbytes, 500)
+
+    def test_delete_after_reconcile(self):
+        shared = 'x' * 10000
+        lst = size.SizeTrackedList([shared] * 50 + ['y' * 100])
+        lst.reconcile()
+        self.assertEqual(lst.nbytes - sys.getsizeof(lst.data), sum(lst.entry_size(i) for i in range(len(lst))))
+        while lst:
+            lst.pop()
+            self.assertGreaterEqual(lst.nbytes, sys.getsizeof(lst.data))
+        self.assertEqual(size.total_size(lst.data), lst.nbytes)
@@ -0,0 +1,59 @@
+import unittest
+import sys
+import types
+
+from ccptools.tpu import strimp
+
+
+class GetManyTest(unittest.TestCase):
+    def setUp(self):
+        strimp.clear_import_cache()
+
+    def tearDown(self):
+        strimp.clear_import_cache()
+
+    def test_get_many(self):
+        paths = [
+            'tests.typeutils.sometypes.IamClass',
+            'tests.typeutils.sometypes.IamFunction',
+            'tests.typeutils.sometypes.IamModule',
+            'tests.typeutils.sometypes.IamNoType',
+            'json',
+            'json.dumps',
+            'no_such_module_here.Thing',
+            'json',
+        ]
+        result = strimp.get_many(paths, default='nope')
+        self.assertEqual(7, len(result))
+        self.assertIs(strimp.get_any('tests.typeutils.sometypes.IamClass'), result['tests.typeutils.sometypes.IamClass'])
+        self.assertIsInstance(result['tests.typeutils.sometypes.IamModule'], types.ModuleType)
+        self.assertIs(sys.modules['json'], result['json'])
+        self.assertEqual('nope', result['tests.typeutils.sometypes.IamNoType'])
+        self.assertEqual('nope', result['no_such_module_here.Thing'])
+        self.assertEqual({'tests.typeutils.sometypes.IamNoType', 'no_such_module_here.Thing'}, set(result.errors))
+        self.assertIsInstance(result.errors['no_such_module_here.Thing'], ImportError)
+        self.assertEqual({'tests.typeutils.sometypes', 'json', 'no_such_module_here'}, set(result.module_timings))
+        self.assertEqual(set(result), set(result.timings))
+        self.assertEqual(3, len(result.slowest(3)))
+
+    def test_workers(self):
+        paths = ['json.dumps', 'json.loads', 'decimal.Decimal', 'fractions.Fraction', 'nope_nope.x']
+        result = strimp.get_many(paths, workers=4)
+        self.assertIs(sys.modules['json'].dumps, result['json.dumps'])
+        self.assertIs(sys.modules['decimal'].Decimal, result['decimal.Decimal'])
+        self.assertIsNone(result['nope_nope.x'])
+        self.assertEqual(['nope_nope.x'], list(result.errors))
+
+    def test_lazy(self):
+        result = strimp.get_many(['json.dumps', 'tests.typeutils.sometypes.IamClass', 'nope_nope.x'], lazy=True)
+        dumps = result['json.dumps']
+        self.assertIsInstance(dumps, strimp.LazyImport)
+        self.assertFalse(dumps.is_resolved)
+        self.assertEqual({}, result.timings)
+        self.assertEqual('[1]', dumps([1]))
+        self.assertTrue(dumps.is_resolved)
+        self.assertIn('json.dumps', result.timings)
+        self.assertEqual('IamClass', result['tests.typeutils.sometypes.IamClass'].__name__)
+        with self.assertRaises(ImportError):
+            result['nope_nope.x'].resolve()
+        self.assertIn('nope_nope.x', result.errors)
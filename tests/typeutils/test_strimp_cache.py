@@ -0,0 +1,103 @@
+import unittest
+import importlib
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from ccptools.tpu import strimp
+
+
+class ImportCacheTest(unittest.TestCase):
+    def setUp(self):
+        strimp.clear_import_cache()
+        self.tmp = tempfile.TemporaryDirectory()
+        sys.path.insert(0, self.tmp.name)
+
+    def tearDown(self):
+        sys.path.remove(self.tmp.name)
+        sys.modules.pop('strimp_cache_plugin', None)
+        self.tmp.cleanup()
+        strimp.import_cache.negative_ttl = 0.0
+        strimp.clear_import_cache()
+
+    def write_plugin(self, body):
+        with open(os.path.join(self.tmp.name, 'strimp_cache_plugin.py'), 'w') as f:
+            f.write(body)
+        importlib.invalidate_caches()
+
+    def test_positive_cache(self):
+        self.write_plugin('class Handler(object):\n    pass\n')
+        handler = strimp.get_class('strimp_cache_plugin.Handler')
+        self.assertIn('strimp_cache_plugin.Handler', strimp.import_cache)
+        self.assertIs(handler, strimp.get_any('strimp_cache_plugin.Handler'))
+        self.assertTrue(strimp.import_cache.get_verdict('strimp_cache_plugin.Handler', 'class', handler))
+        self.assertIs(handler, strimp.get_class('strimp_cache_plugin.Handler'))
+        self.assertIsNone(strimp.get_function('strimp_cache_plugin.Handler'))
+        self.assertFalse(strimp.import_cache.get_verdict('strimp_cache_plugin.Handler', 'function', handler))
+
+    def test_no_negative_cache_by_default(self):
+        self.assertIsNone(strimp.get_any('strimp_cache_plugin.VALUE'))
+        self.write_plugin('VALUE = 42\n')
+        self.assertEqual(42, strimp.get_any('strimp_cache_plugin.VALUE'))
+
+    def test_monkeypatching(self):
+        join = strimp.get_any('os.path.join')
+        self.assertTrue(strimp.get_callable('os.path.join'))
+        with mock.patch('os.path.join', lambda *a: 'patched'):
+            self.assertEqual('patched', strimp.get_any('os.path.join')())
+            self.assertEqual('patched', strimp.get_callable('os.path.join')('a'))
+        self.assertIs(join, strimp.get_any('os.path.join'))
+        with mock.patch('os.path.join', mock.Mock()):
+            self.assertIsNone(strimp.get_function('os.path.join'))  # Not the cached verdict of the real one
+        self.assertIs(join, strimp.get_function('os.path.join'))
+
+    def test_negative_cache(self):
+        strimp.import_cache.negative_ttl = 30.0
+        self.assertIsNone(strimp.get_any('strimp_cache_plugin.Handler'))
+        self.write_plugin('class Handler(object):\n    pass\n')
+        # Still failing, since the failure is cached
+        self.assertIsNone(strimp.get_any('strimp_cache_plugin.Handler'))
+        with self.assertRaises(ImportError):
+            strimp.get_any('strimp_cache_plugin.Handler', reraise=True)
+        # Bypassing the cache works though
+        self.assertIsNotNone(strimp.get_any('strimp_cache_plugin.Handler', use_cache=False))
+
+    def test_negative_cache_expires(self):
+        strimp.import_cache.negative_ttl = 0.01
+        self.assertIsNone(strimp.get_any('strimp_cache_plugin.Handler'))
+        self.write_plugin('class Handler(object):\n    pass\n')
+        time.sleep(0.02)
+        self.assertIsNotNone(strimp.get_any('strimp_cache_plugin.Handler'))
+
+    def test_reload_invalidates(self):
+        self.write_plugin('VALUE = 1\n')
+        self.assertEqual(1, strimp.get_any('strimp_cache_plugin.VALUE'))
+        self.write_plugin('VALUE = 22222\n')
+        self.assertEqual(1, strimp.get_any('strimp_cache_plugin.VALUE'))
+        strimp.reload_module('strimp_cache_plugin')
+        self.assertNotIn('strimp_cache_plugin.VALUE', strimp.import_cache)
+        self.assertEqual(22222, strimp.get_any('strimp_cache_plugin.VALUE'))
+
+    def test_reload_hook(self):
+        self.write_plugin('VALUE = 1\n')
+        self.assertEqual(1, strimp.get_any('strimp_cache_plugin.VALUE'))
+        self.write_plugin('VALUE = 22222\n')
+        original = importlib.reload
+        try:
+            strimp.install_reload_hook()
+            importlib.reload(sys.modules['strimp_cache_plugin'])
+            self.assertEqual(22222, strimp.get_any('strimp_cache_plugin.VALUE'))
+        finally:
+            importlib.reload = getattr(importlib.reload, '__wrapped__', original)
+            strimp._cache._original_reload = None
+
+    def test_invalidate_prefix(self):
+        strimp.get_any('tests.typeutils.sometypes.IamClass')
+        strimp.get_any('tests.typeutils.sometypes')
+        strimp.get_any('unittest.TestCase')
+        strimp.clear_import_cache('tests.typeutils')
+        self.assertNotIn('tests.typeutils.sometypes.IamClass', strimp.import_cache)
+        self.assertNotIn('tests.typeutils.sometypes', strimp.import_cache)
+        self.assertIn('unittest.TestCase', strimp.import_cache)